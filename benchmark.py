@@ -33,6 +33,8 @@ def run_benchmark(name: str, config):
         'name': name,
         'duration': duration,
         'input_tokens': usage.input_tokens,
+        'cached_input_tokens': usage.cached_input_tokens,
+        'cache_hit_rate': usage.cache_hit_rate,
         'output_tokens': usage.output_tokens,
         'total_tokens': usage.total_tokens,
         'actual_cost': usage.cost,
@@ -68,12 +70,12 @@ def main():
     print("=" * 70)
     print("RESULTS")
     print("=" * 70)
-    print(f"{'Model':<25} {'Time':>8} {'Tokens':>10} {'Actual $':>10} {'Saved':>8}")
+    print(f"{'Model':<25} {'Time':>8} {'Tokens':>10} {'Actual $':>10} {'Saved':>8} {'Cache hit':>10}")
     print("-" * 70)
 
     for r in results:
         saved_pct = (r['cache_savings'] / r['estimated_cost'] * 100) if r['estimated_cost'] > 0 else 0
-        print(f"{r['name']:<25} {r['duration']:>7.1f}s {r['total_tokens']:>10,} ${r['actual_cost']:>9.6f} {saved_pct:>6.0f}%")
+        print(f"{r['name']:<25} {r['duration']:>7.1f}s {r['total_tokens']:>10,} ${r['actual_cost']:>9.6f} {saved_pct:>6.0f}% {r['cache_hit_rate']:>9.0%}")
 
     print("-" * 70)
 
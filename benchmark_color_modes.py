@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: page image bytes, encode time and input tokens per render colorspace.
+
+Renders every page as RGB, 8-bit gray and 1-bit, encodes each in the
+formats the endpoints use (PNG for Requesty/Gemini, WEBP q75 elsewhere) and
+reports the totals, plus what the "auto" color mode picks per page. Input
+tokens depend only on the image size, so they are the same in every mode;
+the table shows them for the model-aware render size.
+
+Usage:
+    python benchmark_color_modes.py                      # synthetic form corpus
+    python benchmark_color_modes.py path/to/form.pdf ... # your own PDFs
+"""
+
+import sys
+import time
+from collections import Counter
+from io import BytesIO
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdfpower_extractor.core.analyzer import page_color_mode
+from pdfpower_extractor.core.extractor import to_bilevel
+from pdfpower_extractor.core.sizing import choose_render_size
+from pdfpower_extractor.models.config import get_model_config
+
+MODES = ("rgb", "gray", "bw")
+FORMATS = (("PNG", {}), ("WEBP", {"quality": 75}))
+
+
+def build_corpus() -> fitz.Document:
+    """B&W form, gray-shaded form, form with a colored logo, grayscale scan"""
+    doc = fitz.open()
+
+    for shaded in (False, True):
+        page = doc.new_page()
+        for row in range(40):
+            y = 60 + row * 18
+            if shaded and row % 2:
+                page.draw_rect(fitz.Rect(36, y - 12, 560, y + 4), color=None, fill=(0.9, 0.9, 0.9))
+            page.insert_text((40, y), f"{row + 1}. Question about the applicant, item {row + 1}", fontsize=9)
+            page.draw_rect(fitz.Rect(440, y - 9, 449, y))
+            page.draw_rect(fitz.Rect(480, y - 9, 489, y))
+
+    page = doc.new_page()
+    page.draw_rect(fitz.Rect(40, 30, 120, 60), color=None, fill=(0.1, 0.3, 0.8))
+    for row in range(30):
+        page.insert_text((40, 90 + row * 18), f"Field {row + 1}: ______________________", fontsize=9)
+
+    scan_src = fitz.open()
+    scan_page = scan_src.new_page()
+    for row in range(30):
+        scan_page.insert_text((50, 60 + row * 20), f"Scanned line {row + 1} with handwriting-like text", fontsize=10)
+    scan = scan_page.get_pixmap(dpi=150, colorspace=fitz.csRGB)
+    page = doc.new_page()
+    page.insert_image(page.rect, pixmap=scan)
+    return doc
+
+
+def render(page: fitz.Page, dpi: int, mode: str) -> Image.Image:
+    """Render like the extractor: RGB, 8-bit gray, or gray thresholded to 1-bit"""
+    colorspace = fitz.csRGB if mode == "rgb" else fitz.csGRAY
+    pix = page.get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False)
+    image = Image.frombytes("RGB" if mode == "rgb" else "L", (pix.width, pix.height), pix.samples)
+    return to_bilevel(image) if mode == "bw" else image
+
+
+def main():
+    docs = [fitz.open(path) for path in sys.argv[1:]] or [build_corpus()]
+    model = get_model_config("gemini_flash")
+
+    totals = {(mode, fmt): [0, 0.0] for mode in MODES for fmt, _ in FORMATS}
+    tokens = 0
+    auto_modes = Counter()
+    auto_bytes = {fmt: 0 for fmt, _ in FORMATS}
+    pages = 0
+
+    for doc in docs:
+        for page in doc:
+            pages += 1
+            size = choose_render_size(page.rect.width, page.rect.height, model.image_tokens)
+            tokens += size.image_tokens
+            chosen = page_color_mode(page)
+            auto_modes[chosen] += 1
+            page_bytes = {}
+            for mode in MODES:
+                image = render(page, size.dpi, mode)
+                for fmt, options in FORMATS:
+                    start = time.perf_counter()
+                    buffer = BytesIO()
+                    image.save(buffer, format=fmt, **options)
+                    elapsed = time.perf_counter() - start
+                    totals[(mode, fmt)][0] += buffer.tell()
+                    totals[(mode, fmt)][1] += elapsed
+                    page_bytes[(mode, fmt)] = buffer.tell()
+            for fmt, _ in FORMATS:
+                # The encoder always sends 1-bit renders as PNG
+                auto_bytes[fmt] += page_bytes[(chosen, "PNG" if chosen == "bw" else fmt)]
+
+    print("=" * 66)
+    print(f"COLOR MODE BENCHMARK ({pages} pages, {model.name} sizing)")
+    print("=" * 66)
+    print(f"{'Mode':<6} {'Format':<6} {'KB/page':>10} {'Encode ms/page':>16} {'Input tokens/page':>19}")
+    for mode in MODES:
+        for fmt, _ in FORMATS:
+            size_bytes, seconds = totals[(mode, fmt)]
+            print(f"{mode:<6} {fmt:<6} {size_bytes / pages / 1024:>10.1f} {seconds / pages * 1000:>16.1f} {tokens / pages:>19.0f}")
+    print("-" * 66)
+    print(f"Auto mode picks: {dict(auto_modes)}")
+    for fmt, _ in FORMATS:
+        rgb_bytes = totals[("rgb", fmt)][0]
+        print(f"Auto {fmt}: {auto_bytes[fmt] / pages / 1024:.1f} KB/page "
+              f"({(auto_bytes[fmt] / rgb_bytes - 1) * 100:+.1f}% vs RGB)")
+
+
+if __name__ == "__main__":
+    main()
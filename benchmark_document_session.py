@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: file opens and bytes read per extraction run.
+
+"Per stage" replays how a run used the PDF before DocumentSession: the
+analyzer, the router, every page's render plan and poppler render, the
+post-processor and the MD5 each opened the file themselves. "Session" is a
+PDFProcessor.process() run, where every stage reads from one DocumentSession.
+Model requests are stubbed out.
+
+Opens are counted on open() and fitz.open(path). Bytes come from the
+process's read syscalls (/proc/self/io rchar); poppler runs as a separate
+process, so each of its renders is counted as one open reading the whole
+file (it is stubbed here, poppler may not be installed).
+
+Usage:
+    python benchmark_document_session.py                  # synthetic 20-page form
+    python benchmark_document_session.py path/to/form.pdf
+"""
+
+import builtins
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.analyzer import PDFAnalyzer, detect_page_images
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor
+from pdfpower_extractor.core.processor import PDFProcessor
+
+RESPONSE = {
+    "choices": [{"message": {"content": "### Section\n- Name: Jan"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1200, "completion_tokens": 40},
+}
+
+
+def build_pdf(path: str, pages: int = 20) -> None:
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        for row in range(35):
+            y = 60 + row * 20
+            page.insert_text((50, y), f"{row + 1}. Question {number + 1}.{row + 1} about the applicant", fontsize=9)
+            page.draw_rect(fitz.Rect(450, y - 9, 459, y))
+    doc.save(path)
+
+
+class IOCounter:
+    """Counts opens of one file and bytes read by this process"""
+
+    def __init__(self, pdf_path: str):
+        self.pdf_path = os.path.abspath(pdf_path)
+        self.size = os.path.getsize(pdf_path)
+        self.opens = 0
+        self.external_bytes = 0
+
+    @staticmethod
+    def rchar() -> int:
+        with open("/proc/self/io") as f:
+            return int(next(line for line in f if line.startswith("rchar")).split()[1])
+
+    def install(self):
+        real_open, real_fitz_open = builtins.open, fitz.open
+        counter = self
+
+        def counting_open(file, *args, **kwargs):
+            if isinstance(file, (str, os.PathLike)) and os.path.abspath(file) == counter.pdf_path:
+                counter.opens += 1
+            return real_open(file, *args, **kwargs)
+
+        def counting_fitz_open(filename=None, *args, **kwargs):
+            if isinstance(filename, (str, os.PathLike)) and os.path.abspath(filename) == counter.pdf_path:
+                counter.opens += 1
+            return real_fitz_open(filename, *args, **kwargs)
+
+        def poppler_render(pdf_path, first_page, last_page, dpi, **kwargs):
+            counter.opens += 1
+            counter.external_bytes += counter.size
+            with real_fitz_open(pdf_path) as doc:
+                rect = doc[first_page - 1].rect
+            return [Image.new("L", (round(rect.width * dpi / 72), round(rect.height * dpi / 72)), 255)]
+
+        builtins.open, fitz.open = counting_open, counting_fitz_open
+        extractor_module.convert_from_path = poppler_render
+        self._restore = (real_open, real_fitz_open)
+
+    def uninstall(self):
+        builtins.open, fitz.open = self._restore
+
+
+def per_stage_run(pdf_path: str, config: ExtractionConfig) -> None:
+    """The pre-session run: every stage opens the PDF itself"""
+    summary = PDFAnalyzer(pdf_path).analyze()
+    extractor = AIExtractor(api_key="test", config=config, model_config=config.get_model_config())
+    extractor._make_request_with_retry = lambda *args: RESPONSE
+    with fitz.open(pdf_path) as doc:  # routing: cost prediction
+        _ = [len(doc[i].get_text()) for i in range(len(doc))]
+    for page_num in range(1, summary["total_pages"] + 1):
+        extractor.extract_page(pdf_path, page_num, use_markdown=True)
+    with fitz.open(pdf_path) as doc:  # post-processing: image comments
+        _ = [detect_page_images(doc, i) for i in range(len(doc))]
+    md5 = hashlib.md5()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            md5.update(chunk)
+
+
+def session_run(pdf_path: str, config: ExtractionConfig) -> None:
+    processor = PDFProcessor(pdf_path, config=config)
+    processor.ai_extractor._make_request_with_retry = lambda *args: RESPONSE
+    processor.process()
+
+
+def measure(run, pdf_path: str) -> tuple:
+    config = ExtractionConfig()
+    config.validation.validate_output = False
+    counter = IOCounter(pdf_path)
+    counter.install()
+    try:
+        before = IOCounter.rchar()
+        start = time.perf_counter()
+        run(pdf_path, config)
+        elapsed = time.perf_counter() - start
+        read = IOCounter.rchar() - before + counter.external_bytes
+    finally:
+        counter.uninstall()
+    return counter.opens, read, elapsed
+
+
+def main():
+    if len(sys.argv) > 1:
+        pdf_path = sys.argv[1]
+    else:
+        pdf_path = os.path.join(tempfile.mkdtemp(), "form.pdf")
+        build_pdf(pdf_path)
+    size = os.path.getsize(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        pages = len(doc)
+
+    runs = (("per stage", per_stage_run), ("session", session_run))
+    for _, run in runs:  # warm-up: lazy imports read files too
+        measure(run, pdf_path)
+    results = {name: measure(run, pdf_path) for name, run in runs}
+
+    print("=" * 64)
+    print(f"DOCUMENT SESSION BENCHMARK ({pages} pages, {size / 1024:.0f} KB)")
+    print("=" * 64)
+    print(f"{'Run':<10} {'File opens':>11} {'Bytes read':>14} {'x file size':>12} {'Time s':>8}")
+    for name, (opens, read, elapsed) in results.items():
+        print(f"{name:<10} {opens:>11} {read:>14,} {read / size:>12.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
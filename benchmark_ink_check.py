@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: thumbnail ink check vs get_text() for page classification.
+
+Builds a synthetic document with blank, text and scanned (image-only) pages
+and reports the per-page cost of each check plus the resulting classification.
+
+Usage:
+    python benchmark_ink_check.py            # 300 pages
+    python benchmark_ink_check.py 1000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from pdfpower_extractor.core.analyzer import (
+    PDFAnalyzer,
+    page_ink_coverage,
+    NUMPY_AVAILABLE,
+)
+
+
+def build_corpus(pages: int) -> bytes:
+    """Every third page blank, text or scanned"""
+    scan_src = fitz.open()
+    scan_page = scan_src.new_page()
+    scan_page.insert_text((72, 100), "Scanned form: name, date, signature " * 3, fontsize=11)
+    scan = scan_page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        kind = i % 3
+        if kind == 1:
+            for line in range(40):
+                page.insert_text((72, 72 + line * 17), f"Line {line}: lorem ipsum dolor sit amet " * 2, fontsize=9)
+        elif kind == 2:
+            page.insert_image(page.rect, pixmap=scan)
+    return doc.tobytes()
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    data = build_corpus(pages)
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        start = time.perf_counter()
+        for page in doc:
+            page_ink_coverage(page)
+        ink_ms = (time.perf_counter() - start) / pages * 1000
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        start = time.perf_counter()
+        for page in doc:
+            page.get_text()
+        text_ms = (time.perf_counter() - start) / pages * 1000
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(data)
+    try:
+        start = time.perf_counter()
+        summary = PDFAnalyzer(f.name).analyze()
+        analyze_ms = (time.perf_counter() - start) / pages * 1000
+    finally:
+        os.unlink(f.name)
+
+    print("=" * 60)
+    print(f"INK CHECK BENCHMARK ({pages} pages, NumPy: {NUMPY_AVAILABLE})")
+    print("=" * 60)
+    print(f"Ink thumbnail check: {ink_ms:6.2f} ms/page")
+    print(f"get_text():          {text_ms:6.2f} ms/page")
+    print(f"Full analyze():      {analyze_ms:6.2f} ms/page")
+    print("-" * 60)
+    print(f"Empty pages:   {len(summary['empty_pages'])} (expected {len(range(0, pages, 3))})")
+    print(f"Text pages:    {len(summary['text_pages'])}")
+    print(f"Scanned pages: {len(summary['scanned_pages'])} (routed to AI)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: image size, encode time and image tokens with and without margin cropping.
+
+Renders every page at the model-aware DPI, once whole and once cropped to
+page_content_bbox(), encodes both as PNG and WEBP q75 and reports the totals.
+
+Usage:
+    python benchmark_margin_crop.py                      # synthetic form corpus
+    python benchmark_margin_crop.py path/to/form.pdf ... # your own PDFs
+"""
+
+import sys
+import time
+from io import BytesIO
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdfpower_extractor.core.analyzer import page_content_bbox
+from pdfpower_extractor.core.extractor import crop_to_box
+from pdfpower_extractor.core.sizing import choose_render_size
+from pdfpower_extractor.models.config import get_model_config
+
+FORMATS = (("PNG", {}), ("WEBP", {"quality": 75}))
+
+
+def build_corpus() -> fitz.Document:
+    """Short forms with wide margins and blank bottoms, one full page, one scan"""
+    doc = fitz.open()
+    for rows in (8, 14, 20):
+        page = doc.new_page()
+        for row in range(rows):
+            y = 110 + row * 20
+            page.insert_text((90, y), f"{row + 1}. Applicant detail {row + 1}:", fontsize=9)
+            page.draw_line((260, y + 2), (500, y + 2))
+
+    page = doc.new_page()
+    for row in range(42):
+        page.insert_text((40, 50 + row * 18), f"Terms and conditions, paragraph {row + 1} " * 2, fontsize=8)
+
+    scan_src = fitz.open()
+    scan_page = scan_src.new_page()
+    for row in range(12):
+        scan_page.insert_text((100, 120 + row * 20), f"Scanned answer {row + 1}", fontsize=10)
+    scan = scan_page.get_pixmap(dpi=150, colorspace=fitz.csRGB)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), pixmap=scan)
+    return doc
+
+
+def encode(image: Image.Image, fmt: str, options: dict) -> tuple:
+    start = time.perf_counter()
+    buffer = BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.tell(), time.perf_counter() - start
+
+
+def main():
+    docs = [fitz.open(path) for path in sys.argv[1:]] or [build_corpus()]
+    model = get_model_config("gemini_flash")
+
+    totals = {(variant, fmt): [0, 0.0] for variant in ("full", "cropped") for fmt, _ in FORMATS}
+    pixels = {"full": 0, "cropped": 0}
+    tokens = {"full": 0, "cropped": 0}
+    cropped_pages = 0
+    pages = 0
+
+    for doc in docs:
+        for page in doc:
+            pages += 1
+            crop = page_content_bbox(page)
+            cropped_pages += crop is not None
+            for variant, area in (("full", page.rect), ("cropped", crop or page.rect)):
+                size = choose_render_size(area.width, area.height, model.image_tokens)
+                pix = page.get_pixmap(dpi=size.dpi, colorspace=fitz.csRGB, alpha=False)
+                image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                if variant == "cropped" and crop is not None:
+                    image = crop_to_box(image, tuple(crop), size.dpi)
+                pixels[variant] += image.width * image.height
+                tokens[variant] += size.image_tokens
+                for fmt, options in FORMATS:
+                    size_bytes, seconds = encode(image, fmt, options)
+                    totals[(variant, fmt)][0] += size_bytes
+                    totals[(variant, fmt)][1] += seconds
+
+    print("=" * 70)
+    print(f"MARGIN CROP BENCHMARK ({pages} pages, {cropped_pages} cropped, {model.name} sizing)")
+    print("=" * 70)
+    print(f"{'Variant':<8} {'Format':<6} {'Mpx/page':>9} {'KB/page':>9} {'Encode ms/page':>15} {'Img tokens/page':>16}")
+    for variant in ("full", "cropped"):
+        for fmt, _ in FORMATS:
+            size_bytes, seconds = totals[(variant, fmt)]
+            print(f"{variant:<8} {fmt:<6} {pixels[variant] / pages / 1e6:>9.2f} {size_bytes / pages / 1024:>9.1f} "
+                  f"{seconds / pages * 1000:>15.1f} {tokens[variant] / pages:>16.0f}")
+    print("-" * 70)
+    for fmt, _ in FORMATS:
+        full_bytes, full_seconds = totals[("full", fmt)]
+        crop_bytes, crop_seconds = totals[("cropped", fmt)]
+        print(f"{fmt}: bytes {(crop_bytes / full_bytes - 1) * 100:+.1f}%, "
+              f"encode time {(crop_seconds / full_seconds - 1) * 100:+.1f}%")
+    print(f"Image tokens: {(tokens['cropped'] / tokens['full'] - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
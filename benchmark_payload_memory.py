@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory per in-flight page for building the request body.
+
+Compares the previous path (base64 bytes -> str -> data: URL f-string ->
+dict -> json.dumps -> UTF-8 encode, as requests' json= does) with
+RequestBody, which base64-encodes the image straight into one preallocated
+buffer (core/payload.py). Memory is measured with tracemalloc, starting
+from the encoded page image; the body is then read out in 8 KB blocks the
+way the HTTP client sends it.
+
+Usage:
+    python benchmark_payload_memory.py
+"""
+
+import base64
+import json
+import os
+import time
+import tracemalloc
+
+from PIL import Image
+
+from pdfpower_extractor.core.encoding import PayloadEncoder
+from pdfpower_extractor.core.payload import ImageDataURL, RequestBody
+
+SEND_BLOCK = 8192
+
+
+def page_image(width: int, height: int) -> Image.Image:
+    """Scan-like page: noise compresses poorly, like real scans"""
+    return Image.frombytes("L", (width, height), os.urandom(width * height)).convert("RGB")
+
+
+def payload(image_url) -> dict:
+    return {
+        "model": "google/gemini-2.5-flash",
+        "messages": [
+            {"role": "system", "content": "You are a STRICT FORM DATA EXTRACTOR."},
+            {"role": "user", "content": [
+                {"type": "text", "text": "Extract form data from this page as structured Markdown."},
+                {"type": "image_url", "image_url": {"url": image_url}},
+            ]},
+        ],
+        "temperature": 0.0,
+        "max_tokens": 4000,
+    }
+
+
+def send(body) -> int:
+    """Read the body like http.client does"""
+    if isinstance(body, bytes):
+        return sum(len(body[i:i + SEND_BLOCK]) for i in range(0, len(body), SEND_BLOCK))
+    reader = body.reader()
+    sent = 0
+    while True:
+        block = reader.read(SEND_BLOCK)
+        if not block:
+            return sent
+        sent += len(block)
+
+
+def previous_path(data: bytes, mime: str) -> int:
+    img_base64 = base64.b64encode(data).decode("utf-8")
+    url = f"data:{mime};base64,{img_base64}"
+    body = json.dumps(payload(url), allow_nan=False).encode("utf-8")
+    return send(body)
+
+
+def request_body_path(data: bytes, mime: str) -> int:
+    body = RequestBody(payload(ImageDataURL(data, mime)))
+    return send(body)
+
+
+def measure(build, data: bytes, mime: str) -> tuple:
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    size = build(data, mime)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - base, elapsed, size
+
+
+def main():
+    print("=" * 74)
+    print("PAYLOAD MEMORY BENCHMARK (peak bytes above the encoded image, per page)")
+    print("=" * 74)
+    print(f"{'Page':<22} {'Image MB':>9} {'Path':<13} {'Peak MB':>8} {'x image':>8} {'Time ms':>8}")
+    for label, (width, height), fmt in (
+        ("A4 150 DPI (PNG)", (1240, 1754), "png"),
+        ("A4 150 DPI (WEBP q90)", (1240, 1754), "webp_lossy"),
+        ("A3 150 DPI (PNG)", (1754, 2481), "png"),
+    ):
+        rendition = PayloadEncoder(page_image(width, height), fmt, 90).fit()
+        data = rendition.data
+        for name, build in (("previous", previous_path), ("RequestBody", request_body_path)):
+            peak, elapsed, size = measure(build, data, rendition.mime)
+            print(f"{label:<22} {len(data) / 1e6:>9.2f} {name:<13} {peak / 1e6:>8.2f} "
+                  f"{peak / len(data):>8.2f} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
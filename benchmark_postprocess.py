@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-page post-processing of large outputs.
+
+"previous" replays the post-processing a page went through before
+core/postprocess.py: normalize_radio_buttons, _summarize_page (two passes,
+regexes compiled per line), _extract_form_id (another pass) and the compact
+date normalization, each over the cleaned page. "single pass" is
+postprocess_page(). Both must produce the same content, summary and
+FORM_ID for every page; the benchmark checks that before timing.
+
+Usage:
+    python benchmark_postprocess.py               # 1,000 pages x 150 lines
+    python benchmark_postprocess.py 200 400       # pages, lines per page
+"""
+
+import random
+import re
+import sys
+import time
+from typing import Optional
+
+from pdfpower_extractor.core.postprocess import postprocess_page
+
+REPEATS = 3
+
+
+def legacy_normalize_radio_buttons(content: str) -> str:
+    lines = content.split('\n')
+    normalized = []
+    for line in lines:
+        if '◉' in line:
+            line = re.sub(r'\s*\(x\)\s*$', '', line)
+            line = line.replace('◉', '(x)')
+        if '○' in line:
+            line = re.sub(r'\s*\(\s*\)\s*$', '', line)
+            line = line.replace('○', '( )')
+        normalized.append(line)
+    return '\n'.join(normalized)
+
+
+class LegacyPostProcessor:
+    """The PDFProcessor helpers as they were, verbatim"""
+
+    def __init__(self):
+        self._compact_date_pattern = re.compile(
+            r"\b(?P<day>0[1-9]|[12][0-9]|3[01])"
+            r"(?P<month>0[1-9]|1[0-2])"
+            r"(?P<year>(19|20)\d{2})\b"
+        )
+
+    def _normalize_compact_dates(self, text: str) -> str:
+        """
+        Insert dashes into compact DDMMYYYY date strings to enforce dd-mm-yyyy format.
+        """
+        def _repl(match: re.Match) -> str:
+            return f"{match.group('day')}-{match.group('month')}-{match.group('year')}"
+
+        return self._compact_date_pattern.sub(_repl, text)
+
+    def _is_application_code(self, text: str) -> bool:
+        """
+        Check if text matches application code pattern: XXX-XXX-XXXX
+        where X is alphanumeric (3-3-4 format).
+
+        Examples: K75-19Z-RZLT
+        """
+        pattern = r'^[A-Z0-9]{3}-[A-Z0-9]{3}-[A-Z0-9]{4}$'
+        return bool(re.match(pattern, text.strip(), re.IGNORECASE))
+
+    def _is_doc_identity_code(self, text: str) -> bool:
+        """
+        Check if text starts with DOC IDENTITY prefix.
+
+        Examples: DOC IDENTITY 0109 PASSPORT SPONSOR 2/2
+        """
+        return text.strip().upper().startswith("DOC IDENTITY")
+
+    def _parse_doc_identity_description(self, text: str) -> str:
+        """
+        Extract descriptive text from DOC IDENTITY lines.
+
+        Example:
+            Input: "DOC IDENTITY 0109 PASSPORT SPONSOR 2/2"
+            Output: "PASSPORT SPONSOR 2/2"
+        """
+        if not self._is_doc_identity_code(text):
+            return text
+
+        # Remove "DOC IDENTITY" prefix and numeric code
+        # Pattern: DOC IDENTITY <digits> <description>
+        pattern = r'^DOC\s+IDENTITY\s+\d+\s+'
+        result = re.sub(pattern, '', text.strip(), flags=re.IGNORECASE)
+        return result.strip()
+
+    def _extract_form_id(self, text: str) -> Optional[str]:
+        """
+        Extract real form ID from page content, excluding DOC IDENTITY codes
+        and application codes.
+
+        Returns:
+            Form ID string if found (e.g., "B07001", "7103-03"), None otherwise
+        """
+        if not text:
+            return None
+
+        # Look for FORM_ID pattern in the text
+        # Pattern: **FORM_ID**: `xxx` or FORM_ID**: `xxx`
+        for line in text.splitlines():
+            line = line.strip()
+
+            # Match FORM_ID pattern with backticks
+            match = re.search(r'\*\*FORM_ID\*\*:\s*`([^`]+)`', line)
+            if not match:
+                # Try without ** prefix
+                match = re.search(r'FORM_ID\*\*:\s*`([^`]+)`', line)
+
+            if match:
+                form_id = match.group(1).strip()
+
+                # Exclude DOC IDENTITY codes
+                if self._is_doc_identity_code(form_id):
+                    return None
+
+                # Exclude application codes (XXX-XXX-XXXX pattern)
+                if self._is_application_code(form_id):
+                    return None
+
+                # Return real form ID
+                return form_id
+
+        return None
+
+    def _summarize_page(self, text: str) -> str:
+        """
+        Build a short one-line summary for a page from its extracted content.
+        Prefers PAGE_TYPE if available (AI-generated page classification).
+        Otherwise skips metadata lines (FORM_ID, PAGE_IMAGES, TOC markers)
+        and extracts meaningful content.
+        """
+        if not text or not text.strip():
+            return "Empty page"
+
+        # First pass: look for PAGE_TYPE (AI-generated page classification)
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if "PAGE_TYPE" in line and "`" in line:
+                match = re.search(r'`([^`]+)`', line)
+                if match:
+                    page_type = match.group(1).strip()
+                    if page_type:
+                        return page_type[:120]
+
+        # Second pass: extract from content (fallback if no PAGE_TYPE)
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+
+            # Skip empty lines and HTML comments
+            if not line or line.startswith("<!--"):
+                continue
+
+            # Skip PAGE_TYPE lines (we already checked these above)
+            if "PAGE_TYPE" in line:
+                continue
+
+            # Skip FORM_ID lines - these are metadata, not content descriptions
+            # But check if it's a DOC IDENTITY code first - extract descriptive text
+            if "FORM_ID" in line and "`" in line:
+                # Extract the value between backticks (handle empty backticks)
+                match = re.search(r'`([^`]*)`', line)
+                if match:
+                    form_id_value = match.group(1).strip()
+
+                    # Skip empty form IDs
+                    if not form_id_value:
+                        continue
+
+                    # If it's a DOC IDENTITY code, extract descriptive text
+                    if self._is_doc_identity_code(form_id_value):
+                        description = self._parse_doc_identity_description(form_id_value)
+                        if description:
+                            return description[:120]
+
+                    # If it's an application code, skip this line
+                    if self._is_application_code(form_id_value):
+                        continue
+
+                    # Otherwise it's metadata (real form ID), skip to find content
+                    continue
+                else:
+                    # Line has FORM_ID but no backticks - skip it
+                    continue
+
+            # Remove common markdown prefixes and bullets
+            clean_line = line.lstrip("#").lstrip("*").lstrip("-").strip()
+            clean_line = clean_line.strip("*").strip()
+
+            # Check for explicit empty page indicators
+            if clean_line.lower() in {"this page is empty", "page is empty"}:
+                return "Empty page"
+
+            # Return first meaningful content line
+            if clean_line:
+                summary = clean_line[:120]
+                # Strip leading section numbers:
+                # - "1. ", "2. " (number + period + space)
+                # - "1 ", "2 " (number + space, no period)
+                # - "1.2 ", "4.2.1 " (nested numbering)
+                # - "1A. ", "2B. " (number + letter + period)
+                summary = re.sub(r'^\d+(\.\d+)*[A-Z]?\.?\s+', '', summary)
+                return summary
+
+        return "Empty page"
+
+    def page(self, content: str) -> tuple:
+        content = legacy_normalize_radio_buttons(content)
+        body = content.splitlines()
+        while body and not body[0].strip():
+            body = body[1:]
+        while body and body[0].lstrip().startswith("==="):
+            body = body[1:]
+        cleaned = "\n".join(body).strip()
+        return (
+            self._normalize_compact_dates(cleaned),
+            self._summarize_page(cleaned),
+            self._extract_form_id(cleaned),
+        )
+
+
+def single_pass(content: str) -> tuple:
+    page = postprocess_page(content)
+    return page.content, page.summary, page.form_id
+
+
+def synthetic_page(rng: random.Random, page_num: int, lines: int) -> str:
+    """Form-like extraction output: sections, fields, radio groups, dates"""
+    out = ["", "=== EXTRACTED PAGE ===", ""]
+    if rng.random() < 0.7:
+        out.append(f"**FORM_ID**: `{rng.choice(['B0700', '7103-0', 'K75-19Z-RZL'])}{page_num % 10}`")
+    for n in range(lines):
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(f"## {n // 10 + 1}. Section {n // 10 + 1} about the applicant")
+        elif kind < 0.3:
+            out.append(f"- ◉ Option {n} (x)" if rng.random() < 0.3 else f"- ○ Option {n} ( )")
+        elif kind < 0.4:
+            out.append(f"- Date of birth: `{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}{rng.randint(1950, 2005)}`")
+        elif kind < 0.45:
+            out.append("")
+        else:
+            out.append(f"### {n // 10 + 1}.{n % 10} Field label number {n}\nvalue: `Answer {n} for the field`")
+    if rng.random() < 0.5:
+        out.append(f"**PAGE_TYPE**: `Questionnaire part {page_num}`")
+    return "\n".join(out)
+
+
+def timed(run, pages) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for content in pages:
+            run(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    rng = random.Random(7)
+    pages = [synthetic_page(rng, n + 1, lines) for n in range(page_count)]
+    size = sum(len(p.encode("utf-8")) for p in pages)
+
+    legacy = LegacyPostProcessor()
+    for content in pages:
+        assert legacy.page(content) == single_pass(content), "outputs differ"
+
+    previous = timed(legacy.page, pages)
+    current = timed(single_pass, pages)
+
+    print("=" * 64)
+    print(f"POST-PROCESSING BENCHMARK ({page_count} pages, {size / 1e6:.1f} MB, best of {REPEATS})")
+    print("=" * 64)
+    print(f"{'Path':<14} {'Total s':>9} {'ms/page':>9} {'MB/s':>8}")
+    for name, elapsed in (("previous", previous), ("single pass", current)):
+        print(f"{name:<14} {elapsed:>9.3f} {elapsed / page_count * 1000:>9.3f} {size / 1e6 / elapsed:>8.1f}")
+    print(f"Speedup: {previous / current:.2f}x (outputs identical)")
+
+
+if __name__ == "__main__":
+    main()
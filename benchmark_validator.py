@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark: output validation of large extraction backlogs.
+
+"previous" is OutputValidator.validate() as it was before the rule engine
+(regexes looked up per call, IGNORECASE searches, a per-line radio group
+loop), kept verbatim below. "engine" is the current OutputValidator. Both
+must report the same issues and stats for every page; the benchmark checks
+that before timing. With more than one CPU, validate_batch() is also timed
+across a process pool.
+
+Usage:
+    python benchmark_validator.py               # 2,000 pages x 150 lines
+    python benchmark_validator.py 500 300       # pages, lines per page
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from typing import Optional
+
+from pdfpower_extractor.core.validator import (
+    OutputValidator,
+    ValidationResult,
+    ValidationSeverity,
+)
+
+REPEATS = 3
+
+
+class LegacyOutputValidator(OutputValidator):
+    """validate() and _check_radio_group_balance() as they were, verbatim"""
+
+    HALLUCINATION_PATTERNS = [
+        (r'I cannot\s+', "LLM refusal pattern"),
+        (r'I\'m unable\s+', "LLM refusal pattern"),
+        (r'As an AI\s+', "LLM self-reference"),
+        (r'I don\'t have access\s+', "LLM limitation statement"),
+        (r'unfortunately\s+', "Apologetic language"),
+        (r'\[placeholder\]', "Placeholder text"),
+        (r'\[insert\s+', "Insert placeholder"),
+        (r'lorem ipsum', "Lorem ipsum placeholder"),
+    ]
+
+    def validate(self, output: str, page_num: Optional[int] = None) -> ValidationResult:
+        """
+        Validate extraction output.
+
+        Args:
+            output: The extracted text output
+            page_num: Optional page number for location reporting
+
+        Returns:
+            ValidationResult with issues found
+        """
+        result = ValidationResult(is_valid=True)
+        location_prefix = f"Page {page_num}" if page_num else "Output"
+
+        # Track stats
+        result.stats = {
+            "length": len(output),
+            "lines": output.count('\n') + 1,
+            "question_ids": 0,
+            "radio_options": 0,
+            "checkbox_options": 0,
+        }
+
+        # Check 1: Empty or too short
+        if not output or not output.strip():
+            result.add_issue(
+                ValidationSeverity.ERROR,
+                "EMPTY_OUTPUT",
+                "Output is empty",
+                location_prefix
+            )
+            return result
+
+        if len(output.strip()) < self.min_content_length:
+            result.add_issue(
+                ValidationSeverity.WARNING if not self.strict_mode else ValidationSeverity.ERROR,
+                "SHORT_OUTPUT",
+                f"Output is very short ({len(output)} chars, expected >= {self.min_content_length})",
+                location_prefix
+            )
+
+        # Check 2: Question IDs present
+        found_ids = set(self.QUESTION_ID_PATTERN.findall(output))
+        result.stats["question_ids"] = len(found_ids)
+
+        for expected_id in self.expected_question_ids:
+            if expected_id not in found_ids:
+                result.add_issue(
+                    ValidationSeverity.WARNING,
+                    "MISSING_QUESTION",
+                    f"Expected question {expected_id} not found",
+                    location_prefix
+                )
+
+        # Check 3: Radio/checkbox groups
+        radio_matches = self.RADIO_PATTERN.findall(output) + self.MARKDOWN_RADIO_PATTERN.findall(output)
+        checkbox_matches = self.CHECKBOX_PATTERN.findall(output) + self.MARKDOWN_CHECKBOX_PATTERN.findall(output)
+
+        result.stats["radio_options"] = len(radio_matches)
+        result.stats["checkbox_options"] = len(checkbox_matches)
+
+        # Check 4: Hallucination patterns
+        for pattern, description in self.HALLUCINATION_PATTERNS:
+            if re.search(pattern, output, re.IGNORECASE):
+                result.add_issue(
+                    ValidationSeverity.ERROR,
+                    "HALLUCINATION_DETECTED",
+                    f"Suspicious pattern found: {description}",
+                    location_prefix
+                )
+
+        # Check 5: Encoding issues
+        for pattern, description in self.ENCODING_ISSUES:
+            matches = re.findall(pattern, output)
+            if matches:
+                result.add_issue(
+                    ValidationSeverity.WARNING,
+                    "ENCODING_ISSUE",
+                    f"{description} ({len(matches)} occurrences)",
+                    location_prefix
+                )
+
+        # Check 6: Balanced radio groups (each group should have options)
+        self._check_radio_group_balance(output, result, location_prefix)
+
+        return result
+
+    def _check_radio_group_balance(self, output: str, result: ValidationResult, location: str):
+        """Check that radio groups have reasonable structure"""
+        lines = output.split('\n')
+
+        in_radio_group = False
+        radio_count = 0
+        selected_count = 0
+
+        for line in lines:
+            line = line.strip()
+
+            # Detect radio option
+            is_selected = bool(re.match(r'^[●◉]', line) or re.match(r'^\(x\)', line))
+            is_unselected = bool(re.match(r'^[○◯]', line) or re.match(r'^\( \)', line))
+
+            if is_selected or is_unselected:
+                if not in_radio_group:
+                    in_radio_group = True
+                    radio_count = 0
+                    selected_count = 0
+
+                radio_count += 1
+                if is_selected:
+                    selected_count += 1
+            else:
+                # End of radio group
+                if in_radio_group:
+                    if radio_count > 0 and selected_count > 1:
+                        result.add_issue(
+                            ValidationSeverity.WARNING,
+                            "MULTIPLE_RADIO_SELECTED",
+                            f"Radio group has {selected_count} selected options (should be 0 or 1)",
+                            location
+                        )
+                    in_radio_group = False
+
+
+def issues(result: ValidationResult) -> tuple:
+    return (
+        result.is_valid,
+        [(i.severity, i.code, i.message, i.location) for i in result.issues],
+        result.stats,
+    )
+
+
+def synthetic_page(rng: random.Random, page_num: int, lines: int) -> str:
+    """Form-like extraction output with radio groups and the odd suspicious line"""
+    out = [f"**FORM_ID**: `B0700{page_num % 10}`"]
+    for n in range(lines):
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(f"## {n // 10 + 1}. Section about the applicant")
+        elif kind < 0.3:
+            # Radio groups of 2-4 options, occasionally with two selected
+            for option in range(rng.randint(2, 4)):
+                out.append(f"{'(x)' if rng.random() < 0.3 else '( )'} Option {option}")
+            out.append("")
+        elif kind < 0.35:
+            out.append(f"[{'x' if rng.random() < 0.5 else ' '}] Checkbox {n}")
+        elif kind < 0.36:
+            out.append(rng.choice([
+                "Unfortunately the field is illegible.",
+                "Name: [placeholder]",
+                "Caf\\u00e9 &amp; bar",
+                "Value: �",
+            ]))
+        else:
+            out.append(f"### {n // 10 + 1}.{n % 10} Field label number {n}\nvalue: `Answer {n}`")
+    return "\n".join(out)
+
+
+def timed(run) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    rng = random.Random(7)
+    outputs = {n + 1: synthetic_page(rng, n + 1, lines) for n in range(page_count)}
+    size = sum(len(p.encode("utf-8")) for p in outputs.values())
+
+    legacy = LegacyOutputValidator()
+    engine = OutputValidator()
+    for page_num, output in outputs.items():
+        assert issues(legacy.validate(output, page_num)) == issues(engine.validate(output, page_num)), \
+            f"results differ on page {page_num}"
+
+    rows = [
+        ("previous", timed(lambda: [legacy.validate(o, p) for p, o in outputs.items()])),
+        ("engine", timed(lambda: engine.validate_batch(outputs))),
+    ]
+    workers = os.cpu_count() or 1
+    if workers > 1:
+        rows.append((f"engine x{workers} procs", timed(lambda: engine.validate_batch(outputs, workers=workers))))
+
+    print("=" * 64)
+    print(f"VALIDATION BENCHMARK ({page_count} pages, {size / 1e6:.1f} MB, best of {REPEATS})")
+    print("=" * 64)
+    print(f"{'Path':<18} {'Total s':>9} {'ms/page':>9} {'MB/s':>8}")
+    for name, elapsed in rows:
+        print(f"{name:<18} {elapsed:>9.3f} {elapsed / page_count * 1000:>9.3f} {size / 1e6 / elapsed:>8.1f}")
+    print(f"Speedup: {rows[0][1] / rows[1][1]:.2f}x single process (results identical)")
+
+
+if __name__ == "__main__":
+    main()
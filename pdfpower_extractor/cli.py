@@ -72,7 +72,9 @@ def parse_pages_parameter(pages_str: str) -> List[int]:
 @click.option('--force', '-f', is_flag=True, help='Force regeneration even if cached')
 @click.option('--pages', help='Pages to extract (e.g., "1,3,5" or "2-7" or "1,3-5,8")')
 @click.option('--debug-save-images', is_flag=True, help='Save converted images to /tmp/powerpdf_extracted_images/ for debugging')
-def extract(pdf_path, output, model, force, pages, debug_save_images):
+@click.option('--cache-dir', envvar='PDFPOWER_CACHE_DIR', help='Page result cache directory; unchanged pages of revised PDFs are reused')
+@click.option('--page-index', is_flag=True, help='Also write <output>.index.json with the byte offset of every page section')
+def extract(pdf_path, output, model, force, pages, debug_save_images, cache_dir, page_index):
     """Extract text from PDF preserving form field relationships"""
     
     # Check if model is supported
@@ -109,7 +111,12 @@ def extract(pdf_path, output, model, force, pages, debug_save_images):
     try:
         # Create extraction config with selected model
         from .core.config import ExtractionConfig
-        config = ExtractionConfig(model_config_id=model)
+        config = ExtractionConfig(
+            model_config_id=model,
+            cache_dir=cache_dir,
+            refresh_cache=force,
+            write_page_index=page_index,
+        )
 
         processor = PDFProcessor(pdf_path, config=config, api_key=api_key)
 
@@ -117,28 +124,33 @@ def extract(pdf_path, output, model, force, pages, debug_save_images):
         audit_retention_env = os.getenv("PDFPOWER_AUDIT_RETENTION_HOURS")
         audit_retention = int(audit_retention_env) if audit_retention_env else 24
 
-         # Process the PDF
+        if not output:
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            output = f"extracted-{timestamp}.txt"
+
+         # Process the PDF, streaming pages to the output file as they complete
         with click.progressbar(length=100, label='Processing') as bar:
-            result = processor.process(
+            processor.process(
                 progress_callback=lambda p: bar.update(p - bar.pos),
                 debug_save_images=debug_save_images,
                 audit_log_path=audit_log_path,
                 audit_retention_hours=audit_retention if audit_log_path else None,
                 selected_pages=selected_pages,
+                output_path=output,
             )
         
-        # Save results
-        if not output:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            output = f"extracted-{timestamp}.txt"
-        
-        processor.save_results(result, output)
-        
         # Show summary
         click.echo(f"\n✅ Extraction complete!")
         click.echo(f"📊 Cost: ${processor.last_cost:.4f}")
+        usage = processor.total_token_usage
+        click.echo(f"🗄️  Prompt cache: {usage.cached_input_tokens:,}/{usage.input_tokens:,} input tokens ({usage.cache_hit_rate:.1%} hit rate)")
+        if processor.page_truncations:
+            pages = ", ".join(str(p) for p in sorted(processor.page_truncations))
+            click.echo(f"✂️  Truncated pages (continued): {pages}")
         click.echo(f"⏱️  Time: {processor.last_duration:.1f}s")
         click.echo(f"💾 Saved to: {output}")
+        if page_index:
+            click.echo(f"🗂️  Page index: {output}.index.json")
         
     except Exception as e:
         click.echo(f"❌ Error: {str(e)}")
@@ -159,6 +171,7 @@ def analyze(pdf_path):
         click.echo(f"Total pages: {summary['total_pages']}")
         click.echo(f"Pure text pages: {len(summary['text_pages'])} ({summary['text_percentage']:.1f}%)")
         click.echo(f"Form field pages: {len(summary['form_pages'])} ({summary['form_percentage']:.1f}%)")
+        click.echo(f"Scanned pages: {len(summary['scanned_pages'])}")
         click.echo(f"Empty pages: {len(summary['empty_pages'])}")
         
         click.echo(f"\n💰 Cost Estimates (using {DEFAULT_MODEL}):")
@@ -4,11 +4,13 @@ from .config import (
     ExtractionConfig,
     LLMConfig,
     ValidationConfig,
+    CascadeTier,
     # Presets (all GDPR compliant - EU only)
     gemini_config,
     qwen_config,
     mistral_config,
     nemotron_config,
+    cascade_config,
     # Backwards compatibility
     gemini_flash_config,
     qwen_vl_config,
@@ -27,6 +29,8 @@ from .validator import (
     ValidationResult,
     ValidationIssue,
     ValidationSeverity,
+    ValidationRule,
+    RuleRegistry,
 )
 from .errors import (
     ExtractionError,
@@ -41,11 +45,13 @@ __all__ = [
     "ExtractionConfig",
     "LLMConfig",
     "ValidationConfig",
+    "CascadeTier",
     # Config presets (all GDPR compliant - EU only)
     "gemini_config",
     "qwen_config",
     "mistral_config",
     "nemotron_config",
+    "cascade_config",
     # Backwards compatibility
     "gemini_flash_config",
     "qwen_vl_config",
@@ -59,6 +65,8 @@ __all__ = [
     "ValidationResult",
     "ValidationIssue",
     "ValidationSeverity",
+    "ValidationRule",
+    "RuleRegistry",
     # Classes
     "AIExtractor",
     "PDFProcessor",
@@ -3,8 +3,69 @@ PDF Page Analyzer - Detects form fields vs pure text pages
 """
 
 import fitz  # PyMuPDF
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Iterator, Optional
+from PIL import Image
 from ..models.config import MODEL_CONFIGS, DEFAULT_MODEL
+from .prompts import get_system_prompt, get_vision_prompt
+from .sizing import DEFAULT_RENDER_DPI, render_dimensions
+from .session import DocumentSession, PDFSource, is_pdf_path
+
+# Optional NumPy support (fast ink coverage); falls back to pure Python
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Ink check: a tiny grayscale thumbnail is enough to tell blank from not blank
+INK_THUMBNAIL_DPI = 24        # A4 -> ~198x280 pixels
+INK_GRAY_THRESHOLD = 230      # Pixels darker than this count as ink (catches anti-aliased text)
+BLANK_INK_COVERAGE = 0.0005   # Pages without text or widgets and less ink than this (0.05%) are blank
+
+# Render colorspaces, from smallest to largest
+COLOR_MODE_BW = "bw"          # 1-bit black and white
+COLOR_MODE_GRAY = "gray"      # 8-bit grayscale
+COLOR_MODE_RGB = "rgb"
+COLOR_CHROMA_TOLERANCE = 0.08  # Channel spread (0-1) still counted as neutral gray
+COLOR_PIXEL_SHARE = 0.001      # Share of colored thumbnail pixels that makes a page color
+
+# Margin crop: content bounding box plus padding
+CROP_PADDING_PT = 18.0        # Quarter inch kept around the content
+CROP_MIN_SAVING = 0.1         # Crops that remove less than 10% of the page are not worth it
+
+# Page size used for cost estimates
+A4_WIDTH_PT = 595.0
+A4_HEIGHT_PT = 842.0
+
+_INK_TABLE = bytes(1 if v < INK_GRAY_THRESHOLD else 0 for v in range(256))
+_INK_MASK = [255 if v < INK_GRAY_THRESHOLD else 0 for v in range(256)]
+
+
+def page_ink_coverage(page: fitz.Page, dpi: int = INK_THUMBNAIL_DPI) -> float:
+    """
+    Fraction of a page covered by ink, measured on a low-resolution grayscale render.
+
+    Unlike get_text(), this sees scanned (image-only) content and costs about
+    the same on every page, so it classifies blank pages without a text pass.
+
+    Args:
+        page: PyMuPDF page
+        dpi: Thumbnail resolution
+
+    Returns:
+        Ink coverage between 0.0 and 1.0
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    total = pix.width * pix.height
+    if not total:
+        return 0.0
+    if NUMPY_AVAILABLE:
+        pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+        return float(np.count_nonzero(pixels < INK_GRAY_THRESHOLD)) / total
+    return pix.samples.translate(_INK_TABLE).count(1) / total
 
 
 def detect_page_images(doc: fitz.Document, page_num: int) -> str:
@@ -23,84 +84,380 @@ def detect_page_images(doc: fitz.Document, page_num: int) -> str:
     # get_images(full=True) returns tuples:
     # (xref, smask, width, height, bpc, colorspace, alt_colorspace, name, filter, referencer)
     # Index 4 = bpc (bits per component), Index 5 = colorspace
-    images = page.get_images(full=True)
+    return describe_page_images(page.get_images(full=True))
+
+
+def describe_page_images(images: List[tuple]) -> str:
+    """
+    PAGE IMAGES comment for a page's get_images(full=True) entries.
 
+    Returns:
+        HTML comment string (see detect_page_images)
+    """
     if not images:
         return "<!-- PAGE IMAGES: 0 -->"
 
     image_descriptions = []
     for idx, img in enumerate(images, 1):
-        # Get colorspace and bpc directly from tuple - no image extraction needed!
-        bpc = img[4] if len(img) > 4 else 8
-        colorspace = img[5] if len(img) > 5 else ""
-
-        # Determine color mode based on colorspace string
-        # PyMuPDF returns strings: "DeviceGray", "DeviceRGB", "DeviceCMYK", "ICCBased", etc.
-        cs_lower = str(colorspace).lower()
-        if "gray" in cs_lower:
-            # Check if it's truly B&W or grayscale by looking at bpc
-            if bpc == 1:
-                color_mode = "BLACK_WHITE"
-            else:
-                color_mode = "GRAYSCALE"
-        elif "rgb" in cs_lower or "cmyk" in cs_lower or "icc" in cs_lower:
-            # ICCBased is typically a color profile (RGB/CMYK with ICC profile)
-            color_mode = "COLOR"
-        else:
-            color_mode = "UNKNOWN"
-
-        image_descriptions.append(f"IMAGE {idx}: {color_mode}")
+        image_descriptions.append(f"IMAGE {idx}: {image_color_mode(img)}")
 
     count = len(images)
     descriptions = " | ".join(image_descriptions)
     return f"<!-- PAGE IMAGES: {count} | {descriptions} -->"
 
 
+def image_color_mode(img: tuple) -> str:
+    """
+    Color mode of an image from its get_images(full=True) entry.
+
+    Returns:
+        "BLACK_WHITE", "GRAYSCALE", "COLOR" or "UNKNOWN"
+    """
+    # Get colorspace and bpc directly from tuple - no image extraction needed!
+    bpc = img[4] if len(img) > 4 else 8
+    colorspace = img[5] if len(img) > 5 else ""
+
+    # Determine color mode based on colorspace string
+    # PyMuPDF returns strings: "DeviceGray", "DeviceRGB", "DeviceCMYK", "ICCBased", etc.
+    cs_lower = str(colorspace).lower()
+    if "gray" in cs_lower:
+        # Check if it's truly B&W or grayscale by looking at bpc
+        if bpc == 1:
+            return "BLACK_WHITE"
+        return "GRAYSCALE"
+    if "rgb" in cs_lower or "cmyk" in cs_lower or "icc" in cs_lower:
+        # ICCBased is typically a color profile (RGB/CMYK with ICC profile)
+        return "COLOR"
+    return "UNKNOWN"
+
+
+def _vector_color_mode(color) -> str:
+    """Classify a drawing/widget color tuple (gray, RGB or CMYK floats) as bw, gray or rgb"""
+    if not color:
+        return COLOR_MODE_BW
+    if len(color) == 3:
+        if max(color) - min(color) > COLOR_CHROMA_TOLERANCE:
+            return COLOR_MODE_RGB
+        level = color[0]
+    elif len(color) == 4:
+        if max(color[:3]) > COLOR_CHROMA_TOLERANCE:
+            return COLOR_MODE_RGB
+        level = 1.0 - color[3]
+    else:
+        level = color[0]
+    if level <= COLOR_CHROMA_TOLERANCE or level >= 1.0 - COLOR_CHROMA_TOLERANCE:
+        return COLOR_MODE_BW
+    return COLOR_MODE_GRAY
+
+
+def _has_visible_chroma(page: fitz.Page, dpi: int = INK_THUMBNAIL_DPI) -> bool:
+    """True if a low-resolution RGB render shows colored pixels (e.g. a color photo)"""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    total = pix.width * pix.height
+    if not total:
+        return False
+    threshold = int(COLOR_CHROMA_TOLERANCE * 255)
+    if NUMPY_AVAILABLE:
+        pixels = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width * 3]
+        pixels = pixels.reshape(pix.height, pix.width, 3).astype(np.int16)
+        chroma = pixels.max(axis=2) - pixels.min(axis=2)
+        colored = int(np.count_nonzero(chroma > threshold))
+    else:
+        samples = pix.samples
+        colored = sum(
+            1 for r, g, b in zip(samples[0::3], samples[1::3], samples[2::3])
+            if max(r, g, b) - min(r, g, b) > threshold
+        )
+    return colored / total > COLOR_PIXEL_SHARE
+
+
+def page_color_mode(page: fitz.Page) -> str:
+    """
+    Choose the render colorspace for a page from the colors it actually uses.
+
+    Text, vector drawings and form widgets are read from the page; images
+    from their colorspace (see image_color_mode). RGB/CMYK images are often
+    grayscale scans, so those are confirmed on a small RGB thumbnail.
+
+    Returns:
+        COLOR_MODE_BW (1-bit), COLOR_MODE_GRAY (8-bit gray) or COLOR_MODE_RGB
+    """
+    mode = COLOR_MODE_BW
+    colors = []
+    for path in page.get_drawings():
+        colors.append(path.get("color"))
+        colors.append(path.get("fill"))
+    for widget in page.widgets():
+        colors.append(widget.fill_color)
+        colors.append(widget.border_color)
+        colors.append(widget.text_color)
+    for block in page.get_text("dict").get("blocks", []):
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                srgb = span.get("color", 0)
+                colors.append(((srgb >> 16 & 255) / 255, (srgb >> 8 & 255) / 255, (srgb & 255) / 255))
+
+    for color in colors:
+        color_mode = _vector_color_mode(color)
+        if color_mode == COLOR_MODE_RGB:
+            return COLOR_MODE_RGB
+        if color_mode == COLOR_MODE_GRAY:
+            mode = COLOR_MODE_GRAY
+
+    needs_chroma_check = False
+    for img in page.get_images(full=True):
+        image_mode = image_color_mode(img)
+        if image_mode == "COLOR":
+            needs_chroma_check = True
+        elif image_mode != "BLACK_WHITE":
+            mode = COLOR_MODE_GRAY
+    if needs_chroma_check:
+        if _has_visible_chroma(page):
+            return COLOR_MODE_RGB
+        mode = COLOR_MODE_GRAY
+    return mode
+
+
+def _ink_bbox(page: fitz.Page, dpi: int = INK_THUMBNAIL_DPI) -> Optional[fitz.Rect]:
+    """Bounding box (in points) of the ink on a low-resolution grayscale render"""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    if not pix.width or not pix.height:
+        return None
+    thumb = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    box = thumb.point(_INK_MASK).getbbox()
+    if box is None:
+        return None
+    scale = page.rect.width / pix.width
+    return fitz.Rect(box[0] * scale, box[1] * scale, box[2] * scale, box[3] * scale)
+
+
+def page_content_bbox(page: fitz.Page, padding: float = CROP_PADDING_PT) -> Optional[fitz.Rect]:
+    """
+    Area of a page worth rendering: its content plus padding.
+
+    Text blocks, vector drawings and form widgets are read from the page.
+    Images are usually scans with white borders, so where a page has images
+    the ink bbox of a small thumbnail is used for them instead of their
+    placement rects. Page-sized white background fills are ignored.
+
+    Args:
+        page: PyMuPDF page
+        padding: Margin kept around the content, in points
+
+    Returns:
+        Crop rect in page coordinates, or None if the page is empty, rotated
+        or a crop would save less than CROP_MIN_SAVING of its area
+    """
+    if page.rotation:
+        return None
+    rects = [fitz.Rect(block[:4]) for block in page.get_text("blocks")]
+    for path in page.get_drawings():
+        if path.get("color") is None and path.get("fill") in (None, (1.0, 1.0, 1.0)):
+            continue  # invisible or white background
+        rects.append(fitz.Rect(path["rect"]))
+    rects.extend(widget.rect for widget in page.widgets())
+    if page.get_images():
+        ink = _ink_bbox(page)
+        if ink is not None:
+            rects.append(ink)
+
+    # Rect union skips empty rects, which would drop straight rules and lines
+    rects = [rect for rect in rects if rect.width > 0 or rect.height > 0]
+    if not rects:
+        return None
+    bbox = fitz.Rect(
+        min(rect.x0 for rect in rects) - padding,
+        min(rect.y0 for rect in rects) - padding,
+        max(rect.x1 for rect in rects) + padding,
+        max(rect.y1 for rect in rects) + padding,
+    ) & page.rect
+    if bbox.is_empty or bbox.get_area() > page.rect.get_area() * (1.0 - CROP_MIN_SAVING):
+        return None
+    return bbox
+
+
+@dataclass
+class PageClassification:
+    """How a single page was classified by the analyzer"""
+    page_num: int        # 1-based
+    kind: str            # "form", "text", "scanned" or "empty"
+    ink_coverage: float
+    has_widgets: bool
+
+    @property
+    def is_empty(self) -> bool:
+        return self.kind == "empty"
+
+
+def _has_text_layer(page: fitz.Page) -> bool:
+    """
+    True if the page has visible text characters.
+
+    Pages without font resources are skipped without extracting text. A
+    font alone is not enough: scanner and OCR output for blank sheets often
+    carries a text layer of whitespace only.
+    """
+    return bool(page.get_fonts()) and bool(page.get_text("text").strip())
+
+
+def classify_page(page: fitz.Page) -> PageClassification:
+    """
+    Classify a page from its widgets, text layer and thumbnail ink coverage.
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        PageClassification
+    """
+    has_widgets = page.first_widget is not None
+    ink = page_ink_coverage(page)
+
+    if has_widgets:
+        kind = "form"
+    elif _has_text_layer(page):
+        # Even a single signature line or light-gray text: too little ink
+        # at thumbnail size does not make a page with text blank
+        kind = "text"
+    elif ink < BLANK_INK_COVERAGE:
+        kind = "empty"
+    else:
+        # Ink but no text layer: scanned page, must go to AI
+        kind = "scanned"
+
+    return PageClassification(
+        page_num=page.number + 1,
+        kind=kind,
+        ink_coverage=ink,
+        has_widgets=has_widgets,
+    )
+
+
+def _classify_range(pdf_path: str, start: int, end: int) -> List[PageClassification]:
+    """Classify pages [start, end) (0-based) - runs in a worker process"""
+    with fitz.open(pdf_path) as doc:
+        return [classify_page(doc[i]) for i in range(start, end)]
+
+
 class PDFAnalyzer:
-    """Analyzes PDF pages to determine content type"""
-    
-    def __init__(self, pdf_path: str):
+    """
+    Analyzes PDF pages to determine content type.
+
+    Usage:
+        analyzer = PDFAnalyzer(pdf_path)
+        # or share the processor's open document / analyze an in-memory PDF
+        analyzer = PDFAnalyzer(pdf_path, session=session)
+        analyzer = PDFAnalyzer(upload_bytes)
+
+        # Stream classifications as they are made (page order)
+        for page in analyzer.iter_pages(workers=4):
+            if not page.is_empty:
+                submit(page.page_num)
+
+        # Summary of the whole document (reuses streamed results)
+        summary = analyzer.analyze()
+    """
+
+    # Pages per shard when analysis is spread across processes
+    SHARD_SIZE = 64
+
+    def __init__(self, pdf_path: PDFSource, session: Optional[DocumentSession] = None):
+        if session is None and not is_pdf_path(pdf_path):
+            session = DocumentSession(pdf_path)
         self.pdf_path = pdf_path
+        self.session = session
         self.doc = None
         self._summary = None
-    
-    def analyze(self) -> Dict:
+        self._page_count: Optional[int] = None
+        self._classifications: Dict[int, PageClassification] = {}
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document"""
+        if self._page_count is None:
+            if self.session is not None:
+                self._page_count = self.session.page_count
+            else:
+                with fitz.open(self.pdf_path) as doc:
+                    self._page_count = len(doc)
+        return self._page_count
+
+    def iter_pages(self, workers: int = 1) -> Iterator[PageClassification]:
+        """
+        Yield page classifications in page order as soon as they are available.
+
+        Args:
+            workers: Number of processes to shard the analysis across by page
+                range (1 = classify in this process, page by page)
+        """
+        total_pages = self.page_count
+        if len(self._classifications) == total_pages:
+            yield from (self._classifications[p] for p in range(1, total_pages + 1))
+            return
+
+        # Worker processes open the file by path; in-memory PDFs stay in-process
+        in_memory = self.session is not None and self.session.pdf_path is None
+        if workers <= 1 or total_pages <= self.SHARD_SIZE or in_memory:
+            if self.session is not None:
+                yield from self._classify_pages(self.session.document())
+            else:
+                with fitz.open(self.pdf_path) as doc:
+                    yield from self._classify_pages(doc)
+            return
+
+        # Small shards keep the first results coming quickly; shards are
+        # yielded in page order while later ones are still being analyzed
+        shards = [
+            (start, min(start + self.SHARD_SIZE, total_pages))
+            for start in range(0, total_pages, self.SHARD_SIZE)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_classify_range, self.pdf_path, start, end)
+                for start, end in shards
+            ]
+            for future in futures:
+                for classification in future.result():
+                    self._classifications[classification.page_num] = classification
+                    yield classification
+
+    def _classify_pages(self, doc: fitz.Document) -> Iterator[PageClassification]:
+        for page in doc:
+            classification = classify_page(page)
+            self._classifications[classification.page_num] = classification
+            yield classification
+
+    def analyze(self, workers: int = 1) -> Dict:
         """Analyze PDF and return summary"""
         if self._summary:
             return self._summary
-            
-        with fitz.open(self.pdf_path) as doc:
-            total_pages = len(doc)
-            text_pages = []
-            form_pages = []
-            empty_pages = []
-            
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                page_number = page_num + 1  # 1-based
-                
-                # Extract text
-                text = page.get_text()
-                has_text = len(text.strip()) > 0
-                
-                # Check for form widgets
-                widgets = list(page.widgets())
-                has_forms = len(widgets) > 0
-                
-                # Categorize page
-                if not has_text and not has_forms:
-                    empty_pages.append(page_number)
-                elif has_forms:
-                    form_pages.append(page_number)
-                else:
-                    text_pages.append(page_number)
-        
+
+        text_pages = []
+        form_pages = []
+        scanned_pages = []
+        empty_pages = []
+        ink_coverage = {}
+
+        for classification in self.iter_pages(workers=workers):
+            page_number = classification.page_num
+            ink_coverage[page_number] = classification.ink_coverage
+            {
+                "form": form_pages,
+                "text": text_pages,
+                "scanned": scanned_pages,
+                "empty": empty_pages,
+            }[classification.kind].append(page_number)
+        total_pages = self.page_count
+
         # Calculate estimated costs based on token pricing
         model_config = MODEL_CONFIGS[DEFAULT_MODEL]
         pricing = model_config.pricing
 
-        # Estimate cost per page: image tokens (input) + ~500 output tokens
-        est_input_tokens = pricing.image_tokens_estimate
+        # Estimate cost per page: image + prompt tokens (input) + ~500 output tokens,
+        # with an A4 image at the default render DPI
+        width, height = render_dimensions(A4_WIDTH_PT, A4_HEIGHT_PT, DEFAULT_RENDER_DPI)
+        prompt_chars = len(get_system_prompt(model_config.model_id)) + len(get_vision_prompt(model_config.model_id))
+        est_input_tokens = model_config.estimate_input_tokens(width, height, prompt_chars)
         est_output_tokens = 500  # typical output per page
         cost_per_page = (
             (est_input_tokens / 1_000_000) * pricing.input_cost_per_1m +
@@ -108,15 +465,17 @@ class PDFAnalyzer:
         )
 
         full_ai_cost = total_pages * cost_per_page
-        hybrid_cost = len(form_pages) * cost_per_page
+        hybrid_cost = (len(form_pages) + len(scanned_pages)) * cost_per_page
         savings = full_ai_cost - hybrid_cost
         savings_percentage = (savings / full_ai_cost * 100) if full_ai_cost > 0 else 0
-        
+
         self._summary = {
             'total_pages': total_pages,
             'text_pages': text_pages,
             'form_pages': form_pages,
+            'scanned_pages': scanned_pages,
             'empty_pages': empty_pages,
+            'ink_coverage': ink_coverage,
             'text_percentage': len(text_pages) / total_pages * 100,
             'form_percentage': len(form_pages) / total_pages * 100,
             'full_ai_cost': full_ai_cost,
@@ -124,5 +483,5 @@ class PDFAnalyzer:
             'savings': savings,
             'savings_percentage': savings_percentage
         }
-        
-        return self._summary
\ No newline at end of file
+
+        return self._summary
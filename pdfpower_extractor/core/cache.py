@@ -0,0 +1,313 @@
+"""
+Content-addressed result cache for incremental re-extraction.
+
+Each page is fingerprinted from what actually determines its rendering:
+the content stream, the resources it draws (images, form XObjects, fonts),
+form widget values and annotations. A revised upload where only a couple of
+pages changed produces identical fingerprints for the untouched pages, so
+their previous extraction can be reused instead of sent to the model again.
+
+Layout on disk:
+    <cache_dir>/pages/<ab>/<key>.json        One extracted page per entry
+    <cache_dir>/documents/<md5>.json         Page fingerprints per document
+    <cache_dir>/usage/<ab>/<layout>.json     Output tokens seen per page layout
+
+The cache directory may live on a filesystem shared by several extraction
+nodes (NFS, SMB, a mounted volume). There is no lock and no central
+service: every write goes to a unique temp file in the target directory and
+is renamed into place, so readers see either the previous entry or the new
+one, never a partial file. Entries carry a checksum so anything damaged
+outside our control is treated as a miss.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import fitz  # PyMuPDF
+
+from ..models.config import TokenUsage
+
+# Bump when the entry format or fingerprint recipe changes
+CACHE_VERSION = 1
+
+
+def _hash_static_layout(digest, doc: fitz.Document, page: fitz.Page) -> None:
+    """Feed everything that is identical across instances of the same form page"""
+    digest.update(repr((tuple(page.rect), page.rotation)).encode())
+    digest.update(page.read_contents())
+
+    # Images: metadata without the xref, plus the raw (still encoded) stream
+    for img in page.get_images(full=True):
+        digest.update(repr(img[2:9]).encode())
+        digest.update(doc.xref_stream_raw(img[0]) or b"")
+
+    # Form XObjects can carry the real page content (e.g. wrapped scans)
+    for xobj in page.get_xobjects():
+        digest.update(doc.xref_stream_raw(xobj[0]) or b"")
+
+    for font in page.get_fonts():
+        digest.update(repr(font[1:]).encode())
+
+
+def layout_fingerprint(doc: fitz.Document, page_index: int) -> str:
+    """
+    Fingerprint the static layout of a page: its content and the position of
+    its form fields, but not the values filled into them.
+
+    Two filled-in copies of the same AcroForm page share a layout fingerprint.
+
+    Args:
+        doc: Open PyMuPDF document
+        page_index: 0-based page number
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    page = doc[page_index]
+    digest = hashlib.sha256()
+    _hash_static_layout(digest, doc, page)
+    for widget in page.widgets():
+        digest.update(repr((widget.field_name, widget.field_type, tuple(widget.rect))).encode())
+    return digest.hexdigest()
+
+
+def page_fingerprint(doc: fitz.Document, page_index: int) -> str:
+    """
+    Compute a content fingerprint for a PDF page.
+
+    xref numbers are deliberately left out: they change whenever a PDF is
+    re-saved, while the bytes they point to do not.
+
+    Args:
+        doc: Open PyMuPDF document
+        page_index: 0-based page number
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    page = doc[page_index]
+    digest = hashlib.sha256()
+    _hash_static_layout(digest, doc, page)
+
+    # Filled AcroForm values live in widgets, not in the content stream
+    for widget in page.widgets():
+        digest.update(repr((
+            widget.field_name,
+            widget.field_type,
+            widget.field_value,
+            tuple(widget.rect),
+        )).encode())
+
+    for annot in page.annots():
+        digest.update(repr((
+            annot.type[1],
+            tuple(annot.rect),
+            annot.info.get("content", ""),
+        )).encode())
+
+    return digest.hexdigest()
+
+
+class FileCacheBackend:
+    """
+    Lock-free key/value file store safe for concurrent writers on a shared path.
+
+    Writes are atomic (temp file + fsync + rename); reads never block and
+    never see a partially written file.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).expanduser()
+        self._tmp_prefix = f".{socket.gethostname()}.{os.getpid()}"
+
+    def read(self, relpath: str) -> Optional[bytes]:
+        """Read an entry, or None if it does not exist"""
+        try:
+            with open(self.root / relpath, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def exists(self, relpath: str) -> bool:
+        return (self.root / relpath).exists()
+
+    def write(self, relpath: str, data: bytes, overwrite: bool = True) -> bool:
+        """
+        Atomically write an entry.
+
+        Args:
+            relpath: Path relative to the cache root
+            data: Entry bytes
+            overwrite: If False, keep an existing entry (content-addressed
+                entries are identical by construction, so the first writer wins)
+
+        Returns:
+            True if this call wrote the entry
+        """
+        target = self.root / relpath
+        if not overwrite and target.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.parent / (
+            f"{self._tmp_prefix}.{threading.get_ident()}.{uuid.uuid4().hex[:8]}.tmp"
+        )
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        finally:
+            if tmp.exists():
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+        return True
+
+
+def _seal(data: Dict[str, Any]) -> bytes:
+    """Serialize an entry with a checksum over its canonical JSON"""
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    checksum = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    return json.dumps({"checksum": checksum, "data": data}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _unseal(raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    """Parse and verify a sealed entry; damaged entries are returned as None"""
+    if not raw:
+        return None
+    try:
+        envelope = json.loads(raw.decode("utf-8"))
+        data = envelope["data"]
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        return None
+    if hashlib.sha256(body.encode("utf-8")).hexdigest() != envelope.get("checksum"):
+        return None
+    return data
+
+
+class ResultCache:
+    """
+    Directory-backed cache of extracted pages, keyed by page fingerprint.
+
+    Safe to share between processes and nodes (see FileCacheBackend).
+
+    Usage:
+        cache = ResultCache("~/.pdfpower/cache")
+        key = cache.page_key(fingerprint, "gemini_flash", prompt_digest)
+        entry = cache.get_page(key)
+        if entry is None:
+            cache.put_page(key, fingerprint, content, token_usage)
+    """
+
+    # Samples averaged per layout before older ones start to fade out
+    USAGE_WINDOW = 20
+
+    def __init__(self, cache_dir: str, backend: Optional[FileCacheBackend] = None):
+        self.backend = backend or FileCacheBackend(cache_dir)
+        self.root = self.backend.root
+
+    @staticmethod
+    def page_key(fingerprint: str, model_id: str, prompt_digest: str = "") -> str:
+        """Cache key for a page: the same page extracted by another model or prompt is a miss"""
+        raw = f"v{CACHE_VERSION}:{fingerprint}:{model_id}:{prompt_digest}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _page_path(self, key: str) -> str:
+        return f"pages/{key[:2]}/{key}.json"
+
+    def _document_path(self, md5: str) -> str:
+        return f"documents/{md5}.json"
+
+    def _usage_path(self, layout: str) -> str:
+        return f"usage/{layout[:2]}/{layout}.json"
+
+    def get_page(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached page.
+
+        Returns:
+            Dict with 'content' and 'token_usage' (TokenUsage of the original
+            extraction), or None on a miss
+        """
+        # Missing, unreadable or damaged entries are treated as misses
+        entry = _unseal(self.backend.read(self._page_path(key)))
+        if not entry or entry.get("version") != CACHE_VERSION or "content" not in entry:
+            return None
+        usage = entry.get("token_usage") or {}
+        return {
+            "content": entry["content"],
+            "fingerprint": entry.get("fingerprint"),
+            "token_usage": TokenUsage(**usage),
+        }
+
+    def put_page(
+        self,
+        key: str,
+        fingerprint: str,
+        content: str,
+        token_usage: Optional[TokenUsage] = None,
+        overwrite: bool = True,
+    ) -> bool:
+        """Store an extracted page; returns True if this call wrote the entry"""
+        return self.backend.write(self._page_path(key), _seal({
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "content": content,
+            "token_usage": asdict(token_usage) if token_usage else {},
+            "created": time.time(),
+        }), overwrite=overwrite)
+
+    def get_document(self, md5: str) -> Optional[Dict[str, Any]]:
+        """Get the page fingerprint manifest stored for a document"""
+        return _unseal(self.backend.read(self._document_path(md5)))
+
+    def put_document(self, md5: str, source: str, model_id: str, fingerprints: Dict[int, str]) -> None:
+        """Store the page fingerprint manifest for a document"""
+        self.backend.write(self._document_path(md5), _seal({
+            "version": CACHE_VERSION,
+            "md5": md5,
+            "source": source,
+            "model_id": model_id,
+            "pages": {str(page_num): fp for page_num, fp in sorted(fingerprints.items())},
+            "created": time.time(),
+        }))
+
+    def get_usage(self, layout: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the output token history of a page layout.
+
+        Returns:
+            Dict with 'output_tokens' (running average), 'samples' and
+            'form_id', or None if the layout was never extracted
+        """
+        return _unseal(self.backend.read(self._usage_path(layout)))
+
+    def record_usage(self, layout: str, form_id: Optional[str], output_tokens: int) -> None:
+        """
+        Add an observed page extraction to the layout's token history.
+
+        Concurrent writers may overwrite each other's sample; for a running
+        average that only steers scheduling, last writer wins is fine.
+        """
+        previous = self.get_usage(layout) or {}
+        samples = min(int(previous.get("samples", 0)), self.USAGE_WINDOW - 1)
+        average = float(previous.get("output_tokens", 0.0))
+        average += (output_tokens - average) / (samples + 1)
+        self.backend.write(self._usage_path(layout), _seal({
+            "version": CACHE_VERSION,
+            "form_id": form_id or previous.get("form_id"),
+            "output_tokens": average,
+            "samples": samples + 1,
+            "updated": time.time(),
+        }))
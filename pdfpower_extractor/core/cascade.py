@@ -0,0 +1,93 @@
+"""
+Cheap-first model cascade.
+
+With ExtractionConfig.model_cascade, every page first goes to the cheapest
+tier. A page is escalated to the next tier - as soon as its result comes
+in, while other pages are still in flight - when the tier's criteria flag
+its output:
+
+- a validation issue listed in CascadeTier.escalate_on_issues
+- CHECKBOX_MISMATCH: the output selects a different number of checkboxes
+  and radio buttons than the PDF itself does (form widget values, and
+  Wingdings glyphs with drawn or ZapfDingbats fill marks)
+
+The last tier's result is final. CascadeReport records which tier produced
+each page and what the run cost compared with sending every page to the
+top tier: pages kept at a lower tier are priced at the top tier's rates for
+the same tokens.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+from .extractor import TextExtractor
+from .templates import is_checked
+from ..models.config import AIModelConfig, TokenUsage
+
+CHECKBOX_MISMATCH = "CHECKBOX_MISMATCH"
+
+_OPTION_WIDGET_TYPES = (fitz.PDF_WIDGET_TYPE_CHECKBOX, fitz.PDF_WIDGET_TYPE_RADIOBUTTON)
+# Selected options as the prompts write them, before and after normalization
+_SELECTED_OPTION = re.compile(r"\(x\)|\[x\]|[☒☑●◉✓✔]", re.IGNORECASE)
+
+
+@dataclass
+class OptionStates:
+    """Checkboxes and radio buttons found on a page"""
+    selected: int
+    total: int
+
+
+def detect_option_states(page: fitz.Page) -> Optional[OptionStates]:
+    """
+    Selected checkboxes and radio buttons on a page, read from the PDF.
+
+    Returns:
+        OptionStates, or None if the page has no detectable options
+    """
+    selected = total = 0
+    for widget in page.widgets():
+        if widget.field_type in _OPTION_WIDGET_TYPES:
+            total += 1
+            selected += is_checked(widget)
+    drawn_selected, drawn_total = TextExtractor().option_states(page)
+    selected += drawn_selected
+    total += drawn_total
+    return OptionStates(selected=selected, total=total) if total else None
+
+
+def count_selected_options(content: str) -> int:
+    """Selected checkboxes and radio buttons in a page's output"""
+    return len(_SELECTED_OPTION.findall(content or ""))
+
+
+def top_tier_cost(usage: TokenUsage, top: AIModelConfig) -> float:
+    """What usage would have cost at the top tier's prices"""
+    return top.calculate_cost(usage.input_tokens, usage.output_tokens, usage.cached_input_tokens).cost
+
+
+@dataclass
+class CascadeReport:
+    """Tier per page and cost compared with always using the top tier"""
+    tiers: List[str]  # Model config IDs, cheapest first
+    page_tiers: Dict[int, str] = field(default_factory=dict)  # Tier that produced each page
+    escalations: Dict[int, List[str]] = field(default_factory=dict)  # Accepted steps ("tier: reasons") per page
+    cost: float = 0.0  # All attempts of the cascaded pages
+    top_tier_cost: float = 0.0  # Estimated, had every page gone to the top tier
+
+    @property
+    def saved(self) -> float:
+        return self.top_tier_cost - self.cost
+
+    @property
+    def saved_share(self) -> float:
+        return self.saved / self.top_tier_cost if self.top_tier_cost else 0.0
+
+    def pages_by_tier(self) -> Dict[str, List[int]]:
+        pages: Dict[str, List[int]] = {tier: [] for tier in self.tiers}
+        for page_num, tier in sorted(self.page_tiers.items()):
+            pages.setdefault(tier, []).append(page_num)
+        return pages
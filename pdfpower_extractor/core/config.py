@@ -6,11 +6,17 @@ All extraction uses AI vision models (no text-only mode).
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Literal, TYPE_CHECKING
+from typing import List, Optional, Literal, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..models.config import AIModelConfig
 
+# Validation issues (ERROR severity) that make a page's output unusable as-is
+BLOCKING_ISSUE_CODES = (
+    "HALLUCINATION_DETECTED",
+    "EMPTY_OUTPUT",
+)
+
 
 @dataclass
 class LLMConfig:
@@ -21,9 +27,24 @@ class LLMConfig:
     # Top-p sampling (0 or very low for deterministic)
     top_p: float = 0.1
 
-    # Max tokens for response
+    # Max tokens for response (upper bound of the per-page budget)
     max_tokens: int = 4000
 
+    # Per-page output budget: predicted page output x multiplier, clamped to
+    # [min_max_tokens, max_tokens]. Pages cut off at their budget are
+    # continued with a doubled one (see max_continuations).
+    dynamic_max_tokens: bool = True
+    max_tokens_multiplier: float = 2.0
+    min_max_tokens: int = 512
+
+    # Continuation requests for a truncated page (finish_reason == "length").
+    # The partial output is sent back and the model completes it, instead of
+    # the page being extracted again from scratch.
+    max_continuations: int = 2
+
+    # Retries with a smaller page image after 413 Payload Too Large
+    max_payload_retries: int = 2
+
     # Retry settings
     max_retries: int = 2
     retry_delay_seconds: float = 1.0
@@ -43,6 +64,34 @@ class ValidationConfig:
     check_question_ids: bool = True
     check_radio_groups: bool = True
 
+    # Re-extract pages whose output fails validation with one of these issue
+    # codes, as soon as the page comes back (see core/reextraction.py). Off by
+    # default: every re-extraction is an extra paid request. Extra requests per
+    # document are capped by count and cost (USD, None = no cost cap); each
+    # page gets at most max_reextractions_per_page.
+    reextract_invalid_pages: bool = False
+    reextract_issue_codes: Tuple[str, ...] = BLOCKING_ISSUE_CODES
+    max_reextractions: int = 3
+    max_reextraction_cost: Optional[float] = None
+    max_reextractions_per_page: int = 1
+    # Escalation for re-extractions: another model (MODEL_CONFIGS id) and/or
+    # a higher render DPI (None = same as the first attempt)
+    reextract_model_config_id: Optional[str] = None
+    reextract_render_dpi: Optional[int] = None
+
+
+@dataclass
+class CascadeTier:
+    """One model tier of a cheap-first cascade (see core/cascade.py)"""
+    # Model config ID from models/config.py MODEL_CONFIGS
+    model_config_id: str
+    # Escalate pages whose output has one of these validation issues. Pages
+    # are validated for this even with ValidationConfig.validate_output off.
+    escalate_on_issues: Tuple[str, ...] = BLOCKING_ISSUE_CODES
+    # Escalate pages whose selected checkboxes/radio buttons differ from the
+    # states detected in the PDF itself (form widgets, drawn marks)
+    escalate_on_checkbox_mismatch: bool = True
+
 
 @dataclass
 class ExtractionConfig:
@@ -67,6 +116,13 @@ class ExtractionConfig:
     # Available: "gemini_flash", "qwen_vl_72b", "mistral_small" (all EU/GDPR compliant)
     model_config_id: str = "gemini_flash"
 
+    # === Model Cascade ===
+    # Cheap-first tiers, e.g. [CascadeTier("gemma_3_27b"), CascadeTier("gemini_flash")].
+    # Every page goes to the first tier; pages its criteria flag are
+    # escalated to the next tier, and the last tier's result is final.
+    # Replaces model_config_id when set.
+    model_cascade: List[CascadeTier] = field(default_factory=list)
+
     # === Sub-configs ===
     llm: LLMConfig = field(default_factory=LLMConfig)
     validation: ValidationConfig = field(default_factory=ValidationConfig)
@@ -76,13 +132,78 @@ class ExtractionConfig:
     # If False, continue processing all pages and collect errors in BatchResult
     fail_fast: bool = True
 
+    # === Analysis ===
+    # Processes used to classify pages by page range (1 = stream in-process).
+    # Extraction starts on the first pages while the rest is being analyzed.
+    analysis_workers: int = 1
+
+    # === Rendering ===
+    # Default page render resolution (README: 100-150 DPI is optimal)
+    render_dpi: int = 150
+    # Opt-in: pick the render DPI (down to min_legible_dpi) with the fewest
+    # image tokens for the model's tile/patch billing. Off by default: for
+    # patch-billed models (Qwen, Mistral) the cheapest DPI is always the
+    # floor, which loses small print and checkboxes.
+    model_aware_sizing: bool = False
+    min_legible_dpi: int = 100
+    # Render colorspace: "auto" picks 1-bit, 8-bit gray or RGB per page from
+    # the colors the page uses; "bw", "gray" or "rgb" force one for all pages
+    color_mode: Literal["auto", "bw", "gray", "rgb"] = "auto"
+    # Crop each page to its content (text, drawings, widgets, images) plus
+    # crop_padding_pt points before encoding. Smaller images upload faster and
+    # cost fewer image tokens; the crop box is recorded in image_encoding.
+    crop_margins: bool = False
+    crop_padding_pt: float = 18.0
+    # Pages whose render would exceed tile_max_side_px on a side (A3 sheets,
+    # drawings) are extracted as overlapping tiles in parallel and stitched
+    # into one page, instead of being downscaled until they are illegible.
+    # Tiles are full-width bands; pages wider than tile_max_side_px get
+    # shorter bands of at most tile_max_side_px squared pixels.
+    # Tile requests share the endpoint's max_parallel_requests.
+    tile_large_pages: bool = False
+    tile_max_side_px: int = 2048
+    tile_overlap_px: int = 96
+
+    # === Scheduling ===
+    # Order in which pages are handed to the extraction workers:
+    # "largest_first" - pages with the highest predicted output first (shorter makespan)
+    # "fifo" - page order
+    page_schedule: Literal["largest_first", "fifo"] = "largest_first"
+
+    # === Streaming Output ===
+    # With process(output_path=...) or a page_callback, page sections are
+    # written in page order as soon as the next page is done. Pages finished
+    # ahead of an earlier one wait in a reorder buffer of at most this many
+    # pages; workers do not start pages beyond it.
+    reorder_buffer_pages: int = 32
+    # Write <output>.index.json next to the output (process(output_path=...)
+    # or save_results): byte offset and length of every page section, with
+    # its FORM_ID, summary, token usage and validation status
+    write_page_index: bool = False
+
+    # === Result Cache ===
+    # Directory for the content-addressed page cache (None = disabled).
+    # Pages whose fingerprint matches a previous extraction are reused.
+    # May point at a shared filesystem path used by several nodes.
+    cache_dir: Optional[str] = None
+    # If True, ignore cached pages but still store the new results
+    refresh_cache: bool = False
+
+    # === Form Templates ===
+    # Directory of learned form templates (None = disabled). Form pages whose
+    # layout was learned before are filled from their widget values instead
+    # of being sent to the model.
+    template_dir: Optional[str] = None
+
     # === Logging/Debug ===
     verbose: bool = False
     log_prompts: bool = False
 
     def get_model_config(self) -> Optional["AIModelConfig"]:
-        """Get the AIModelConfig for this extraction config"""
+        """Get the AIModelConfig for this extraction config (the first cascade tier, if any)"""
         from ..models.config import get_model_config
+        if self.model_cascade:
+            return get_model_config(self.model_cascade[0].model_config_id)
         return get_model_config(self.model_config_id)
 
     def is_eu(self) -> bool:
@@ -140,6 +261,20 @@ def nemotron_config() -> ExtractionConfig:
     return ExtractionConfig(model_config_id="nemotron_vl")
 
 
+def cascade_config() -> ExtractionConfig:
+    """
+    Cheap-first cascade: Gemma 3 27B via Nebius (EU), escalating to Gemini
+    2.5 Flash Lite via Requesty EU (Vertex) for pages that fail validation
+    or whose checkboxes disagree with the PDF.
+
+    GDPR: Compliant (EU endpoints only)
+    """
+    return ExtractionConfig(model_cascade=[
+        CascadeTier("gemma_3_27b"),
+        CascadeTier("gemini_flash"),
+    ])
+
+
 # Backwards compatibility aliases
 gemini_flash_config = gemini_config
 qwen_vl_config = qwen_config
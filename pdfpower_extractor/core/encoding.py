@@ -0,0 +1,228 @@
+"""
+Payload-fitting image encoder.
+
+Endpoints limit the request size (HuggingFace: ~10MB). Rather than sending
+a page and failing with 413 Payload Too Large, the page image is encoded in
+the endpoint's preferred format and - only when that does not fit - searched
+for the best rendition under the limit: a binary search on lossy quality at
+full resolution first, then the same search at successively smaller scales.
+
+If the endpoint still rejects a request (its real limit is lower than
+configured, or the prompt grew), smaller() produces the next rendition
+below the rejected size so the page can be retried instead of failing.
+"""
+
+import time
+from dataclasses import dataclass, field, asdict
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+MIME_TYPES = {
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+}
+
+# Bytes reserved for prompts and JSON around the base64 image
+PAYLOAD_OVERHEAD_BYTES = 64 * 1024
+
+
+def payload_image_budget(max_payload_mb: float, overhead_bytes: int = PAYLOAD_OVERHEAD_BYTES) -> int:
+    """
+    Largest encoded image (raw bytes) that fits a request payload limit.
+
+    Base64 inflates the image by 4/3; prompts and JSON take overhead_bytes.
+
+    Returns:
+        Byte budget, or 0 if the endpoint has no limit
+    """
+    if max_payload_mb <= 0:
+        return 0
+    limit = int(max_payload_mb * 1024 * 1024) - overhead_bytes
+    return max(limit * 3 // 4, 0)
+
+
+@dataclass
+class EncodingAttempt:
+    """One encode of the page image"""
+    format: str
+    quality: Optional[int]  # None for lossless formats
+    scale: float
+    width: int
+    height: int
+    size_bytes: int
+    seconds: float
+
+
+@dataclass
+class EncodedImage:
+    """Encoded page image plus how it was chosen"""
+    data: bytes = field(repr=False)
+    format: str
+    mime: str
+    quality: Optional[int]
+    scale: float
+    width: int
+    height: int
+    attempts: List[EncodingAttempt] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for page results and logs (without the image data)"""
+        return {
+            "format": self.format,
+            "quality": self.quality,
+            "scale": self.scale,
+            "width": self.width,
+            "height": self.height,
+            "size_bytes": self.size_bytes,
+            "attempts": [asdict(a) for a in self.attempts],
+        }
+
+
+class PayloadEncoder:
+    """
+    Encode a page image so it fits an endpoint's payload limit.
+
+    Usage:
+        encoder = PayloadEncoder(image, "png", 90)
+        rendition = encoder.fit(payload_image_budget(endpoint.max_payload_mb))
+        ...
+        # Endpoint answered 413
+        rendition = encoder.smaller(rendition)
+    """
+
+    # Lossy format used when the configured format does not fit
+    FALLBACK_FORMAT = "webp_lossy"
+    # Lowest quality the search goes to before reducing resolution
+    QUALITY_FLOOR = 40
+    # Resolution steps; at 150 DPI renders: 150, 127, 105, 82, 60 DPI
+    SCALE_STEPS = (1.0, 0.85, 0.7, 0.55, 0.4)
+    # A rejected rendition is followed by one at most this share of its size
+    REJECTED_SIZE_FACTOR = 0.75
+
+    def __init__(self, image: Image.Image, image_format: str = "png", quality: int = 90):
+        self.image = image
+        self.image_format = image_format.lower()
+        if image.mode == "1":
+            # 1-bit PNG is lossless and ~10x smaller than lossy WEBP of the
+            # same page (WEBP has no bilevel mode; see benchmark_color_modes.py)
+            self.image_format = "png"
+        self.quality = quality
+        self.attempts: List[EncodingAttempt] = []
+        self._scaled: Dict[float, Image.Image] = {1.0: image}
+
+    def fit(self, max_bytes: int = 0) -> EncodedImage:
+        """
+        Best rendition not larger than max_bytes (0 = no limit).
+
+        Returns the smallest rendition tried if nothing fits; the request
+        will then fail with a payload error as before.
+        """
+        best = self._encode(self.image_format, self.quality, 1.0)
+        if max_bytes <= 0 or best.size_bytes <= max_bytes:
+            return best
+
+        fmt = self.image_format if self.image_format in ("jpeg", "webp_lossy") else self.FALLBACK_FORMAT
+        for scale in self.SCALE_STEPS:
+            rendition, smallest = self._search_quality(fmt, scale, max_bytes)
+            if rendition is not None:
+                return rendition
+            if smallest.size_bytes < best.size_bytes:
+                best = smallest
+        return best
+
+    def smaller(self, rejected: EncodedImage) -> Optional[EncodedImage]:
+        """
+        Next rendition after the endpoint rejected one as too large.
+
+        Returns:
+            A rendition below REJECTED_SIZE_FACTOR of the rejected size, or
+            None if the image cannot be made that small
+        """
+        target = int(rejected.size_bytes * self.REJECTED_SIZE_FACTOR)
+        rendition = self.fit(target)
+        return rendition if rendition.size_bytes <= target else None
+
+    def _search_quality(
+        self, fmt: str, scale: float, max_bytes: int
+    ) -> Tuple[Optional[EncodedImage], EncodedImage]:
+        """
+        Binary search for the highest quality that fits at a given scale.
+
+        Returns:
+            (best fitting rendition or None, smallest rendition tried)
+        """
+        low, high = self.QUALITY_FLOOR, max(self.quality, self.QUALITY_FLOOR)
+        fitting: Optional[EncodedImage] = None
+        smallest: Optional[EncodedImage] = None
+        while low <= high:
+            quality = (low + high) // 2
+            rendition = self._encode(fmt, quality, scale)
+            if smallest is None or rendition.size_bytes < smallest.size_bytes:
+                smallest = rendition
+            if rendition.size_bytes <= max_bytes:
+                fitting = rendition
+                low = quality + 1
+            else:
+                high = quality - 1
+        return fitting, smallest
+
+    def _image_at(self, scale: float) -> Image.Image:
+        if scale not in self._scaled:
+            width = max(1, round(self.image.width * scale))
+            height = max(1, round(self.image.height * scale))
+            self._scaled[scale] = self.image.resize((width, height), Image.LANCZOS)
+        return self._scaled[scale]
+
+    def _encode(self, fmt: str, quality: int, scale: float) -> EncodedImage:
+        """Encode at a format/quality/scale and record the attempt"""
+        img = self._image_at(scale)
+        start = time.perf_counter()
+        buffer = BytesIO()
+        used_quality: Optional[int] = quality
+        if fmt in ("jpeg", "webp_lossy"):
+            # Lossy encoders need RGB or 8-bit gray
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGB")
+            elif img.mode == "1":
+                img = img.convert("L")
+        if fmt == "webp_lossless":
+            img.save(buffer, format="WEBP", lossless=True)
+            pil_format, used_quality = "WEBP", None
+        elif fmt == "webp_lossy":
+            img.save(buffer, format="WEBP", quality=quality)
+            pil_format = "WEBP"
+        elif fmt == "jpeg":
+            img.save(buffer, format="JPEG", quality=quality)
+            pil_format = "JPEG"
+        else:  # png (default)
+            img.save(buffer, format="PNG")
+            pil_format, used_quality = "PNG", None
+
+        data = buffer.getvalue()
+        attempt = EncodingAttempt(
+            format=pil_format,
+            quality=used_quality,
+            scale=scale,
+            width=img.width,
+            height=img.height,
+            size_bytes=len(data),
+            seconds=round(time.perf_counter() - start, 4),
+        )
+        self.attempts.append(attempt)
+        return EncodedImage(
+            data=data,
+            format=pil_format,
+            mime=MIME_TYPES[pil_format],
+            quality=used_quality,
+            scale=scale,
+            width=img.width,
+            height=img.height,
+            attempts=list(self.attempts),
+        )
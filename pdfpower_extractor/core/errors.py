@@ -84,6 +84,11 @@ class PageResult:
     content: Optional[str] = None
     error: Optional[PageError] = None
     token_usage: Optional[Any] = None  # TokenUsage from models.config
+    validation: Optional[Any] = None  # ValidationResult, when validate_output is on
+    duration: float = 0.0  # Seconds spent extracting the page (0 if it needed no request)
+    source: str = "extracted"  # "extracted", "cache", "template" or "empty"
+    postprocessed: Optional[Any] = None  # PostProcessedPage: normalized content, TOC summary, FORM_ID
+    model: Optional[str] = None  # Model config ID that produced the content (extracted pages)
 
 
 @dataclass
@@ -2,21 +2,31 @@
 Text and AI extraction modules
 """
 
+import math
 import os
-import base64
 import time
 import requests
+import threading
 import fitz  # PyMuPDF
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pdf2image import convert_from_path
-from io import BytesIO
-from typing import Dict, List, Tuple, Optional
+from PIL import Image
+from typing import Dict, List, Tuple, Optional, Union
 import tempfile
 import uuid
 from pathlib import Path
 
-import re
 from .config import ExtractionConfig, LLMConfig
-from .prompts import get_vision_prompt, get_system_prompt
+from .prompts import get_vision_prompt, get_system_prompt, CONTINUATION_PROMPT, TILE_PROMPT
+from .encoding import PayloadEncoder, payload_image_budget
+from .payload import ImageDataURL, RequestBody
+from .sizing import choose_render_size, render_dimensions
+from .tiling import Tile, plan_tiles, stitch_tiles
+from .postprocess import RADIO_SELECTED, RADIO_UNSELECTED, normalize_radio_line
+from .session import DocumentSession, PDFSource, is_pdf_path
+from .analyzer import page_color_mode, page_content_bbox, COLOR_MODE_BW, COLOR_MODE_RGB
+from .errors import ErrorType, get_error_type_from_message
 from ..models.config import AIModelConfig, get_model_config, ENDPOINTS, TokenUsage
 
 
@@ -25,27 +35,93 @@ def normalize_radio_buttons(content: str) -> str:
     Normalize radio button output to consistent (x)/( ) format.
     Converts various formats like '◉ option (x)' or '◉ option' to '(x) option'.
     """
-    lines = content.split('\n')
-    normalized = []
+    if RADIO_SELECTED not in content and RADIO_UNSELECTED not in content:
+        return content
+    return '\n'.join(normalize_radio_line(line) for line in content.split('\n'))
 
-    for line in lines:
-        # Pattern: ◉ option text (x) or ◉ option text -> (x) option text
-        if '◉' in line:
-            # Remove (x) if present after option text
-            line = re.sub(r'\s*\(x\)\s*$', '', line)
-            # Replace ◉ with (x)
-            line = line.replace('◉', '(x)')
+# Gray level at or above which a pixel becomes white in 1-bit renders;
+# biased towards ink so thin anti-aliased strokes survive
+BILEVEL_THRESHOLD = 192
 
-        # Pattern: ○ option text ( ) or ○ option text -> ( ) option text
-        if '○' in line:
-            # Remove ( ) if present after option text
-            line = re.sub(r'\s*\(\s*\)\s*$', '', line)
-            # Replace ○ with ( )
-            line = line.replace('○', '( )')
 
-        normalized.append(line)
+def to_bilevel(image: Image.Image, threshold: int = BILEVEL_THRESHOLD) -> Image.Image:
+    """Convert a grayscale render to 1-bit black and white (no dithering)"""
+    if image.mode != "L":
+        image = image.convert("L")
+    return image.point(lambda v: 255 if v >= threshold else 0, mode="1")
+
+
+def crop_to_box(image: Image.Image, crop_box: Tuple[float, float, float, float], dpi: int) -> Image.Image:
+    """
+    Crop a page render to a box given in PDF points from the page's top-left.
+
+    Args:
+        image: Full page rendered at dpi
+        crop_box: (x0, y0, x1, y1) in points
+        dpi: Render resolution of image
+
+    Returns:
+        The cropped image (the full image if the box covers it)
+    """
+    scale = dpi / 72.0
+    box = (
+        max(0, int(crop_box[0] * scale)),
+        max(0, int(crop_box[1] * scale)),
+        min(image.width, math.ceil(crop_box[2] * scale)),
+        min(image.height, math.ceil(crop_box[3] * scale)),
+    )
+    if box == (0, 0, image.width, image.height):
+        return image
+    return image.crop(box)
+
+
+def merge_continuation(partial: str, continuation: str, min_overlap: int = 8, max_overlap: int = 200) -> str:
+    """
+    Append a continuation to a truncated output.
+
+    Models sometimes repeat the tail of the partial output before going on;
+    the longest such overlap (min_overlap..max_overlap chars) is dropped.
+    Shorter overlaps are kept, they are as likely to be legitimate text.
+    """
+    if not partial:
+        return continuation
+    for size in range(min(max_overlap, len(partial), len(continuation)), min_overlap - 1, -1):
+        if continuation.startswith(partial[-size:]):
+            return partial + continuation[size:]
+    return partial + continuation
+
+
+def parse_cached_tokens(usage: Dict) -> int:
+    """
+    Read the number of prompt-cache hits from an API usage block.
+
+    Providers report this under different names:
+    - OpenAI-compatible (Nebius, Requesty): prompt_tokens_details.cached_tokens
+    - Anthropic-style routers: cache_read_input_tokens
+    - DeepSeek-style: prompt_cache_hit_tokens
+    """
+    if not usage:
+        return 0
+    details = usage.get("prompt_tokens_details") or usage.get("input_tokens_details") or {}
+    for value in (
+        details.get("cached_tokens") if isinstance(details, dict) else None,
+        usage.get("cached_tokens"),
+        usage.get("cache_read_input_tokens"),
+        usage.get("prompt_cache_hit_tokens"),
+    ):
+        if value:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                continue
+    return 0
+
+
+def _hf_cached_tokens(usage) -> int:
+    """Cached prompt tokens from a huggingface_hub usage object"""
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return int(getattr(details, "cached_tokens", 0) or 0) if details else 0
 
-    return '\n'.join(normalized)
 
 # Optional HuggingFace support
 try:
@@ -118,6 +194,40 @@ class TextExtractor:
 
         return filled_positions
 
+    @staticmethod
+    def _is_filled(filled_positions: List[Tuple[float, float]], span_bbox, span_center_y: float) -> bool:
+        """True if a fill marker sits on the radio/checkbox glyph of a span"""
+        # Filled marker should be within ~25px horizontally and ~8px vertically
+        return any(
+            abs(fx - span_bbox[0]) < 25 and abs(fy - span_center_y) < 8
+            for fx, fy in filled_positions
+        )
+
+    def option_states(self, page) -> Tuple[int, int]:
+        """
+        Radio buttons and checkboxes drawn on a page (Wingdings glyphs with
+        vector or ZapfDingbats fill markers), as the text extraction sees them.
+
+        Returns:
+            (selected, total)
+        """
+        filled_positions = self._find_filled_positions(page)
+        selected = total = 0
+        for block in page.get_text("dict").get("blocks", []):
+            if block.get("type") != 0:
+                continue
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    if "Wingdings" not in span.get("font", ""):
+                        continue
+                    span_bbox = span.get("bbox", [0, 0, 0, 0])
+                    span_center_y = (span_bbox[1] + span_bbox[3]) / 2
+                    for char in span.get("text", ""):
+                        if char in self.WINGDINGS_RADIO or char in self.WINGDINGS_CHECKBOX:
+                            total += 1
+                            selected += self._is_filled(filled_positions, span_bbox, span_center_y)
+        return selected, total
+
     def _extract_with_radio_detection(self, page, page_num: int) -> str:
         """Extract text with proper radio button state detection"""
         # Get all filled indicator positions (graphics + ZapfDingbats markers)
@@ -151,20 +261,11 @@ class TextExtractor:
                         for char in text:
                             if char in self.WINGDINGS_RADIO:
                                 # Check if this radio is filled (marker nearby)
-                                is_filled = False
-                                for fx, fy in filled_positions:
-                                    # Filled marker should be within ~25px horizontally and ~8px vertically
-                                    if abs(fx - span_bbox[0]) < 25 and abs(fy - span_center_y) < 8:
-                                        is_filled = True
-                                        break
+                                is_filled = self._is_filled(filled_positions, span_bbox, span_center_y)
                                 line_text += "● " if is_filled else "○ "
                             elif char in self.WINGDINGS_CHECKBOX:
                                 # Check if checkbox is filled
-                                is_filled = False
-                                for fx, fy in filled_positions:
-                                    if abs(fx - span_bbox[0]) < 25 and abs(fy - span_center_y) < 8:
-                                        is_filled = True
-                                        break
+                                is_filled = self._is_filled(filled_positions, span_bbox, span_center_y)
                                 line_text += "☒ " if is_filled else "☐ "
                             # Skip other Wingdings chars (decorative)
 
@@ -231,22 +332,29 @@ class AIExtractor:
         else:
             self.api_key = os.environ.get("OPENROUTER_API_KEY", "")
 
+        # In-flight request limit per endpoint (see _request_slot)
+        self._request_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._request_slots_lock = threading.Lock()
+
     def extract_page(
         self,
-        pdf_path: str,
+        pdf_path: PDFSource,
         page_num: int,
         model: str = None,
         model_config: Optional[AIModelConfig] = None,
         llm_config: Optional[LLMConfig] = None,
         use_markdown: bool = False,
         debug_save_images: bool = False,
-        debug_session_dir: Optional[str] = None
+        debug_session_dir: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        session: Optional[DocumentSession] = None,
+        render_dpi: Optional[int] = None,
     ) -> Dict:
         """
         Extract content from a page using AI vision.
 
         Args:
-            pdf_path: Path to PDF file
+            pdf_path: Path to PDF file, or the PDF as bytes/memoryview/mmap
             page_num: Page number (1-indexed)
             model: Model identifier (legacy, use model_config instead)
             model_config: AI model configuration (overrides self.model_config)
@@ -254,6 +362,18 @@ class AIExtractor:
             use_markdown: If True, use markdown-optimized prompts for structured output
             debug_save_images: If True, save converted images to /tmp/powerpdf_extracted_images/
             debug_session_dir: Optional session directory path (created by processor if None)
+            max_tokens: Output budget for this page (capped at the LLM config's
+                max_tokens). A response cut off at the budget is completed with
+                continuation requests that carry the partial output, each with
+                double the previous budget up to the cap; the parts are joined
+                with merge_continuation(). After the LLM config's
+                max_continuations the page keeps its truncated output.
+            session: Open document shared with the processor. The page is then
+                planned and rendered from it with PyMuPDF instead of opening
+                pdf_path again (fitz for planning, poppler for rendering).
+                In-memory PDFs always take this path.
+            render_dpi: Render at this DPI instead of the configured one, without
+                model-aware downsizing (e.g. to re-extract a page more legibly)
         """
         # Resolve model config: param > instance > default
         mc = model_config or self.model_config
@@ -272,6 +392,7 @@ class AIExtractor:
             model_id = mc.model_id_at_endpoint
 
             # Use region pooling for Gemini Flash to avoid quota limits
+            # (prompt caches are per region, so pooling trades some cache hits for quota)
             if mc.model_id == "gemini_flash":
                 from ..models.config import get_gemini_model_with_region
                 model_id = get_gemini_model_with_region()
@@ -287,18 +408,42 @@ class AIExtractor:
             api_key = self.api_key
 
         cfg = llm_config or self.config.llm
+        budget = min(max_tokens, cfg.max_tokens) if max_tokens else cfg.max_tokens
+
+        owned_session = None
+        if session is None and not is_pdf_path(pdf_path):
+            # In-memory PDF: plan and render from the buffer, no temp file
+            session = owned_session = DocumentSession(pdf_path)
+        pdf_name = Path(session.name if session is not None else pdf_path).stem
 
         try:
-            # Convert page to PNG (color preserved for Gemini to analyze)
-            images = convert_from_path(
-                pdf_path,
-                first_page=page_num,
-                last_page=page_num,
-                dpi=150  # 150 DPI balances speed vs accuracy (was 300)
-            )
+            # Render in the smallest colorspace that keeps the page's colors
+            # (color preserved for Gemini to analyze on color pages)
+            render_dpi, color_mode, crop_box = self._render_plan(pdf_path, page_num, mc, session, render_dpi)
+            if session is not None:
+                # Rendered from the shared document, only the crop box is rasterized
+                images = [session.render(
+                    page_num,
+                    render_dpi,
+                    colorspace="rgb" if color_mode == COLOR_MODE_RGB else "gray",
+                    clip=crop_box,
+                )]
+            else:
+                images = convert_from_path(
+                    pdf_path,
+                    first_page=page_num,
+                    last_page=page_num,
+                    dpi=render_dpi,  # 150 DPI balances speed vs accuracy (was 300); less with model_aware_sizing
+                    grayscale=color_mode != COLOR_MODE_RGB,
+                )
 
-            if not images:
-                raise Exception("Failed to convert page to image")
+                if not images:
+                    raise Exception("Failed to convert page to image")
+
+                if crop_box:
+                    images[0] = crop_to_box(images[0], crop_box, render_dpi)
+            if color_mode == COLOR_MODE_BW:
+                images[0] = to_bilevel(images[0])
 
             # Debug: Save image to /tmp/powerpdf_extracted_images/ if enabled
             saved_image_path = None
@@ -315,7 +460,6 @@ class AIExtractor:
                     session_dir.mkdir(parents=True, exist_ok=True)
 
                 # Generate filename
-                pdf_name = Path(pdf_path).stem
                 image_filename = f"{pdf_name}_page{page_num:03d}.png"
                 image_path = session_dir / image_filename
 
@@ -326,55 +470,6 @@ class AIExtractor:
                 if self.config and self.config.verbose:
                     print(f"    💾 Debug: Saved image to {saved_image_path}")
 
-            # Convert to base64 using endpoint's preferred format
-            img_buffer = BytesIO()
-            img_format = 'PNG'
-            img_mime = 'image/png'
-
-            if mc:
-                endpoint = mc.get_endpoint()
-                fmt = endpoint.image_format.lower()
-                quality = endpoint.image_quality
-
-                # Ensure RGB for lossy formats
-                img = images[0]
-                if fmt in ('jpeg', 'webp_lossy') and img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-
-                if fmt == 'webp_lossless':
-                    img.save(img_buffer, format='WEBP', lossless=True)
-                    img_mime = 'image/webp'
-                    img_format = 'WEBP'
-                elif fmt == 'webp_lossy':
-                    img.save(img_buffer, format='WEBP', quality=quality)
-                    img_mime = 'image/webp'
-                    img_format = 'WEBP'
-                elif fmt == 'jpeg':
-                    img.save(img_buffer, format='JPEG', quality=quality)
-                    img_mime = 'image/jpeg'
-                    img_format = 'JPEG'
-                else:  # png (default)
-                    images[0].save(img_buffer, format='PNG')
-
-                # Check payload limit and compress further if needed
-                if endpoint.max_payload_mb > 0:
-                    size_mb = len(img_buffer.getvalue()) / (1024 * 1024)
-                    if size_mb > endpoint.max_payload_mb * 0.8:
-                        img_buffer = BytesIO()
-                        img.save(img_buffer, format='WEBP', quality=min(quality, 85))
-                        img_mime = 'image/webp'
-                        img_format = 'WEBP'
-                        if self.config and self.config.verbose:
-                            new_size_mb = len(img_buffer.getvalue()) / (1024 * 1024)
-                            print(f"    📦 Compressed: {size_mb:.1f}MB → {new_size_mb:.1f}MB (limit: {endpoint.max_payload_mb}MB)")
-
-                img_buffer.seek(0)
-            else:
-                images[0].save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-
-            img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
-
             # Prepare API request headers
             if mc:
                 endpoint = mc.get_endpoint()
@@ -391,11 +486,14 @@ class AIExtractor:
             system_prompt = get_system_prompt(model_id, use_markdown=use_markdown)
             user_prompt = get_vision_prompt(model_id, use_markdown=use_markdown)
 
+            # Oversized pages are extracted as overlapping tiles (see tiling.py)
+            tiles = self._page_tiles(images[0])
+
             # Debug: Save prompts if debug_save_images is enabled
             if debug_save_images and saved_image_path:
                 # Use the same session directory as the image
                 session_dir = Path(saved_image_path).parent
-                prompt_filename = f"{Path(pdf_path).stem}_page{page_num:03d}_prompts.txt"
+                prompt_filename = f"{pdf_name}_page{page_num:03d}_prompts.txt"
                 prompt_path = session_dir / prompt_filename
 
                 # Determine prompt type (simplified vs strict)
@@ -411,6 +509,8 @@ class AIExtractor:
                     f.write(f"Prompt Type: {prompt_type}\n")
                     f.write(f"Use Markdown: {use_markdown}\n")
                     f.write(f"Page: {page_num}\n")
+                    f.write(f"Crop Box: {list(crop_box) if crop_box else 'none'}\n")
+                    f.write(f"Tiles: {[list(tile.box) for tile in tiles] if tiles else 'none'}\n")
                     f.write(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                     f.write(f"\n{'='*50}\n\n")
                     f.write(f"=== SYSTEM PROMPT ===\n")
@@ -424,113 +524,224 @@ class AIExtractor:
                 if self.config and self.config.verbose:
                     print(f"    📝 Debug: Saved {prompt_type} prompts to {prompt_path}")
 
-            # Build messages with system prompt
-            messages = []
-            if system_prompt:
-                messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            messages.append({
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": user_prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{img_mime};base64,{img_base64}"
-                        }
-                    }
-                ]
-            })
-
             # Get model parameters (from model config or LLM config)
             if mc:
                 params = mc.parameters.to_dict()
                 # Override with LLM config if provided
                 params["temperature"] = cfg.temperature if cfg.temperature != 0.0 else params["temperature"]
-                params["max_tokens"] = cfg.max_tokens
+                params["max_tokens"] = budget
             else:
                 params = {
                     "temperature": cfg.temperature,
-                    "max_tokens": cfg.max_tokens,
+                    "max_tokens": budget,
                 }
                 if cfg.top_p > 0:
                     params["top_p"] = cfg.top_p
 
-            data = {
-                "model": model_id,
-                "messages": messages,
-                **params,
-            }
-
             if self.config.log_prompts:
                 print(f"[DEBUG] Model: {model_id}")
                 print(f"[DEBUG] Endpoint: {api_url}")
                 print(f"[DEBUG] Temperature: {params.get('temperature')}, Top-P: {params.get('top_p')}")
                 print(f"[DEBUG] Prompt length: {len(user_prompt)} chars")
 
-            # Check if this is a HuggingFace routed endpoint
-            if api_url.startswith("huggingface://"):
-                # Extract provider from URL (e.g., "huggingface://nebius" -> "nebius")
-                hf_provider = api_url.replace("huggingface://", "").split("/")[0]
-                result = self._make_huggingface_request(
-                    provider=hf_provider,
-                    model_id=model_id,
-                    img_base64=img_base64,
-                    user_prompt=user_prompt,
-                    cfg=cfg,
-                    mc=mc
+            # Shared prompt prefix first, page image last (see _build_messages)
+            cache_hints = bool(mc and mc.get_endpoint().prompt_cache_hints)
+
+            def extract_image(image: Image.Image, label: str, page_text: Optional[str] = None) -> Dict:
+                """
+                Encode one image (the page or a tile) and request its markdown.
+
+                page_text (e.g. a tile's position) goes after the image, so the
+                instructions stay a byte-identical, cacheable prefix.
+                """
+                # Encode in the endpoint's preferred format, reduced only as far
+                # as needed to fit its payload limit
+                if mc:
+                    endpoint = mc.get_endpoint()
+                    encoder = PayloadEncoder(image, endpoint.image_format, endpoint.image_quality)
+                    max_image_bytes = payload_image_budget(endpoint.max_payload_mb)
+                else:
+                    encoder = PayloadEncoder(image, "png")
+                    max_image_bytes = 0
+                rendition = encoder.fit(max_image_bytes)
+                if self.config and self.config.verbose and len(rendition.attempts) > 1:
+                    print(f"    📦 Fitted to payload limit: {rendition.format} q={rendition.quality} "
+                          f"scale={rendition.scale} → {rendition.size_bytes / (1024 * 1024):.1f}MB "
+                          f"({len(rendition.attempts)} encodes)")
+
+                # Base64-encoded only into the request body (see payload.py)
+                image_url = ImageDataURL(rendition.data, rendition.mime)
+
+                predicted_input_tokens = (
+                    mc.estimate_input_tokens(
+                        rendition.width, rendition.height, len(system_prompt) + len(user_prompt) + len(page_text or "")
+                    )
+                    if mc else None
                 )
-            else:
-                # Make standard REST API request with retry logic
-                result = self._make_request_with_retry(api_url, headers, data, cfg)
 
-            content = result['choices'][0]['message']['content']
+                messages = self._build_messages(
+                    system_prompt,
+                    user_prompt,
+                    image_url,
+                    cache_hints=cache_hints,
+                    page_text=page_text,
+                )
+                data = {
+                    "model": model_id,
+                    "messages": messages,
+                    **params,
+                }
 
-            # Normalize radio button output (convert ◉/○ to (x)/( ))
-            content = normalize_radio_buttons(content)
+                # A page cut off at its budget is completed with continuation
+                # requests carrying the partial output; every request is billed,
+                # so usage accumulates across them
+                request_budget = budget
+                token_usage = TokenUsage()
+                content = ""
+                truncations = 0
+                continuations = 0
+                payload_retries = 0
+                while True:
+                    try:
+                        # Tiles of a page share the endpoint's parallel request limit
+                        with self._request_slot(mc):
+                            # Check if this is a HuggingFace routed endpoint
+                            if api_url.startswith("huggingface://"):
+                                # Extract provider from URL (e.g., "huggingface://nebius" -> "nebius")
+                                hf_provider = api_url.replace("huggingface://", "").split("/")[0]
+                                result = self._make_huggingface_request(
+                                    provider=hf_provider,
+                                    model_id=model_id,
+                                    image_url=image_url,
+                                    user_prompt=user_prompt,
+                                    page_text=page_text,
+                                    cfg=cfg,
+                                    mc=mc,
+                                    max_tokens=request_budget,
+                                    partial_output=content if continuations else None,
+                                )
+                            else:
+                                # Make standard REST API request with retry logic
+                                result = self._make_request_with_retry(api_url, headers, data, cfg)
+                    except Exception as request_err:
+                        # 413 Payload Too Large: retry with the next smaller rendition
+                        error_type, _ = get_error_type_from_message(str(request_err))
+                        if error_type != ErrorType.PAYLOAD_TOO_LARGE or payload_retries >= cfg.max_payload_retries:
+                            raise
+                        smaller = encoder.smaller(rendition)
+                        if smaller is None:
+                            raise
+                        payload_retries += 1
+                        if self.config.verbose:
+                            print(f"    📦 Page {label} rejected at {rendition.size_bytes / (1024 * 1024):.1f}MB, "
+                                  f"retrying at {smaller.size_bytes / (1024 * 1024):.1f}MB")
+                        rendition = smaller
+                        image_url = ImageDataURL(rendition.data, rendition.mime)
+                        messages = self._build_messages(
+                            system_prompt,
+                            user_prompt,
+                            image_url,
+                            cache_hints=cache_hints,
+                            page_text=page_text,
+                        )
+                        data["messages"] = messages + (self._continuation_messages(content) if continuations else [])
+                        continue
 
-            # Parse token usage from API response
-            usage_data = result.get("usage") or {}
-            input_tokens = usage_data.get("prompt_tokens", 0)
-            output_tokens = usage_data.get("completion_tokens", 0)
-            total_tokens = usage_data.get("total_tokens", input_tokens + output_tokens)
+                    token_usage = token_usage + self._parse_token_usage(result.get("usage") or {}, mc)
+                    choice = result['choices'][0]
+                    finish_reason = choice.get('finish_reason')
+                    content = merge_continuation(content, choice['message']['content'] or "")
+                    if finish_reason != "length":
+                        break
+
+                    truncations += 1
+                    if continuations >= cfg.max_continuations:
+                        if self.config.verbose:
+                            print(f"    ✂️  Page {label} still truncated after {continuations} continuations")
+                        break
+
+                    continuations += 1
+                    request_budget = min(request_budget * 2, cfg.max_tokens)
+                    if self.config.verbose:
+                        print(f"    ✂️  Page {label} truncated at {len(content)} chars, "
+                              f"continuing with max_tokens={request_budget}")
+                    data["messages"] = messages + self._continuation_messages(content)
+                    data["max_tokens"] = request_budget
 
-            # Use API's reported cost directly (Requesty returns this, Nebius does not)
-            api_cost = usage_data.get("cost", 0.0)
+                return {
+                    'content': content,
+                    'token_usage': token_usage,
+                    'finish_reason': finish_reason,
+                    'max_tokens': request_budget,
+                    'truncations': truncations,
+                    'continuations': continuations,
+                    'rendition': rendition,
+                    'payload_retries': payload_retries,
+                    'predicted_input_tokens': predicted_input_tokens,
+                }
 
-            # Model info for reporting
-            model_id = mc.model_id if mc else "unknown"
-            endpoint = mc.endpoint_id if mc else "unknown"
-
-            # Only calculate cost ourselves if API didn't provide it
-            if api_cost:
-                actual_cost = api_cost
-                input_cost = 0.0  # Not needed - using actual
-                output_cost = 0.0
-            elif mc:
-                input_cost = (input_tokens / 1_000_000) * mc.pricing.input_cost_per_1m
-                output_cost = (output_tokens / 1_000_000) * mc.pricing.output_cost_per_1m
-                actual_cost = input_cost + output_cost
+            image_encoding = {
+                'dpi': render_dpi,
+                'color_mode': color_mode,
+                # PDF points; image pixel (x, y) is at crop_box origin + (x, y) * 72 / dpi
+                'crop_box': list(crop_box) if crop_box else None,
+            }
+            if tiles:
+                # Tiles run in parallel; _request_slot keeps the page within
+                # the endpoint's request limit together with the other pages
+                with ThreadPoolExecutor(max_workers=len(tiles)) as tile_pool:
+                    parts = list(tile_pool.map(
+                        lambda tile: extract_image(
+                            images[0].crop(tile.box),
+                            f"{page_num} tile {tile.index + 1}/{len(tiles)}",
+                            TILE_PROMPT.format(position=tile.position),
+                        ),
+                        tiles,
+                    ))
+                extraction = {
+                    'content': stitch_tiles([part['content'] for part in parts]),
+                    'token_usage': sum((part['token_usage'] for part in parts), TokenUsage()),
+                    'finish_reason': next(
+                        (part['finish_reason'] for part in parts if part['finish_reason'] == "length"),
+                        parts[-1]['finish_reason'],
+                    ),
+                    'max_tokens': max(part['max_tokens'] for part in parts),
+                    'truncations': sum(part['truncations'] for part in parts),
+                    'continuations': sum(part['continuations'] for part in parts),
+                    'predicted_input_tokens': (
+                        sum(part['predicted_input_tokens'] for part in parts) if mc else None
+                    ),
+                }
+                image_encoding.update({
+                    'format': parts[0]['rendition'].format,
+                    'width': images[0].width,
+                    'height': images[0].height,
+                    'size_bytes': sum(part['rendition'].size_bytes for part in parts),
+                    'payload_retries': sum(part['payload_retries'] for part in parts),
+                    'tiles': [
+                        {'box': list(tile.box), **part['rendition'].to_dict(), 'payload_retries': part['payload_retries']}
+                        for tile, part in zip(tiles, parts)
+                    ],
+                })
+                if self.config.verbose:
+                    print(f"    🧩 Page {page_num} extracted as {len(tiles)} tiles")
             else:
-                input_cost = 0.0
-                output_cost = 0.0
-                actual_cost = 0.0
-
-            token_usage = TokenUsage(
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                total_tokens=total_tokens,
-                cost=actual_cost,
-                input_cost=input_cost,
-                output_cost=output_cost,
-                model_id=model_id,
-                endpoint=endpoint,
-            )
+                extraction = extract_image(images[0], str(page_num))
+                image_encoding.update({
+                    **extraction['rendition'].to_dict(),
+                    'payload_retries': extraction['payload_retries'],
+                })
+
+            # Normalize radio button output (convert ◉/○ to (x)/( ))
+            content = normalize_radio_buttons(extraction['content'])
+            token_usage = extraction['token_usage']
 
             if self.config.verbose:
-                print(f"[TOKENS] Page {page_num}: in={input_tokens}, out={output_tokens}, cost=${actual_cost:.6f}")
+                print(f"[TOKENS] Page {page_num}: in={token_usage.input_tokens} "
+                      f"(predicted={extraction['predicted_input_tokens']}, "
+                      f"cached={token_usage.cached_input_tokens}), "
+                      f"out={token_usage.output_tokens}, max_tokens={extraction['max_tokens']}, "
+                      f"cost=${token_usage.cost:.6f}")
 
             return {
                 'content': f"""
@@ -541,6 +752,12 @@ class AIExtractor:
 """,
                 'token_usage': token_usage,
                 'debug_image_path': saved_image_path,
+                'finish_reason': extraction['finish_reason'],
+                'max_tokens': extraction['max_tokens'],
+                'truncations': extraction['truncations'],
+                'continuations': extraction['continuations'],
+                'image_encoding': image_encoding,
+                'predicted_input_tokens': extraction['predicted_input_tokens'],
             }
 
         except Exception as e:
@@ -548,18 +765,198 @@ class AIExtractor:
             # Previously this swallowed errors and returned them as content,
             # which prevented proper batch error handling
             raise RuntimeError(f"AI extraction failed: {str(e)}") from e
+        finally:
+            if owned_session is not None:
+                owned_session.close()
+
+    def _render_plan(
+        self,
+        pdf_path: str,
+        page_num: int,
+        mc: Optional[AIModelConfig],
+        session: Optional[DocumentSession] = None,
+        render_dpi: Optional[int] = None,
+    ) -> Tuple[int, str, Optional[Tuple[float, float, float, float]]]:
+        """
+        Render DPI, colorspace and crop box for a page.
+
+        Returns:
+            (dpi, color_mode, crop_box): the configured DPI, or fewer if it
+            saves image tokens for the (cropped) image; COLOR_MODE_BW,
+            COLOR_MODE_GRAY or COLOR_MODE_RGB; the content area in PDF
+            points, or None to send the whole page. An explicit render_dpi
+            is used as is.
+        """
+        dpi = render_dpi or self.config.render_dpi
+        color_mode = self.config.color_mode
+        crop_box = None
+        size_for_model = mc is not None and self.config.model_aware_sizing and render_dpi is None
+        if not size_for_model and color_mode != "auto" and not self.config.crop_margins:
+            return dpi, color_mode, crop_box
+
+        source = nullcontext(session.document()) if session is not None else fitz.open(pdf_path)
+        with source as doc:
+            page = doc[page_num - 1]
+            if color_mode == "auto":
+                color_mode = page_color_mode(page)
+            area = page.rect
+            if self.config.crop_margins:
+                content = page_content_bbox(page, self.config.crop_padding_pt)
+                if content is not None:
+                    area = content
+                    crop_box = tuple(round(v, 2) for v in area)
+            if self.config.tile_large_pages:
+                # Pages extracted as tiles keep the full DPI - that is the point of tiling
+                width, height = render_dimensions(area.width, area.height, dpi)
+                if max(width, height) > self.config.tile_max_side_px:
+                    size_for_model = False
+            if size_for_model:
+                dpi = choose_render_size(
+                    area.width,
+                    area.height,
+                    mc.image_tokens,
+                    min_dpi=min(self.config.min_legible_dpi, dpi),
+                    max_dpi=dpi,
+                ).dpi
+        return dpi, color_mode, crop_box
+
+    def _page_tiles(self, image: Image.Image) -> List[Tile]:
+        """Tiles to extract an oversized page render as, or [] to send it whole"""
+        if not self.config.tile_large_pages:
+            return []
+        tiles = plan_tiles(image.width, image.height, self.config.tile_max_side_px, self.config.tile_overlap_px)
+        return tiles if len(tiles) > 1 else []
+
+    def _request_slot(self, mc: Optional[AIModelConfig]):
+        """
+        Semaphore bounding in-flight requests to mc's endpoint.
+
+        The processor runs max_parallel_requests pages at once; tiled pages
+        send several requests each, so every request takes a slot here.
+        """
+        if mc is None:
+            return nullcontext()
+        endpoint = mc.get_endpoint()
+        with self._request_slots_lock:
+            slot = self._request_slots.get(endpoint.name)
+            if slot is None:
+                slot = threading.BoundedSemaphore(endpoint.max_parallel_requests)
+                self._request_slots[endpoint.name] = slot
+        return slot
+
+    @staticmethod
+    def _parse_token_usage(usage_data: Dict, mc: Optional[AIModelConfig]) -> TokenUsage:
+        """Token usage and cost of a single API response"""
+        input_tokens = usage_data.get("prompt_tokens", 0)
+        output_tokens = usage_data.get("completion_tokens", 0)
+        total_tokens = usage_data.get("total_tokens", input_tokens + output_tokens)
+        cached_input_tokens = parse_cached_tokens(usage_data)
+
+        # Use API's reported cost directly (Requesty returns this, Nebius does not)
+        api_cost = usage_data.get("cost", 0.0)
+
+        # Only calculate cost ourselves if API didn't provide it
+        if api_cost:
+            actual_cost = api_cost
+            input_cost = 0.0  # Not needed - using actual
+            output_cost = 0.0
+        elif mc:
+            input_cost = mc.pricing.calculate_input_cost(input_tokens, cached_input_tokens)
+            output_cost = (output_tokens / 1_000_000) * mc.pricing.output_cost_per_1m
+            actual_cost = input_cost + output_cost
+        else:
+            input_cost = 0.0
+            output_cost = 0.0
+            actual_cost = 0.0
+
+        return TokenUsage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+            cost=actual_cost,
+            cached_input_tokens=cached_input_tokens,
+            input_cost=input_cost,
+            output_cost=output_cost,
+            # Model info for reporting
+            model_id=mc.model_id if mc else "unknown",
+            endpoint=mc.endpoint_id if mc else "unknown",
+        )
+
+    @staticmethod
+    def _continuation_messages(partial_output: str) -> List[Dict]:
+        """Messages appended to the original conversation to continue a truncated output"""
+        return [
+            {"role": "assistant", "content": partial_output},
+            {"role": "user", "content": [{"type": "text", "text": CONTINUATION_PROMPT}]},
+        ]
+
+    @staticmethod
+    def _build_messages(
+        system_prompt: str,
+        user_prompt: str,
+        image_url: Union[str, ImageDataURL],
+        cache_hints: bool = False,
+        page_text: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Build chat messages with a byte-identical prefix across pages.
+
+        Providers cache prompt prefixes, so everything that is the same for
+        every page (system prompt, extraction instructions) comes first and
+        anything page-specific (the image, optional page_text) comes last.
+
+        Args:
+            system_prompt: System prompt (may be empty)
+            user_prompt: Extraction instructions shared by all pages
+            image_url: Data URL of the page image (an ImageDataURL is serialized
+                into the request body without building the URL string)
+            cache_hints: Add cache_control breakpoints after the shared prefix
+            page_text: Optional page-specific instructions, placed after the image
+        """
+        messages: List[Dict] = []
+        if system_prompt:
+            messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+
+        instructions: Dict = {"type": "text", "text": user_prompt}
+        if cache_hints:
+            instructions["cache_control"] = {"type": "ephemeral"}
+
+        content = [
+            instructions,
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": image_url
+                }
+            }
+        ]
+        if page_text:
+            content.append({"type": "text", "text": page_text})
+
+        messages.append({
+            "role": "user",
+            "content": content
+        })
+        return messages
 
     def _make_request_with_retry(self, api_url: str, headers: Dict, data: Dict, cfg: LLMConfig) -> Dict:
         """Make API request with retry logic for rate limiting and resource exhaustion"""
         last_error = None
         max_retries = cfg.max_retries + 2  # Extra retries for rate limiting
 
+        # Serialized once, page image base64-encoded in place (see payload.py)
+        body = RequestBody(data)
+        headers = {"Content-Type": "application/json", **headers}
+
         for attempt in range(max_retries + 1):
             try:
                 response = requests.post(
                     api_url,
                     headers=headers,
-                    json=data,
+                    data=body.reader(),
                     timeout=cfg.timeout_seconds
                 )
 
@@ -613,6 +1010,10 @@ class AIExtractor:
                 last_error = e
                 error_str = str(e).lower()
 
+                # The same payload will be rejected again; the caller shrinks it
+                if e.response is not None and e.response.status_code == 413:
+                    raise
+
                 # Check for rate limiting in error message
                 if 'resource' in error_str or 'exhausted' in error_str or '429' in error_str:
                     if attempt < max_retries:
@@ -633,10 +1034,13 @@ class AIExtractor:
         self,
         provider: str,
         model_id: str,
-        img_base64: str,
+        image_url: Union[str, ImageDataURL],
         user_prompt: str,
         cfg: LLMConfig,
-        mc: AIModelConfig
+        mc: AIModelConfig,
+        max_tokens: Optional[int] = None,
+        partial_output: Optional[str] = None,
+        page_text: Optional[str] = None,
     ) -> Dict:
         """Make request via HuggingFace Inference Provider with retry logic"""
         if not HF_AVAILABLE:
@@ -647,7 +1051,21 @@ class AIExtractor:
             raise ValueError("HF_TOKEN environment variable not set")
 
         client = InferenceClient(provider=provider, api_key=api_key)
-        img_data_url = f"data:image/png;base64,{img_base64}"
+        # The HF client serializes the request itself, so it needs the URL string
+        img_data_url = str(image_url)
+
+        messages = [{
+            "role": "user",
+            # Instructions before the image keep the prompt prefix cacheable
+            "content": [
+                {"type": "text", "text": user_prompt},
+                {"type": "image_url", "image_url": {"url": img_data_url}}
+            ]
+        }]
+        if page_text:
+            messages[0]["content"].append({"type": "text", "text": page_text})
+        if partial_output is not None:
+            messages += self._continuation_messages(partial_output)
 
         max_retries = cfg.max_retries + 2  # Extra retries for rate limiting
         last_error = None
@@ -656,14 +1074,8 @@ class AIExtractor:
             try:
                 response = client.chat.completions.create(
                     model=model_id,
-                    messages=[{
-                        "role": "user",
-                        "content": [
-                            {"type": "image_url", "image_url": {"url": img_data_url}},
-                            {"type": "text", "text": user_prompt}
-                        ]
-                    }],
-                    max_tokens=cfg.max_tokens,
+                    messages=messages,
+                    max_tokens=max_tokens or cfg.max_tokens,
                     temperature=mc.parameters.temperature if mc else cfg.temperature,
                 )
 
@@ -672,11 +1084,15 @@ class AIExtractor:
                 usage = response.usage
 
                 return {
-                    "choices": [{"message": {"content": content}}],
+                    "choices": [{
+                        "message": {"content": content},
+                        "finish_reason": response.choices[0].finish_reason,
+                    }],
                     "usage": {
                         "prompt_tokens": usage.prompt_tokens if usage else 0,
                         "completion_tokens": usage.completion_tokens if usage else 0,
                         "total_tokens": (usage.prompt_tokens + usage.completion_tokens) if usage else 0,
+                        "cached_tokens": _hf_cached_tokens(usage),
                     }
                 }
 
@@ -693,8 +1109,8 @@ class AIExtractor:
                         time.sleep(wait_time)
                         continue
 
-                # Don't retry on payment/auth errors
-                if '402' in error_str or '401' in error_str or '403' in error_str:
+                # Don't retry on payment/auth errors or oversized payloads
+                if '402' in error_str or '401' in error_str or '403' in error_str or '413' in error_str:
                     raise
 
                 # Retry other errors with shorter backoff
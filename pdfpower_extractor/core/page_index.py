@@ -0,0 +1,175 @@
+"""
+Page index sidecar for random access into extraction output.
+
+Readers used to find a page in the merged Markdown by scanning for its
+`<!-- TOC PAGE_NN -->` marker, reading the whole file for every lookup.
+With ExtractionConfig.write_page_index the output gets a JSON sidecar,
+<output>.index.json, with the byte offset and length of every page section
+plus its FORM_ID, TOC summary, token usage and validation status:
+
+    {
+      "version": 1,
+      "source": "form.pdf",
+      "md5": "...",
+      "output_bytes": 48213,
+      "pages": [
+        {"page": 1, "offset": 1630, "length": 912, "form_id": "NL-V-1",
+         "summary": "Personal details", "input_tokens": 1210,
+         "output_tokens": 388, "cost": 0.0004, "valid": true, "issues": 0},
+        ...
+      ]
+    }
+
+PageIndexReader mmaps the output and slices a page straight out of it.
+"""
+
+import json
+import mmap
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+
+
+def index_path_for(output_path: str) -> str:
+    """Sidecar path for an output file"""
+    return os.fspath(output_path) + INDEX_SUFFIX
+
+
+@dataclass
+class PageIndexEntry:
+    """Where a page section sits in the output, and what it contains"""
+    page: int
+    offset: int  # bytes from the start of the output file
+    length: int  # bytes, UTF-8
+    form_id: Optional[str] = None
+    summary: str = ""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    valid: Optional[bool] = None  # None when the page was not validated
+    issues: int = 0
+
+
+class PageIndexBuilder:
+    """
+    Tracks page sections as they are written, in page order.
+
+    Offsets are recorded relative to the first section; place() shifts them
+    once the size of the header written in front of the sections is known.
+    """
+
+    def __init__(self):
+        self.entries: List[PageIndexEntry] = []
+        self.output_bytes = 0
+        self._body_bytes = 0
+
+    def add(self, section: str, entry: PageIndexEntry) -> None:
+        """
+        Args:
+            section: The page section as written (sections are joined by a newline)
+            entry: The page's entry; offset and length are filled in here
+        """
+        if self.entries:
+            self._body_bytes += 1  # "\n" separator
+        entry.offset = self._body_bytes
+        entry.length = len(section.encode("utf-8"))
+        self._body_bytes += entry.length
+        self.entries.append(entry)
+
+    def place(self, header: str) -> List[PageIndexEntry]:
+        """Shift the entries behind the header; returns them"""
+        header_bytes = len(header.encode("utf-8"))
+        for entry in self.entries:
+            entry.offset += header_bytes
+        self.output_bytes = header_bytes + self._body_bytes
+        return self.entries
+
+
+def write_page_index(
+    output_path: str,
+    entries: List[PageIndexEntry],
+    output_bytes: int,
+    source: Optional[str] = None,
+    md5: Optional[str] = None,
+) -> str:
+    """
+    Write the sidecar for an output file.
+
+    Returns:
+        Path of the sidecar
+    """
+    path = index_path_for(output_path)
+    data = {
+        "version": INDEX_VERSION,
+        "source": source,
+        "md5": md5,
+        "output_bytes": output_bytes,
+        "pages": [asdict(entry) for entry in entries],
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+    return path
+
+
+class PageIndexReader:
+    """
+    Random access to the pages of an indexed output.
+
+    Usage:
+        with PageIndexReader("output.txt") as reader:
+            print(reader.entry(12).form_id)
+            markdown = reader.read_page(12)
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = os.fspath(output_path)
+        with open(index_path_for(self.output_path), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported page index version: {data.get('version')}")
+        self.source: Optional[str] = data.get("source")
+        self.md5: Optional[str] = data.get("md5")
+        self.output_bytes: int = data["output_bytes"]
+        self.entries: Dict[int, PageIndexEntry] = {
+            entry["page"]: PageIndexEntry(**entry) for entry in data["pages"]
+        }
+        self._file = open(self.output_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size != self.output_bytes:
+            self._file.close()
+            raise ValueError(
+                f"{self.output_path} is {size} bytes, its index expects {self.output_bytes}: "
+                "the output changed after the index was written"
+            )
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __enter__(self) -> "PageIndexReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[PageIndexEntry]:
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def entry(self, page_num: int) -> PageIndexEntry:
+        return self.entries[page_num]
+
+    def read_page(self, page_num: int) -> str:
+        """The page's section, read without scanning the output"""
+        entry = self.entries[page_num]
+        return self._map[entry.offset:entry.offset + entry.length].decode("utf-8")
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
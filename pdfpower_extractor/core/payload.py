@@ -0,0 +1,161 @@
+"""
+Request body builder that keeps page images out of intermediate strings.
+
+Sending a page image through requests' json= takes a copy per step: the
+base64 bytes, their str decode, the data: URL f-string, the serialized JSON
+str and its UTF-8 encode - five copies of a multi-MB image per request.
+
+Here the messages carry an ImageDataURL (the encoded image plus its MIME
+type) instead of the URL string. RequestBody serializes everything else
+with json.dumps, leaving a placeholder per image, computes the exact body
+size, preallocates one buffer and base64-encodes each image straight into
+it in chunks. BodyReader streams that buffer to requests without another
+copy. See benchmark_payload_memory.py for tracemalloc numbers.
+"""
+
+import binascii
+import io
+import json
+import re
+from typing import Any, Dict, List, Union
+
+# Raw image bytes base64-encoded per step (a multiple of 3, so chunks concatenate)
+BASE64_CHUNK_BYTES = 3 * 64 * 1024
+
+_PLACEHOLDER = "\x00image:{}\x00"
+_PLACEHOLDER_PATTERN = re.compile(r"\\u0000image:(\d+)\\u0000")
+
+
+def base64_length(size: int) -> int:
+    """Length of the base64 encoding of size bytes (with padding)"""
+    return 4 * ((size + 2) // 3)
+
+
+class ImageDataURL:
+    """
+    data: URL of an encoded image, base64-encoded only when written out.
+
+    Stands in for the URL string in request messages; len() is the length
+    of the URL it represents, str() builds it (for clients that need a str).
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], mime: str):
+        self.data = memoryview(data).cast("B")
+        self.mime = mime
+        self.prefix = f"data:{mime};base64,".encode("ascii")
+
+    def __len__(self) -> int:
+        return len(self.prefix) + base64_length(self.data.nbytes)
+
+    def __str__(self) -> str:
+        buffer = bytearray(len(self))
+        self.write_into(memoryview(buffer))
+        return buffer.decode("ascii")
+
+    def __repr__(self) -> str:
+        return f"ImageDataURL({self.mime}, {self.data.nbytes} bytes)"
+
+    def write_into(self, buffer: memoryview) -> int:
+        """
+        Write the URL into the start of buffer.
+
+        Returns:
+            Number of bytes written
+        """
+        pos = len(self.prefix)
+        buffer[:pos] = self.prefix
+        for offset in range(0, self.data.nbytes, BASE64_CHUNK_BYTES):
+            chunk = binascii.b2a_base64(self.data[offset:offset + BASE64_CHUNK_BYTES], newline=False)
+            buffer[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        return pos
+
+
+class RequestBody:
+    """
+    UTF-8 JSON body for a request payload, assembled in one preallocated buffer.
+
+    Usage:
+        body = RequestBody({"model": ..., "messages": [... ImageDataURL(...) ...]})
+        requests.post(url, headers=headers, data=body.reader())
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        images: List[ImageDataURL] = []
+
+        def placeholder(obj):
+            if isinstance(obj, ImageDataURL):
+                images.append(obj)
+                return _PLACEHOLDER.format(len(images) - 1)
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+        # Same separators and NaN handling as requests' json=
+        text = json.dumps(payload, default=placeholder, allow_nan=False)
+        pieces: List[Union[bytes, ImageDataURL]] = []
+        last = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(text):
+            pieces.append(text[last:match.start()].encode("utf-8"))
+            pieces.append(images[int(match.group(1))])
+            last = match.end()
+        pieces.append(text[last:].encode("utf-8"))
+
+        self.buffer = bytearray(sum(len(piece) for piece in pieces))
+        view = memoryview(self.buffer)
+        pos = 0
+        for piece in pieces:
+            if isinstance(piece, ImageDataURL):
+                pos += piece.write_into(view[pos:])
+            else:
+                view[pos:pos + len(piece)] = piece
+                pos += len(piece)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def reader(self) -> "BodyReader":
+        """A fresh stream over the body (one per request attempt)"""
+        return BodyReader(memoryview(self.buffer))
+
+
+class BodyReader(io.RawIOBase):
+    """
+    Seekable read-only stream over a buffer.
+
+    requests sends file-like bodies in blocks and takes Content-Length from
+    len()/tell(), so the body is neither copied nor sent chunked.
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._view.nbytes
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        size = min(len(target), self._view.nbytes - self._pos)
+        target[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._view.nbytes + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        self._pos = max(0, min(self._pos, self._view.nbytes))
+        return self._pos
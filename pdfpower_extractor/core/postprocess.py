@@ -0,0 +1,270 @@
+"""
+Single-pass page post-processing.
+
+Every page section used to be scanned several times: the radio button
+normalizer, two passes for the TOC summary, one for the FORM_ID (with
+regexes compiled for every line) and one for compact dates.
+postprocess_page() reads a page's lines once with precompiled patterns and
+returns the normalized content, TOC summary, FORM_ID and stats together;
+compact dates are rewritten in one regex pass over the result.
+
+summarize_page() and extract_form_id() apply the same rules to a single
+piece of text. See benchmark_postprocess.py.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+SUMMARY_MAX_CHARS = 120
+EMPTY_PAGE_SUMMARY = "Empty page"
+
+RADIO_SELECTED = "◉"
+RADIO_UNSELECTED = "○"
+
+_RADIO_SELECTED_SUFFIX = re.compile(r"\s*\(x\)\s*$")
+_RADIO_UNSELECTED_SUFFIX = re.compile(r"\s*\(\s*\)\s*$")
+# DDMMYYYY -> DD-MM-YYYY
+_COMPACT_DATE = re.compile(
+    r"\b(?P<day>0[1-9]|[12][0-9]|3[01])"
+    r"(?P<month>0[1-9]|1[0-2])"
+    r"(?P<year>(19|20)\d{2})\b"
+)
+_COMPACT_DATE_REPLACEMENT = r"\g<day>-\g<month>-\g<year>"
+# **FORM_ID**: `xxx` or FORM_ID**: `xxx`
+_FORM_ID = re.compile(r"\*\*FORM_ID\*\*:\s*`([^`]+)`")
+_FORM_ID_LOOSE = re.compile(r"FORM_ID\*\*:\s*`([^`]+)`")
+_BACKTICK_VALUE = re.compile(r"`([^`]+)`")
+_BACKTICK_VALUE_OR_EMPTY = re.compile(r"`([^`]*)`")
+# Application codes: XXX-XXX-XXXX, e.g. K75-19Z-RZLT
+_APPLICATION_CODE = re.compile(r"^[A-Z0-9]{3}-[A-Z0-9]{3}-[A-Z0-9]{4}$", re.IGNORECASE)
+_DOC_IDENTITY_PREFIX = re.compile(r"^DOC\s+IDENTITY\s+\d+\s+", re.IGNORECASE)
+# Leading section numbers: "1. ", "2 ", "4.2.1 ", "1A. "
+_SECTION_NUMBER = re.compile(r"^\d+(\.\d+)*[A-Z]?\.?\s+")
+_EMPTY_PAGE_LINES = {"this page is empty", "page is empty"}
+
+
+@dataclass
+class PostProcessedPage:
+    """A page's output after post-processing"""
+    content: str  # Leading blanks/headers dropped, radio buttons and dates normalized
+    summary: str  # One-line TOC description
+    form_id: Optional[str] = None
+    # lines, radio_lines (radio buttons normalized), dates (compact dates rewritten)
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def normalize_radio_line(line: str) -> str:
+    """'◉ option (x)' or '◉ option' -> '(x) option'; likewise ○ -> ( )"""
+    if RADIO_SELECTED in line:
+        line = _RADIO_SELECTED_SUFFIX.sub("", line)
+        line = line.replace(RADIO_SELECTED, "(x)")
+    if RADIO_UNSELECTED in line:
+        line = _RADIO_UNSELECTED_SUFFIX.sub("", line)
+        line = line.replace(RADIO_UNSELECTED, "( )")
+    return line
+
+
+def normalize_compact_dates(text: str) -> str:
+    """Insert dashes into compact DDMMYYYY dates (dd-mm-yyyy)"""
+    return _COMPACT_DATE.sub(_COMPACT_DATE_REPLACEMENT, text)
+
+
+def is_application_code(text: str) -> bool:
+    """True for application codes (XXX-XXX-XXXX, e.g. K75-19Z-RZLT)"""
+    return bool(_APPLICATION_CODE.match(text.strip()))
+
+
+def is_doc_identity_code(text: str) -> bool:
+    """True for DOC IDENTITY codes, e.g. DOC IDENTITY 0109 PASSPORT SPONSOR 2/2"""
+    return text.strip().upper().startswith("DOC IDENTITY")
+
+
+def doc_identity_description(text: str) -> str:
+    """'DOC IDENTITY 0109 PASSPORT SPONSOR 2/2' -> 'PASSPORT SPONSOR 2/2'"""
+    if not is_doc_identity_code(text):
+        return text
+    return _DOC_IDENTITY_PREFIX.sub("", text.strip()).strip()
+
+
+def _form_id_match(line: str) -> Optional[str]:
+    """FORM_ID value on a stripped line, if the line declares one"""
+    match = _FORM_ID.search(line) or _FORM_ID_LOOSE.search(line)
+    return match.group(1).strip() if match else None
+
+
+def _real_form_id(value: str) -> Optional[str]:
+    """The value, unless it is a DOC IDENTITY or application code"""
+    if is_doc_identity_code(value) or is_application_code(value):
+        return None
+    return value
+
+
+def _page_type(line: str) -> Optional[str]:
+    """PAGE_TYPE value (AI page classification) on a stripped line"""
+    if "`" not in line:
+        return None
+    match = _BACKTICK_VALUE.search(line)
+    if match and match.group(1).strip():
+        return match.group(1).strip()[:SUMMARY_MAX_CHARS]
+    return None
+
+
+def _summary_candidate(line: str) -> Optional[str]:
+    """
+    Summary from a stripped content line, or None to keep looking.
+
+    Metadata is skipped: FORM_ID lines (except DOC IDENTITY codes, whose
+    description is used), comments and PAGE_TYPE lines (the caller skips
+    those). Markdown markers and section numbers are removed.
+    """
+    if "FORM_ID" in line and "`" in line:
+        match = _BACKTICK_VALUE_OR_EMPTY.search(line)
+        if match:
+            value = match.group(1).strip()
+            if value and is_doc_identity_code(value):
+                description = doc_identity_description(value)
+                if description:
+                    return description[:SUMMARY_MAX_CHARS]
+        return None
+
+    clean_line = line.lstrip("#").lstrip("*").lstrip("-").strip()
+    clean_line = clean_line.strip("*").strip()
+    if clean_line.lower() in _EMPTY_PAGE_LINES:
+        return EMPTY_PAGE_SUMMARY
+    if clean_line:
+        return _SECTION_NUMBER.sub("", clean_line[:SUMMARY_MAX_CHARS])
+    return None
+
+
+class _PageScanner:
+    """
+    Collects PAGE_TYPE, the first summary candidate and the FORM_ID line by
+    line. done turns True as soon as the remaining lines cannot change them,
+    e.g. right after the first content line of a page without PAGE_TYPE.
+    """
+
+    __slots__ = ("page_type", "fallback", "form_id", "form_id_seen", "_wants_page_type")
+
+    def __init__(self, text: str):
+        self.page_type: Optional[str] = None
+        self.fallback: Optional[str] = None
+        self.form_id: Optional[str] = None
+        # Pages without the markers are never scanned for them
+        self.form_id_seen = "FORM_ID" not in text
+        self._wants_page_type = "PAGE_TYPE" in text
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.form_id_seen
+            and (self.page_type is not None or not self._wants_page_type)
+            and (self.fallback is not None or self.page_type is not None)
+        )
+
+    def feed(self, raw_line: str) -> None:
+        line = raw_line.strip()
+        if not line:
+            return
+        if not self.form_id_seen and "FORM_ID" in line:
+            value = _form_id_match(line)
+            if value is not None:
+                # Only the first FORM_ID counts, even if it is not a real one
+                self.form_id_seen = True
+                self.form_id = _real_form_id(value)
+        if self._wants_page_type and "PAGE_TYPE" in line:
+            if self.page_type is None:
+                self.page_type = _page_type(line)
+            return
+        if self.fallback is None and not line.startswith("<!--"):
+            self.fallback = _summary_candidate(line)
+
+    @property
+    def summary(self) -> str:
+        return self.page_type or self.fallback or EMPTY_PAGE_SUMMARY
+
+
+def summarize_page(text: str) -> str:
+    """
+    One-line TOC summary for a page.
+
+    Prefers PAGE_TYPE (the model's page classification); otherwise the
+    first meaningful content line.
+    """
+    if not text or not text.strip():
+        return EMPTY_PAGE_SUMMARY
+    scanner = _PageScanner(text)
+    for line in text.splitlines():
+        if scanner.done:
+            break
+        scanner.feed(line)
+    return scanner.summary
+
+
+def extract_form_id(text: str) -> Optional[str]:
+    """
+    First FORM_ID in a page's content, excluding DOC IDENTITY and
+    application codes.
+
+    Returns:
+        Form ID string if found (e.g., "B07001", "7103-03"), None otherwise
+    """
+    if not text:
+        return None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if "FORM_ID" in line:
+            value = _form_id_match(line)
+            if value is not None:
+                return _real_form_id(value)
+    return None
+
+
+def _body_start(lines: List[str]) -> int:
+    """Index of the first line after leading blanks and internal headers (=== Page N ===)"""
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    while start < len(lines) and lines[start].lstrip().startswith("==="):
+        start += 1
+    return start
+
+
+def strip_page_banner(content: Optional[str]) -> str:
+    """A page's content without the banner the extractor wraps it in, e.g. for validation"""
+    lines = (content or "").splitlines()
+    return "\n".join(lines[_body_start(lines):])
+
+
+def postprocess_page(content: Optional[str]) -> PostProcessedPage:
+    """
+    Normalize a page's output and read its summary and FORM_ID in one pass.
+
+    Args:
+        content: The page's Markdown as extracted (or cached/templated)
+
+    Returns:
+        PostProcessedPage
+    """
+    lines = (content or "").splitlines()
+    body = lines[_body_start(lines):]
+    has_radio = RADIO_SELECTED in content or RADIO_UNSELECTED in content if content else False
+    scanner = _PageScanner(content or "")
+    radio_lines = 0
+    for i, raw_line in enumerate(body):
+        if has_radio and (RADIO_SELECTED in raw_line or RADIO_UNSELECTED in raw_line):
+            raw_line = body[i] = normalize_radio_line(raw_line)
+            radio_lines += 1
+        if not scanner.done:
+            scanner.feed(raw_line)
+        elif not has_radio:
+            break
+
+    cleaned = "\n".join(body).strip()
+    normalized, dates = _COMPACT_DATE.subn(_COMPACT_DATE_REPLACEMENT, cleaned)
+    return PostProcessedPage(
+        content=normalized,
+        summary=scanner.summary if cleaned else EMPTY_PAGE_SUMMARY,
+        form_id=scanner.form_id,
+        stats={"lines": len(body), "radio_lines": radio_lines, "dates": dates},
+    )
@@ -11,19 +11,44 @@ which references configurations in models/config.py
 import os
 import hashlib
 import time
-import re
 import json
+from dataclasses import replace
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional, Callable, Any, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Callable, Any, List, Set, Tuple, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from .analyzer import PDFAnalyzer, detect_page_images
+from .analyzer import PDFAnalyzer, describe_page_images
 import fitz  # PyMuPDF
 from .extractor import AIExtractor
-from .config import ExtractionConfig
+from .config import CascadeTier, ExtractionConfig
 from .validator import OutputValidator, ValidationResult
-from ..models.config import TokenUsage
+from .cache import ResultCache, page_fingerprint, layout_fingerprint
+from .templates import PageTemplate, TemplateRegistry
+from .scheduler import PageCostPredictor, PageFeatures, PageQueue, SCHEDULE_LARGEST_FIRST
+from .session import DocumentSession, PDFSource
+from .page_index import PageIndexBuilder, PageIndexEntry, write_page_index
+from .streaming import (
+    ORDER_COMPLETION,
+    ORDER_PAGE,
+    CallbackSink,
+    MarkdownFileSink,
+    MemorySink,
+    OrderedPageWriter,
+    PageCallback,
+)
+from .postprocess import PostProcessedPage, extract_form_id, postprocess_page, strip_page_banner
+from .reextraction import PageRetry, PendingAttempt, ReextractionBudget, blocking_issues
+from .cascade import (
+    CHECKBOX_MISMATCH,
+    CascadeReport,
+    OptionStates,
+    count_selected_options,
+    detect_option_states,
+    top_tier_cost,
+)
+from .prompts import get_system_prompt, get_vision_prompt
+from ..models.config import AIModelConfig, TokenUsage, get_model_config
 from .errors import (
     ExtractionError,
     BatchResult,
@@ -47,13 +72,18 @@ class PDFProcessor:
         from pdfpower_extractor.core import mistral_config
         processor = PDFProcessor(pdf_path, config=mistral_config())
         result = processor.process()
+
+        # Or straight from an upload (bytes, memoryview or mmap) - no temp file
+        processor = PDFProcessor(upload_bytes, config=gemini_config(), name="upload.pdf")
+        result = processor.process()
     """
 
     def __init__(
         self,
-        pdf_path: str,
+        pdf_path: PDFSource,
         config: Optional[ExtractionConfig] = None,
-        api_key: str = None  # Optional override, otherwise resolved from model config
+        api_key: str = None,  # Optional override, otherwise resolved from model config
+        name: Optional[str] = None,  # Document name for in-memory PDFs (headers, cache, audit log)
     ):
         self.pdf_path = pdf_path
         self.config = config or ExtractionConfig()
@@ -61,38 +91,78 @@ class PDFProcessor:
         # Get model config
         self.model_config = self.config.get_model_config()
 
-        self.analyzer = PDFAnalyzer(pdf_path)
+        # The PDF is read once per run and shared by every stage
+        self.session = DocumentSession(pdf_path, name=name)
+        self.document_name = self.session.name
+        self.analyzer = PDFAnalyzer(pdf_path, session=self.session)
         self.ai_extractor = AIExtractor(
             api_key=api_key,
             config=self.config,
             model_config=self.model_config
         )
         self.validator = OutputValidator()
+        # Validation-driven re-extraction (see core/reextraction.py)
+        reextract_model = self.config.validation.reextract_model_config_id
+        self.reextract_model_config = get_model_config(reextract_model) if reextract_model else None
+        self.page_retries: Dict[int, PageRetry] = {}
+        self.reextraction_budget: Optional[ReextractionBudget] = None
+        # Cheap-first model cascade (see core/cascade.py); model_config is its first tier
+        self.cascade_models = [get_model_config(tier.model_config_id) for tier in self.config.model_cascade]
+        self.cascade_report: Optional[CascadeReport] = None
+        self.page_option_states: Dict[int, Optional[OptionStates]] = {}
 
         self.last_cost = 0.0
         self.last_duration = 0.0
+        self.last_summary: Dict[str, Any] = {}
+        self.total_pages = 0
+        # Byte offsets of the page sections in the last output (see core/page_index.py)
+        self.page_index: List[PageIndexEntry] = []
+        self.output_bytes = 0
         self._md5_hash = None
         self.validation_results: Dict[int, ValidationResult] = {}
-        self._compact_date_pattern = re.compile(
-            r"\b(?P<day>0[1-9]|[12][0-9]|3[01])"
-            r"(?P<month>0[1-9]|1[0-2])"
-            r"(?P<year>(19|20)\d{2})\b"
-        )
 
         # Token usage tracking
         self.total_token_usage: TokenUsage = TokenUsage()
         self.page_token_usage: Dict[int, TokenUsage] = {}
 
+        # Incremental re-extraction (only populated when config.cache_dir is set)
+        self.result_cache: Optional[ResultCache] = (
+            ResultCache(self.config.cache_dir) if self.config.cache_dir else None
+        )
+        self.page_fingerprints: Dict[int, str] = {}
+        self.reused_pages: List[int] = []
+        self.extracted_pages: List[int] = []
+        # Non-empty pages selected for this run (extracted, reused or templated)
+        self.processed_pages: List[int] = []
+
+        # Form templates (only populated when config.template_dir is set)
+        self.template_registry: Optional[TemplateRegistry] = (
+            TemplateRegistry(self.config.template_dir) if self.config.template_dir else None
+        )
+        self.page_layouts: Dict[int, str] = {}
+        self.template_pages: List[int] = []
+
+        # Page scheduling (output token history is kept in the result cache)
+        self.cost_predictor = PageCostPredictor(self.result_cache)
+        self.predicted_output_tokens: Dict[int, int] = {}
+        self.dispatch_order: List[int] = []
+        # Most finished pages held in the reorder buffer at once
+        self.reorder_peak = 0
+        # Post-processing done by the extraction workers in the last run
+        self.worker_postprocess_seconds = 0.0
+
+        # Pages cut off at max_tokens: {page_num: {'truncations': n, 'continuations': n}}
+        self.page_truncations: Dict[int, Dict[str, int]] = {}
+        # Chosen image rendition, encode attempts and 413 retries per page
+        self.page_encodings: Dict[int, Dict[str, Any]] = {}
+
     def calculate_md5(self) -> str:
         """Calculate MD5 hash of the PDF file"""
         if self._md5_hash:
             return self._md5_hash
 
-        hash_md5 = hashlib.md5()
-        with open(self.pdf_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        self._md5_hash = hash_md5.hexdigest()
+        # Hashes the session's bytes instead of reading the file again
+        self._md5_hash = self.session.md5()
         return self._md5_hash
 
     def process(
@@ -104,6 +174,8 @@ class PDFProcessor:
         audit_log_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
         audit_retention_hours: Optional[int] = 24,
         selected_pages: Optional[List[int]] = None,
+        output_path: Optional[str] = None,
+        page_callback: Optional[PageCallback] = None,
     ) -> str:
         """
         Process the PDF using AI vision extraction.
@@ -116,11 +188,15 @@ class PDFProcessor:
             audit_log_path: Optional path to append audit log entries (JSONL); logging is off unless provided.
             audit_log_hook: Optional callable receiving each audit entry dict.
             audit_retention_hours: Optional retention window (hours) for pruning the audit log; set to None to disable pruning.
+            output_path: Optional file to stream the output to. Page sections are written in page
+                order as pages complete; the header and TOC are patched in at the end.
+            page_callback: Optional callable receiving (page_num, section) for each page, in page order,
+                as pages complete.
 
         Returns:
-            Extracted content as Markdown
+            Extracted content as Markdown. When streaming (output_path or page_callback), only the
+            header and TOC - the page sections went to the file or callback.
         """
-        start_time = time.time()
         start_dt = datetime.now()
         env_audit_path = os.getenv("PDFPOWER_AUDIT_LOG")
         resolved_audit_log_path = audit_log_path or env_audit_path
@@ -129,15 +205,165 @@ class PDFProcessor:
             resolved_audit_log_path = str(Path.home() / ".pdfpower" / "logs" / "extraction-audit.log")
 
         exc: Optional[Exception] = None
+        sink = None
+        try:
+            # Page sections go to the sink in page order as soon as the next
+            # page is done (see core/streaming.py). When streaming, workers
+            # stay within reorder_buffer_pages of the next page to write.
+            streaming = output_path is not None or page_callback is not None
+            if output_path is not None:
+                sink = MarkdownFileSink(output_path, callback=page_callback)
+            elif page_callback is not None:
+                sink = CallbackSink(page_callback)
+            else:
+                sink = MemorySink()
+            window = max(1, self.config.reorder_buffer_pages) if streaming else None
+
+            toc_entries: List[Tuple[int, str, Optional[str]]] = []  # (page_num, description, form_id)
+            page_index = PageIndexBuilder()
+            # Non-empty pages, for the BatchResult of a fail_fast error
+            batch_pages: Dict[int, PageResult] = {}
+            post_seconds = 0.0
+            pages = self._stream_pages(ORDER_PAGE, window, progress_callback, debug_save_images, selected_pages)
+            for page in pages:
+                if page.source != "empty":
+                    # Streamed content is not kept
+                    batch_pages[page.page_num] = replace(page, content=None) if streaming else page
+                if page.success:
+                    content = page.content
+                elif self.config.fail_fast:
+                    continue  # Raised below, once every page is done
+                else:
+                    # fail_fast=False: Continue processing, add error markers for failed pages
+                    content = f"**⚠️ Page {page.page_num} extraction failed**\n\nError: {page.error.message}\n"
+
+                post_start = time.time()
+                # Successful pages arrive post-processed; only error markers are processed here
+                section, toc_entry = self._page_section(
+                    page.page_num, self.total_pages, content, page.postprocessed if page.success else None
+                )
+                toc_entries.append(toc_entry)
+                page_index.add(section, self._page_index_entry(page, toc_entry))
+                sink.write(page.page_num, section)
+                post_seconds += time.time() - post_start
+
+            # Check for page errors
+            if self.config.fail_fast and any(not page.success for page in batch_pages.values()):
+                # fail_fast=True (default): Raise structured error
+                batch_result = BatchResult(total_pages=self.total_pages, pages=batch_pages)
+                raise ExtractionError.from_batch_result(batch_result)
+
+            # Create header with actual pages processed count
+            post_start = time.time()
+            file_header = self._create_header(self.last_summary, self.last_cost, extra_metadata, len(self.processed_pages))
+            toc_block = self._build_top_level_toc(toc_entries)
+            if "<!-- TOC START -->" not in toc_block:
+                raise ValueError("Grouped TOC block missing from output; header assembly failed.")
+
+            final_output = sink.finish(file_header + toc_block)
+            sink = None
+            self.page_index = page_index.place(file_header + toc_block)
+            self.output_bytes = page_index.output_bytes
+            if output_path is not None and self.config.write_page_index:
+                write_page_index(output_path, self.page_index, self.output_bytes, self.document_name, self.calculate_md5())
+
+            print(
+                f"[TIMING] Post-processing took {post_seconds + time.time() - post_start:.2f}s "
+                f"(+{self.worker_postprocess_seconds:.2f}s in workers, during extraction)"
+            )
+            return final_output
+        except Exception as err:
+            exc = err
+            if sink is not None:
+                sink.abort()
+            if audit_enabled:
+                self._emit_audit_log(
+                    status="failure",
+                    start_dt=start_dt,
+                    end_dt=datetime.now(),
+                    error=str(err),
+                    audit_log_path=resolved_audit_log_path,
+                    audit_log_hook=audit_log_hook,
+                    audit_retention_hours=audit_retention_hours,
+                )
+            raise
+        finally:
+            if audit_enabled and exc is None:
+                self._emit_audit_log(
+                    status="success",
+                    start_dt=start_dt,
+                    end_dt=datetime.now(),
+                    error=None,
+                    audit_log_path=resolved_audit_log_path,
+                    audit_log_hook=audit_log_hook,
+                    audit_retention_hours=audit_retention_hours,
+                )
+            # Release the per-thread document handles (the bytes are kept)
+            self.session.close()
+
+    def process_stream(
+        self,
+        order: str = ORDER_PAGE,
+        progress_callback: Optional[Callable[[Any], None]] = None,
+        debug_save_images: bool = False,
+        selected_pages: Optional[List[int]] = None,
+    ) -> Iterator[PageResult]:
+        """
+        Extract the PDF, yielding each page as soon as it is done.
+
+        Consumers can start on the first pages while later pages are still
+        being extracted:
+
+            for page in processor.process_stream():
+                if page.success:
+                    index(page.page_num, page.content)
+
+        Failed pages are yielded with success=False and their PageError; the
+        caller decides whether to stop (fail_fast applies to process() only).
+        Token usage, validation results and run metrics (last_cost,
+        last_duration, ...) are recorded on the processor as with process().
+
+        Args:
+            order: "page" - in page order; pages finished ahead of an earlier page wait
+                in a buffer of at most config.reorder_buffer_pages pages.
+                "completion" - as each page completes.
+            progress_callback: Callback for progress updates
+            debug_save_images: If True, save converted images to /tmp/powerpdf_extracted_images/
+            selected_pages: Optional page numbers to extract (empty pages are always yielded)
+
+        Returns:
+            Iterator of PageResult (content, token usage, validation, duration, source)
+        """
+        if order not in (ORDER_PAGE, ORDER_COMPLETION):
+            raise ValueError(f"Unknown page order: {order}. Use '{ORDER_PAGE}' or '{ORDER_COMPLETION}'")
+        window = max(1, self.config.reorder_buffer_pages) if order == ORDER_PAGE else None
+        return self._stream_pages(order, window, progress_callback, debug_save_images, selected_pages)
+
+    def _stream_pages(
+        self,
+        order: str,
+        window: Optional[int],
+        progress_callback: Optional[Callable[[Any], None]],
+        debug_save_images: bool,
+        selected_pages: Optional[List[int]],
+    ) -> Iterator[PageResult]:
+        """
+        Route, extract and account for every page, yielding PageResults.
+
+        Args:
+            order: ORDER_PAGE or ORDER_COMPLETION
+            window: Reorder buffer size for ORDER_PAGE (None = unbounded)
+            progress_callback, debug_save_images, selected_pages: see process()
+        """
+        start_time = time.time()
         try:
             # Create session directory for debug images if enabled
             debug_session_dir = None
             if debug_save_images:
                 import uuid
-                from pathlib import Path
                 timestamp = time.strftime("%Y%m%d_%H%M%S")
                 session_id = str(uuid.uuid4())[:8]
-                pdf_name = Path(self.pdf_path).stem
+                pdf_name = Path(self.document_name).stem
                 base_dir = Path("/tmp/powerpdf_extracted_images")
                 debug_session_dir = base_dir / f"session_{timestamp}_{session_id}_{pdf_name}"
                 debug_session_dir.mkdir(parents=True, exist_ok=True)
@@ -145,37 +371,17 @@ class PDFProcessor:
                 if self.config.verbose:
                     print(f"[DEBUG] Image saving enabled: {debug_session_dir}")
 
-            # Analyze PDF structure
-            summary = self.analyzer.analyze()
-            total_pages = summary['total_pages']
-            empty_pages = set(summary.get("empty_pages", []))
-            # Determine which pages to process
-            if selected_pages:
-                # Use only the specified pages, but still exclude empty ones
-                pages_to_process = [p for p in selected_pages if 1 <= p <= total_pages and p not in empty_pages]
-                if pages_to_process != selected_pages:
-                    excluded = set(selected_pages) - set(pages_to_process)
-                    for page in excluded:
-                        if page > total_pages:
-                            print(f"[WARNING] Page {page} exceeds document length ({total_pages} pages) - skipping")
-                        elif page in empty_pages:
-                            print(f"[WARNING] Page {page} is empty - skipping")
-            else:
-                # Process all non-empty pages
-                pages_to_process = [p for p in range(1, total_pages + 1) if p not in empty_pages]
-
             if self.config.verbose:
                 print(f"[INFO] Model: {self.model_config.name}")
                 print(f"[INFO] Endpoint: {self.model_config.get_endpoint().name}")
-                print(f"[INFO] Pages to process: {len(pages_to_process)} (excluding {len(empty_pages)} empty)")
 
             # Track progress
             processed = 0
-
-            # Process results
-            results: Dict[int, Dict[str, Any]] = {}
             total_cost = 0.0
 
+            total_pages, classified_pages = self._classified_pages()
+            self.total_pages = total_pages
+
             def emit(status: str, page_num: int):
                 if progress_callback:
                     try:
@@ -194,49 +400,368 @@ class PDFProcessor:
             endpoint = self.model_config.get_endpoint()
             max_workers = endpoint.max_parallel_requests
 
-            def process_single_page(page_num: int) -> tuple:
-                """Process a single page - runs in thread pool"""
-                result = self.ai_extractor.extract_page(
-                    self.pdf_path,
-                    page_num,
-                    use_markdown=True,
-                    debug_save_images=debug_save_images,
-                    debug_session_dir=debug_session_dir
-                )
-                return page_num, result
+            # Every submitted task takes whichever queued page is most
+            # expensive at the moment a worker frees up (or the next one in
+            # page order with the "fifo" schedule)
+            page_queue = PageQueue(self.config.page_schedule, window=window)
+
+            # Seconds spent post-processing and validating pages in the workers
+            worker_post_seconds: Dict[int, float] = {}
+
+            # Pages queued again, to escalate them or after failing validation
+            retrying: Dict[int, PendingAttempt] = {}
+            validation_config = self.config.validation
+            reextract = validation_config.validate_output and validation_config.reextract_invalid_pages
+            budget = self.reextraction_budget = ReextractionBudget(
+                max_calls=validation_config.max_reextractions,
+                max_cost=validation_config.max_reextraction_cost,
+            )
+            self.page_retries = {}
+
+            # Cascade tier of each page's current attempt (0 = cheapest)
+            cascade = self.config.model_cascade
+            last_tier = len(cascade) - 1
+            page_tiers: Dict[int, int] = {}
+            self.cascade_report = CascadeReport(tiers=[tier.model_config_id for tier in cascade]) if cascade else None
+
+            def process_next_page() -> tuple:
+                """Process the next scheduled page - runs in thread pool"""
+                page_num = page_queue.pop()
+                tier = page_tiers.get(page_num, 0)
+                requeued = retrying.get(page_num)
+                overrides = self._attempt_overrides(tier, reextraction=requeued is not None and not requeued.escalation)
+                page_start = time.time()
+                try:
+                    result = self.ai_extractor.extract_page(
+                        self.pdf_path,
+                        page_num,
+                        use_markdown=True,
+                        debug_save_images=debug_save_images,
+                        debug_session_dir=debug_session_dir,
+                        max_tokens=self._page_token_budget(page_num),
+                        session=self.session,
+                        **overrides,
+                    )
+                except Exception as page_err:
+                    return page_num, None, page_err, time.time() - page_start
+                duration = time.time() - page_start
+                result['model'] = overrides.get('model_config', self.model_config).model_id
+                # Post-process while the other workers wait on the network
+                self._postprocess_result(page_num, result)
+                if tier < last_tier:
+                    self._option_states(page_num)  # For the escalation check
+                worker_post_seconds[page_num] = time.time() - page_start - duration
+                return page_num, result, None, duration
 
             if self.config.verbose:
-                print(f"[INFO] Processing {len(pages_to_process)} pages with {max_workers} parallel workers")
+                print(f"[INFO] Processing pages with {max_workers} parallel workers ({self.config.page_schedule} schedule)")
 
             extraction_start = time.time()
             # Process pages in parallel, tracking errors
-            page_results = {}
-            page_errors: Dict[int, PageError] = {}
-
+            extracted_pages: Set[int] = set()
             page_timings = {}
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(process_single_page, pn): pn for pn in pages_to_process}
-                for future in as_completed(futures):
-                    page_num = futures[future]
-                    elapsed = time.time() - extraction_start
-                    page_timings[page_num] = elapsed
-                    try:
-                        _, result = future.result()
-                        page_results[page_num] = result
+            page_durations: Dict[int, float] = {}
+
+            selected = set(selected_pages) if selected_pages else None
+            self.processed_pages = []
+            self.reused_pages = []
+            self.template_pages = []
+
+            # Fingerprints, form layouts and cost prediction need the page
+            predict_cost = (
+                self.config.page_schedule == SCHEDULE_LARGEST_FIRST
+                or self.config.llm.dynamic_max_tokens
+            )
+            needs_doc = predict_cost or self.result_cache or self.template_registry
+            routing_doc = self.session.document() if needs_doc else None
+
+            # PageResults waiting to be yielded
+            ready: List[PageResult] = []
+
+            def finish_page(page_num: int, item: Tuple[str, Dict[str, Any]]) -> None:
+                """Account for and validate a page, and queue its PageResult"""
+                nonlocal processed, total_cost
+                source, result = item
+                duration = page_durations.get(page_num, 0.0)
+                if 'error' in result:
+                    ready.append(PageResult(
+                        page_num=page_num,
+                        success=False,
+                        error=result['error'],
+                        duration=duration,
+                        source=source,
+                    ))
+                    return
+
+                if source == "extracted":
+                    self._store_cached_pages({page_num: result})
+                    self._learn_templates(routing_doc, {page_num: result})
+                    self._record_page_usage({page_num: result})
+
+                # Extracted pages were post-processed by their worker
+                if 'postprocessed' not in result:
+                    self._postprocess_result(page_num, result, validate=source != "empty")
+
+                page_usage = None
+                validation = result.get('validation')
+                if source != "empty":
+                    # Track token usage
+                    page_usage = result.get('token_usage', TokenUsage())
+                    if 'discarded_usage' in result:
+                        # Discarded attempts are paid for all the same
+                        page_usage = page_usage + result['discarded_usage']
+                    if source == "extracted" and self.cascade_report is not None:
+                        self._record_cascade_page(page_num, result, page_usage)
+                    self.page_token_usage[page_num] = page_usage
+                    self.total_token_usage = self.total_token_usage + page_usage
+                    total_cost += page_usage.cost
+
+                    if result.get('image_encoding'):
+                        self.page_encodings[page_num] = result['image_encoding']
+
+                    if result.get('truncations'):
+                        self.page_truncations[page_num] = {
+                            'truncations': result['truncations'],
+                            'continuations': result.get('continuations', 0),
+                        }
+
+                    if validation is not None:
+                        self.validation_results[page_num] = validation
+
+                processed += 1
+                ready.append(PageResult(
+                    page_num=page_num,
+                    success=True,
+                    content=result['content'],
+                    token_usage=page_usage,
+                    validation=validation,
+                    duration=duration,
+                    source=source,
+                    postprocessed=result['postprocessed'],
+                    model=result.get('model'),
+                ))
+
+            # In page order, pages go through the reorder buffer first
+            writer = OrderedPageWriter(finish_page, on_advance=page_queue.advance) if order == ORDER_PAGE else None
+
+            def add_page(page_num: int, source: str, result: Dict[str, Any]) -> None:
+                if writer is None:
+                    finish_page(page_num, (source, result))
+                else:
+                    writer.add(page_num, (source, result))
+
+            def add_ready_page(page_num: int, source: str, result: Dict[str, Any]) -> None:
+                """
+                Add a page that needs no extraction (empty, cached, templated),
+                waiting for extractions while the reorder buffer is full.
+                """
+                while (
+                    writer is not None and window is not None and pending
+                    and page_num != writer.next_page and writer.buffered >= window
+                ):
+                    collect_next()
+                add_page(page_num, source, result)
+                emit("done", page_num)
+
+            pending = set()
+
+            def collect_next(timeout: Optional[float] = None) -> None:
+                """Wait for the next extracted page(s) (at most timeout seconds) and add them"""
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                for future in done:
+                    page_num, result, page_err, duration = future.result()
+                    page_timings[page_num] = time.time() - extraction_start
+                    page_durations[page_num] = page_durations.get(page_num, 0.0) + duration
+                    if page_err is None and (reextract or cascade):
+                        result = review_page(page_num, result)
+                        if result is None:
+                            continue  # Queued again
+                    elif page_num in retrying:
+                        # The escalation or re-extraction request failed; the earlier attempt stands
+                        result = keep_earlier_attempt(page_num)
+                        page_err = None
+                    if page_err is None:
+                        # Dispatched inside the window, so it fits the buffer
+                        add_page(page_num, "extracted", result)
                         emit("done", page_num)
-                    except Exception as page_err:
-                        # Track the error for this page
-                        error_msg = str(page_err)
-                        error_type, error_code = get_error_type_from_message(error_msg)
-                        page_errors[page_num] = PageError(
-                            page_num=page_num,
-                            error_type=error_type,
-                            error_code=error_code,
-                            message=error_msg,
+                        continue
+
+                    # Track the error for this page
+                    error_msg = str(page_err)
+                    error_type, error_code = get_error_type_from_message(error_msg)
+                    page_error = PageError(
+                        page_num=page_num,
+                        error_type=error_type,
+                        error_code=error_code,
+                        message=error_msg,
+                    )
+                    if self.config.verbose:
+                        print(f"[ERROR] Page {page_num} failed: {error_msg}")
+                    emit("error", page_num)
+                    add_page(page_num, "extracted", {'error': page_error})
+
+            def review_page(page_num: int, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                """
+                Escalate an extracted page to the next cascade tier, queue it
+                again after failing validation (if its retries and the budget
+                allow), or keep it.
+
+                Returns:
+                    The result to keep, or None if the page was queued again
+                """
+                issues = blocking_issues(result.get('validation'), validation_config.reextract_issue_codes)
+                usage = result.get('token_usage') or TokenUsage()
+                discarded = TokenUsage()
+                requeued = retrying.pop(page_num, None)
+                if requeued is not None:
+                    discarded = requeued.discarded
+                    kept_usage = requeued.kept.get('token_usage') or TokenUsage()
+                    if requeued.escalation:
+                        # The higher tier's result replaces the lower one's
+                        discarded = discarded + kept_usage
+                        self.cascade_report.escalations.setdefault(page_num, []).append(requeued.escalation)
+                    else:
+                        # Keep the attempt with the fewest blocking issues, the latest on a tie
+                        budget.settle(requeued.reserved, usage.cost)
+                        record = self.page_retries[page_num]
+                        record.attempts += 1
+                        if len(issues) <= len(requeued.kept_issues):
+                            discarded = discarded + kept_usage
+                        else:
+                            discarded = discarded + usage
+                            result, issues = requeued.kept, requeued.kept_issues
+                        record.remaining_issues = issues
+
+                tier = page_tiers.get(page_num, 0)
+                if tier < last_tier:
+                    reasons = self._escalation_reasons(page_num, result, cascade[tier])
+                    if reasons:
+                        if self.config.verbose:
+                            print(f"[INFO] Escalating page {page_num} to {cascade[tier + 1].model_config_id} ({', '.join(reasons)})")
+                        page_tiers[page_num] = tier + 1
+                        step = f"{cascade[tier].model_config_id}: {', '.join(reasons)}"
+                        queue_again(page_num, PendingAttempt(result, issues, discarded, escalation=step))
+                        emit("escalate", page_num)
+                        return None
+
+                if reextract and issues:
+                    record = self.page_retries.get(page_num)
+                    if record is None:
+                        record = self.page_retries[page_num] = PageRetry(
+                            page_num=page_num, issues=issues, remaining_issues=issues
                         )
+                    estimate = (result.get('token_usage') or TokenUsage()).cost
+                    if (
+                        record.attempts < validation_config.max_reextractions_per_page
+                        and budget.try_reserve(estimate)
+                    ):
                         if self.config.verbose:
-                            print(f"[ERROR] Page {page_num} failed: {error_msg}")
-                        emit("error", page_num)
+                            print(f"[INFO] Re-extracting page {page_num} ({', '.join(issues)})")
+                        queue_again(page_num, PendingAttempt(result, issues, discarded, reserved=estimate))
+                        emit("retry", page_num)
+                        return None
+                    if self.config.verbose:
+                        print(f"[WARNING] Page {page_num} still fails validation ({', '.join(issues)})")
+
+                if requeued is not None:
+                    result['discarded_usage'] = discarded
+                return result
+
+            def queue_again(page_num: int, attempt: PendingAttempt) -> None:
+                """Put a page back at the head of the queue, for a worker to extract again"""
+                retrying[page_num] = attempt
+                page_queue.requeue(page_num)
+                pending.add(executor.submit(process_next_page))
+
+            def keep_earlier_attempt(page_num: int) -> Dict[str, Any]:
+                """Keep the attempt a failed escalation or re-extraction request was meant to replace"""
+                requeued = retrying.pop(page_num)
+                if requeued.escalation:
+                    page_tiers[page_num] -= 1
+                else:
+                    budget.settle(requeued.reserved, 0.0)
+                    record = self.page_retries[page_num]
+                    record.attempts += 1
+                    record.remaining_issues = requeued.kept_issues
+                requeued.kept['discarded_usage'] = requeued.discarded
+                return requeued.kept
+
+            def take_ready() -> List[PageResult]:
+                pages = list(ready)
+                ready.clear()
+                return pages
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                try:
+                    # Route pages as the analyzer classifies them, so the first
+                    # request goes out while the rest of the document is still
+                    # being analyzed
+                    for page_num, is_empty in classified_pages:
+                        if pending:
+                            collect_next(timeout=0)
+                        yield from take_ready()
+
+                        if is_empty:
+                            add_ready_page(page_num, "empty", {'content': "*This page is empty*\n"})
+                            continue
+                        if selected is not None and page_num not in selected:
+                            if writer is not None:
+                                writer.skip(page_num)
+                            continue
+                        self.processed_pages.append(page_num)
+
+                        # Reuse pages whose fingerprint matches a previous extraction
+                        cached = self._reuse_cached_page(routing_doc, page_num)
+                        if cached is not None:
+                            self.reused_pages.append(page_num)
+                            add_ready_page(page_num, "cache", cached)
+                            continue
+
+                        # Fill recurring form pages from their widget values
+                        templated = self._apply_template(routing_doc, page_num)
+                        if templated is not None:
+                            self.template_pages.append(page_num)
+                            add_ready_page(page_num, "template", templated)
+                            continue
+
+                        extracted_pages.add(page_num)
+                        predicted = self._predict_page_cost(routing_doc, page_num) if predict_cost else 0
+                        page_queue.push(page_num, predicted)
+                        pending.add(executor.submit(process_next_page))
+                    yield from take_ready()
+
+                    summary = self.analyzer.analyze()
+                    empty_pages = set(summary.get("empty_pages", []))
+
+                    if selected_pages:
+                        for page in sorted(set(selected_pages) - set(self.processed_pages)):
+                            if page > total_pages:
+                                print(f"[WARNING] Page {page} exceeds document length ({total_pages} pages) - skipping")
+                            elif page in empty_pages:
+                                print(f"[WARNING] Page {page} is empty - skipping")
+
+                    if self.config.verbose:
+                        print(f"[INFO] Pages to process: {len(self.processed_pages)} (excluding {len(empty_pages)} empty)")
+                        if self.result_cache is not None:
+                            print(f"[INFO] Reusing {len(self.reused_pages)} cached pages")
+                        if self.template_registry is not None:
+                            print(f"[INFO] Filled {len(self.template_pages)} pages from form templates")
+
+                    while pending:
+                        collect_next()
+                        yield from take_ready()
+                except BaseException:
+                    # Workers waiting for the reorder window would wait forever
+                    for future in pending:
+                        future.cancel()
+                    page_queue.advance(total_pages + 1)
+                    raise
+
+            self._store_cache_manifest()
+            self.dispatch_order = list(page_queue.dispatch_order)
+            self.reorder_peak = writer.peak_buffered if writer is not None else 0
+            self.worker_postprocess_seconds = sum(worker_post_seconds.values())
 
             print(f"[TIMING] Extraction took {time.time() - extraction_start:.2f}s")
             # Show slowest pages
@@ -244,298 +769,368 @@ class PDFProcessor:
             slowest_5 = sorted_timings[:5]
             print(f"[TIMING] Slowest pages: {[(p, f'{t:.1f}s') for p, t in slowest_5]}")
 
-            # Collect results in page order
-            for page_num in sorted(page_results.keys()):
-                result = page_results[page_num]
-
-                # Track token usage
-                page_usage = result.get('token_usage', TokenUsage())
-                self.page_token_usage[page_num] = page_usage
-                self.total_token_usage = self.total_token_usage + page_usage
-
-                # Validate output if configured
-                if self.config.validation.validate_output:
-                    validation = self.validator.validate(result['content'], page_num)
-                    self.validation_results[page_num] = validation
-
-                results[page_num] = {
-                    'content': result['content'],
-                    'token_usage': page_usage,
-                }
-
-                total_cost += page_usage.cost
-                processed += 1
-
-            # Handle empty pages
-            for page_num in empty_pages:
-                results[page_num] = {
-                    'content': "*This page is empty*\n",
-                }
-                processed += 1
-                emit("done", page_num)
-
+            self.extracted_pages = sorted(extracted_pages)
             emit("done", total_pages)
 
             # Store metrics
+            self.last_summary = summary
             self.last_duration = time.time() - start_time
             self.last_cost = total_cost
-
-            # Check for page errors
-            if page_errors:
-                if self.config.fail_fast:
-                    # fail_fast=True (default): Raise ExtractionError immediately
-                    batch_result = BatchResult(total_pages=total_pages)
-                    for page_num in pages_to_process:
-                        if page_num in page_errors:
-                            batch_result.pages[page_num] = PageResult(
-                                page_num=page_num,
-                                success=False,
-                                error=page_errors[page_num],
-                            )
-                        elif page_num in page_results:
-                            batch_result.pages[page_num] = PageResult(
-                                page_num=page_num,
-                                success=True,
-                                content=page_results[page_num].get('content', ''),
-                                token_usage=page_results[page_num].get('token_usage'),
-                            )
-                    # Raise structured error
-                    raise ExtractionError.from_batch_result(batch_result)
-                else:
-                    # fail_fast=False: Continue processing, add error markers for failed pages
-                    for page_num, page_error in page_errors.items():
-                        error_content = f"**⚠️ Page {page_num} extraction failed**\n\nError: {page_error.message}\n"
-                        results[page_num] = {
-                            'content': error_content,
-                            'token_usage': TokenUsage(),
-                            'error': page_error,
-                        }
-
-            # Build markdown output with image detection
-            post_start = time.time()
-            merged_content = []
-            toc_entries: List[Tuple[int, str, Optional[str]]] = []  # (page_num, description, form_id)
-            with fitz.open(self.pdf_path) as doc:
-                for page_num in sorted(results.keys()):
-                    body = (results[page_num]['content'] or "").splitlines()
-                    # Drop leading blanks and internal headers
-                    while body and not body[0].strip():
-                        body = body[1:]
-                    while body and body[0].lstrip().startswith("==="):
-                        body = body[1:]
-                    cleaned = "\n".join(body).strip()
-
-                    # Extract page description and form ID separately
-                    page_summary = self._summarize_page(cleaned)
-                    form_id = self._extract_form_id(cleaned)
-                    toc_entries.append((page_num, page_summary, form_id))
-
-                    # Detect images on this page using PyMuPDF
-                    image_comment = detect_page_images(doc, page_num - 1)  # 0-based index
-
-                    header = f"\n{'='*60}\n{'PAGE ' + str(page_num) + ' OF ' + str(total_pages):^60}\n{'='*60}"
-                    normalized = self._normalize_compact_dates(cleaned)
-                    toc_comment = f"<!-- TOC PAGE_{page_num:02d}: {page_summary} -->"
-                    merged_content.append(f"{toc_comment}\n{header}\n{image_comment}\n{normalized}".rstrip() + "\n")
-
-            # Create header with actual pages processed count
-            file_header = self._create_header(summary, total_cost, extra_metadata, len(pages_to_process))
-            toc_block = self._build_top_level_toc(toc_entries)
-
-            final_output = file_header + toc_block + '\n'.join(merged_content)
-
-            print(f"[TIMING] Post-processing took {time.time() - post_start:.2f}s")
-            if "<!-- TOC START -->" not in final_output:
-                raise ValueError("Grouped TOC block missing from output; header assembly failed.")
-
-            return final_output
-        except Exception as err:
-            exc = err
-            if audit_enabled:
-                self._emit_audit_log(
-                    status="failure",
-                    start_dt=start_dt,
-                    end_dt=datetime.now(),
-                    error=str(err),
-                    audit_log_path=resolved_audit_log_path,
-                    audit_log_hook=audit_log_hook,
-                    audit_retention_hours=audit_retention_hours,
-                )
-            raise
         finally:
-            if audit_enabled and exc is None:
-                self._emit_audit_log(
-                    status="success",
-                    start_dt=start_dt,
-                    end_dt=datetime.now(),
-                    error=None,
-                    audit_log_path=resolved_audit_log_path,
-                    audit_log_hook=audit_log_hook,
-                    audit_retention_hours=audit_retention_hours,
-                )
-
-    def _normalize_compact_dates(self, text: str) -> str:
-        """
-        Insert dashes into compact DDMMYYYY date strings to enforce dd-mm-yyyy format.
-        """
-        def _repl(match: re.Match) -> str:
-            return f"{match.group('day')}-{match.group('month')}-{match.group('year')}"
+            # Release the per-thread document handles (the bytes are kept)
+            self.session.close()
 
-        return self._compact_date_pattern.sub(_repl, text)
+    def _prompt_digest(self, model_config: AIModelConfig) -> str:
+        """Digest of a model's prompts, so a prompt change invalidates cached pages"""
+        model_id = model_config.model_id_at_endpoint
+        prompts = get_system_prompt(model_id, use_markdown=True) + get_vision_prompt(model_id, use_markdown=True)
+        return hashlib.sha256(prompts.encode("utf-8")).hexdigest()[:16]
 
-    def _is_application_code(self, text: str) -> bool:
+    def _run_models(self) -> List[AIModelConfig]:
         """
-        Check if text matches application code pattern: XXX-XXX-XXXX
-        where X is alphanumeric (3-3-4 format).
-
-        Examples: K75-19Z-RZLT
+        Models that can produce a page in this run, preferred first for cache
+        lookups: the re-extraction model, then the cascade tiers from the top
+        (or the configured model).
         """
-        pattern = r'^[A-Z0-9]{3}-[A-Z0-9]{3}-[A-Z0-9]{4}$'
-        return bool(re.match(pattern, text.strip(), re.IGNORECASE))
-
-    def _is_doc_identity_code(self, text: str) -> bool:
+        models = list(reversed(self.cascade_models)) or [self.model_config]
+        if self.reextract_model_config is not None:
+            models.insert(0, self.reextract_model_config)
+        unique: Dict[str, AIModelConfig] = {}
+        for model in models:
+            unique.setdefault(model.model_id, model)
+        return list(unique.values())
+
+    def _page_cache_key(self, page_num: int, model_config: AIModelConfig) -> str:
         """
-        Check if text starts with DOC IDENTITY prefix.
+        Cache key of a page as produced by model_config.
 
-        Examples: DOC IDENTITY 0109 PASSPORT SPONSOR 2/2
+        With a cascade, the tier chain is part of the key: a page kept at a
+        cheap tier is only reused by runs with the same escalation path.
         """
-        return text.strip().upper().startswith("DOC IDENTITY")
+        model_key = model_config.model_id
+        if self.config.model_cascade:
+            model_key += "@" + ">".join(tier.model_config_id for tier in self.config.model_cascade)
+        return ResultCache.page_key(
+            self.page_fingerprints[page_num],
+            model_key,
+            self._prompt_digest(model_config),
+        )
 
-    def _parse_doc_identity_description(self, text: str) -> str:
+    def _classified_pages(self) -> Tuple[int, Iterator[Tuple[int, bool]]]:
         """
-        Extract descriptive text from DOC IDENTITY lines.
+        Total page count and an iterator of (page_num, is_empty) in page order.
 
-        Example:
-            Input: "DOC IDENTITY 0109 PASSPORT SPONSOR 2/2"
-            Output: "PASSPORT SPONSOR 2/2"
+        Uses the analyzer's streaming interface when it has one, so routing
+        starts before the whole document is analyzed. Analyzers that only
+        implement analyze() are read from their summary.
         """
-        if not self._is_doc_identity_code(text):
-            return text
+        if hasattr(self.analyzer, "iter_pages"):
+            pages = self.analyzer.iter_pages(workers=self.config.analysis_workers)
+            return self.analyzer.page_count, ((c.page_num, c.is_empty) for c in pages)
 
-        # Remove "DOC IDENTITY" prefix and numeric code
-        # Pattern: DOC IDENTITY <digits> <description>
-        pattern = r'^DOC\s+IDENTITY\s+\d+\s+'
-        result = re.sub(pattern, '', text.strip(), flags=re.IGNORECASE)
-        return result.strip()
+        summary = self.analyzer.analyze()
+        empty_pages = set(summary.get("empty_pages", []))
+        total_pages = summary['total_pages']
+        return total_pages, ((p, p in empty_pages) for p in range(1, total_pages + 1))
 
-    def _extract_form_id(self, text: str) -> Optional[str]:
+    def _reuse_cached_page(self, doc: Optional[fitz.Document], page_num: int) -> Optional[Dict[str, Any]]:
         """
-        Extract real form ID from page content, excluding DOC IDENTITY codes
-        and application codes.
+        Fingerprint a page and return its cached result, if any.
 
-        Returns:
-            Form ID string if found (e.g., "B07001", "7103-03"), None otherwise
+        Reused pages carry an empty TokenUsage: they cost nothing in this run.
         """
-        if not text:
+        if self.result_cache is None or doc is None:
             return None
 
-        # Look for FORM_ID pattern in the text
-        # Pattern: **FORM_ID**: `xxx` or FORM_ID**: `xxx`
-        for line in text.splitlines():
-            line = line.strip()
+        self.page_fingerprints[page_num] = page_fingerprint(doc, page_num - 1)
+        if self.config.refresh_cache:
+            return None
 
-            # Match FORM_ID pattern with backticks
-            match = re.search(r'\*\*FORM_ID\*\*:\s*`([^`]+)`', line)
-            if not match:
-                # Try without ** prefix
-                match = re.search(r'FORM_ID\*\*:\s*`([^`]+)`', line)
+        for model_config in self._run_models():
+            entry = self.result_cache.get_page(self._page_cache_key(page_num, model_config))
+            if entry is not None:
+                return {
+                    'content': entry['content'],
+                    'token_usage': TokenUsage(),
+                    'reused': True,
+                    'model': model_config.model_id,
+                }
+        return None
 
-            if match:
-                form_id = match.group(1).strip()
+    def _store_cached_pages(self, page_results: Dict[int, Dict[str, Any]]) -> None:
+        """Store freshly extracted pages, keyed by the model that produced each"""
+        if self.result_cache is None:
+            return
+        models = {model.model_id: model for model in self._run_models()}
+        try:
+            for page_num, result in page_results.items():
+                if page_num not in self.page_fingerprints:
+                    continue
+                model_config = models.get(result.get('model'), self.model_config)
+                self.result_cache.put_page(
+                    self._page_cache_key(page_num, model_config),
+                    self.page_fingerprints[page_num],
+                    result.get('content', ''),
+                    result.get('token_usage'),
+                    overwrite=self.config.refresh_cache,
+                )
+        except OSError as err:
+            # A cache that cannot be written must not fail the extraction
+            if self.config.verbose:
+                print(f"[WARNING] Could not write result cache: {err}")
 
-                # Exclude DOC IDENTITY codes
-                if self._is_doc_identity_code(form_id):
-                    return None
+    def _store_cache_manifest(self) -> None:
+        """Store the document's fingerprint manifest"""
+        if self.result_cache is None:
+            return
+        try:
+            self.result_cache.put_document(
+                self.calculate_md5(),
+                self.document_name,
+                self.model_config.model_id,
+                self.page_fingerprints,
+            )
+        except OSError as err:
+            # A cache that cannot be written must not fail the extraction
+            if self.config.verbose:
+                print(f"[WARNING] Could not write result cache: {err}")
 
-                # Exclude application codes (XXX-XXX-XXXX pattern)
-                if self._is_application_code(form_id):
-                    return None
+    def _apply_template(self, doc: Optional[fitz.Document], page_num: int) -> Optional[Dict[str, Any]]:
+        """
+        Render a form page with a learned template from its widget values.
 
-                # Return real form ID
-                return form_id
+        Pages without widgets, or whose widgets no longer line up with the
+        template, are left for AI extraction.
+        """
+        if self.template_registry is None or doc is None:
+            return None
 
-        return None
+        page = doc[page_num - 1]
+        if page.first_widget is None:
+            return None
+        layout = self._page_layout(doc, page_num)
+        template = self.template_registry.get(layout)
+        if template is None:
+            return None
+        widgets = list(page.widgets())
+        if not template.matches(widgets):
+            return None
+        return {
+            'content': template.render(widgets),
+            'token_usage': TokenUsage(),
+            'template': template.form_id,
+        }
+
+    def _page_layout(self, doc: fitz.Document, page_num: int) -> str:
+        """Layout fingerprint of a page, computed once per run"""
+        if page_num not in self.page_layouts:
+            self.page_layouts[page_num] = layout_fingerprint(doc, page_num - 1)
+        return self.page_layouts[page_num]
+
+    def _predict_page_cost(self, doc: Optional[fitz.Document], page_num: int) -> int:
+        """
+        Predict a page's output tokens for scheduling and its output budget.
 
-    def _summarize_page(self, text: str) -> str:
+        With a result cache the output seen for the same page layout in
+        earlier runs (e.g. the same FORM_ID page) refines the prediction.
         """
-        Build a short one-line summary for a page from its extracted content.
-        Prefers PAGE_TYPE if available (AI-generated page classification).
-        Otherwise skips metadata lines (FORM_ID, PAGE_IMAGES, TOC markers)
-        and extracts meaningful content.
+        if doc is None:
+            return 0
+        layout = self._page_layout(doc, page_num) if self.result_cache is not None else None
+        features = PageFeatures.from_page_info(self.session.page_info(page_num), layout)
+        predicted = self.cost_predictor.predict(features)
+        self.predicted_output_tokens[page_num] = predicted
+        return predicted
+
+    def _page_token_budget(self, page_num: int) -> Optional[int]:
         """
-        if not text or not text.strip():
-            return "Empty page"
-
-        # First pass: look for PAGE_TYPE (AI-generated page classification)
-        for raw_line in text.splitlines():
-            line = raw_line.strip()
-            if "PAGE_TYPE" in line and "`" in line:
-                match = re.search(r'`([^`]+)`', line)
-                if match:
-                    page_type = match.group(1).strip()
-                    if page_type:
-                        return page_type[:120]
-
-        # Second pass: extract from content (fallback if no PAGE_TYPE)
-        for raw_line in text.splitlines():
-            line = raw_line.strip()
-
-            # Skip empty lines and HTML comments
-            if not line or line.startswith("<!--"):
-                continue
+        Output budget (max_tokens) for a page from its predicted output.
 
-            # Skip PAGE_TYPE lines (we already checked these above)
-            if "PAGE_TYPE" in line:
-                continue
+        Returns:
+            Budget in tokens, or None to use LLMConfig.max_tokens
+        """
+        llm = self.config.llm
+        predicted = self.predicted_output_tokens.get(page_num)
+        if not llm.dynamic_max_tokens or not predicted:
+            return None
+        budget = int(predicted * llm.max_tokens_multiplier)
+        return max(llm.min_max_tokens, min(budget, llm.max_tokens))
 
-            # Skip FORM_ID lines - these are metadata, not content descriptions
-            # But check if it's a DOC IDENTITY code first - extract descriptive text
-            if "FORM_ID" in line and "`" in line:
-                # Extract the value between backticks (handle empty backticks)
-                match = re.search(r'`([^`]*)`', line)
-                if match:
-                    form_id_value = match.group(1).strip()
+    def _record_page_usage(self, page_results: Dict[int, Dict[str, Any]]) -> None:
+        """Feed the output tokens of extracted pages back into the layout history"""
+        if self.result_cache is None:
+            return
+        try:
+            for page_num, result in page_results.items():
+                usage = result.get('token_usage')
+                if usage is None or page_num not in self.page_layouts:
+                    continue
+                self.cost_predictor.record(
+                    self.page_layouts[page_num],
+                    extract_form_id(result.get('content') or ""),
+                    usage.output_tokens,
+                )
+        except OSError as err:
+            if self.config.verbose:
+                print(f"[WARNING] Could not write token history: {err}")
 
-                    # Skip empty form IDs
-                    if not form_id_value:
-                        continue
+    def _learn_templates(self, doc: Optional[fitz.Document], page_results: Dict[int, Dict[str, Any]]) -> None:
+        """Learn templates from freshly extracted form pages with an unknown layout"""
+        if self.template_registry is None or doc is None:
+            return
+        try:
+            for page_num, result in page_results.items():
+                layout = self.page_layouts.get(page_num)
+                if layout is None or self.template_registry.get(layout) is not None:
+                    continue
+                body = (result.get('content') or "").splitlines()
+                while body and (not body[0].strip() or body[0].lstrip().startswith("===")):
+                    body = body[1:]
+                markdown = "\n".join(body).strip()
+                template = PageTemplate.learn(
+                    layout,
+                    markdown,
+                    list(doc[page_num - 1].widgets()),
+                    form_id=extract_form_id(markdown),
+                    learned_from=f"{self.document_name}#page={page_num}",
+                )
+                if template is not None:
+                    self.template_registry.register(template)
+                    if self.config.verbose:
+                        print(f"[INFO] Learned form template from page {page_num} ({template.form_id or 'no FORM_ID'})")
+        except OSError as err:
+            if self.config.verbose:
+                print(f"[WARNING] Could not write form template: {err}")
+
+    @staticmethod
+    def _format_page_list(pages: List[int]) -> str:
+        """Format page numbers as compact ranges, e.g. [1, 2, 3, 7] -> 1-3, 7"""
+        if not pages:
+            return "none"
+        ranges = []
+        start = prev = pages[0]
+        for page in pages[1:]:
+            if page == prev + 1:
+                prev = page
+                continue
+            ranges.append(f"{start}-{prev}" if start != prev else str(start))
+            start = prev = page
+        ranges.append(f"{start}-{prev}" if start != prev else str(start))
+        return ", ".join(ranges)
+
+    def _validates_output(self) -> bool:
+        """Validate extracted pages: if configured, and always when cascade tiers escalate on issues"""
+        return self.config.validation.validate_output or any(
+            tier.escalate_on_issues for tier in self.config.model_cascade[:-1]
+        )
 
-                    # If it's a DOC IDENTITY code, extract descriptive text
-                    if self._is_doc_identity_code(form_id_value):
-                        description = self._parse_doc_identity_description(form_id_value)
-                        if description:
-                            return description[:120]
+    def _attempt_overrides(self, tier: int, reextraction: bool) -> Dict[str, Any]:
+        """
+        extract_page() arguments for an attempt at a page.
 
-                    # If it's an application code, skip this line
-                    if self._is_application_code(form_id_value):
-                        continue
+        Args:
+            tier: The page's cascade tier (ignored without a cascade)
+            reextraction: A re-extraction after failing validation (escalated
+                model and/or DPI, if configured)
+        """
+        overrides: Dict[str, Any] = {}
+        if self.cascade_models:
+            overrides['model_config'] = self.cascade_models[tier]
+        if reextraction:
+            if self.reextract_model_config is not None:
+                overrides['model_config'] = self.reextract_model_config
+            if self.config.validation.reextract_render_dpi:
+                overrides['render_dpi'] = self.config.validation.reextract_render_dpi
+        return overrides
+
+    def _option_states(self, page_num: int) -> Optional[OptionStates]:
+        """Checkbox/radio states detected in the PDF for a page (cached)"""
+        if page_num not in self.page_option_states:
+            self.page_option_states[page_num] = detect_option_states(self.session.document()[page_num - 1])
+        return self.page_option_states[page_num]
+
+    def _escalation_reasons(self, page_num: int, result: Dict[str, Any], tier: CascadeTier) -> List[str]:
+        """Why a cascade tier's result for a page should go to the next tier ([] = keep it)"""
+        reasons = blocking_issues(result.get('validation'), tier.escalate_on_issues)
+        if tier.escalate_on_checkbox_mismatch:
+            states = self._option_states(page_num)
+            if states is not None and count_selected_options(result.get('content')) != states.selected:
+                reasons.append(CHECKBOX_MISMATCH)
+        return reasons
+
+    def _record_cascade_page(self, page_num: int, result: Dict[str, Any], page_usage: TokenUsage) -> None:
+        """Add an extracted page to the cascade report"""
+        report = self.cascade_report
+        top = self.cascade_models[-1]
+        kept_usage = result.get('token_usage') or TokenUsage()
+        report.page_tiers[page_num] = result.get('model')
+        report.cost += page_usage.cost
+        if result.get('model') == top.model_id:
+            report.top_tier_cost += kept_usage.cost
+        else:
+            report.top_tier_cost += top_tier_cost(kept_usage, top)
 
-                    # Otherwise it's metadata (real form ID), skip to find content
-                    continue
-                else:
-                    # Line has FORM_ID but no backticks - skip it
-                    continue
+    def _postprocess_result(self, page_num: int, result: Dict[str, Any], validate: bool = True) -> None:
+        """
+        Post-process (and validate, if configured) a page's result in place.
+
+        Extracted pages run this in their worker thread, as soon as the page
+        is back, so it overlaps with the other pages' requests; the final
+        assembly only formats sections and concatenates them.
 
-            # Remove common markdown prefixes and bullets
-            clean_line = line.lstrip("#").lstrip("*").lstrip("-").strip()
-            clean_line = clean_line.strip("*").strip()
+        Adds result['postprocessed'] (PostProcessedPage) and result['validation']
+        (ValidationResult or None).
+        """
+        result['postprocessed'] = postprocess_page(result['content'])
+        result['validation'] = None
+        if validate and self._validates_output():
+            # The model's text, not the page banner: an empty answer must be EMPTY_OUTPUT
+            result['validation'] = self.validator.validate(strip_page_banner(result['content']), page_num)
 
-            # Check for explicit empty page indicators
-            if clean_line.lower() in {"this page is empty", "page is empty"}:
-                return "Empty page"
+    def _page_section(
+        self,
+        page_num: int,
+        total_pages: int,
+        content: Optional[str],
+        postprocessed: Optional[PostProcessedPage] = None,
+    ) -> Tuple[str, Tuple[int, str, Optional[str]]]:
+        """
+        Format a page's output section.
 
-            # Return first meaningful content line
-            if clean_line:
-                summary = clean_line[:120]
-                # Strip leading section numbers:
-                # - "1. ", "2. " (number + period + space)
-                # - "1 ", "2 " (number + space, no period)
-                # - "1.2 ", "4.2.1 " (nested numbering)
-                # - "1A. ", "2B. " (number + letter + period)
-                summary = re.sub(r'^\d+(\.\d+)*[A-Z]?\.?\s+', '', summary)
-                return summary
+        Args:
+            postprocessed: The page's PostProcessedPage, if already computed from content
 
-        return "Empty page"
+        Returns:
+            (section, TOC entry as (page_num, description, form_id))
+        """
+        page = postprocessed if postprocessed is not None else postprocess_page(content)
+
+        # Images on this page, from the session's cached page metadata
+        image_comment = describe_page_images(self.session.page_info(page_num).images)
+
+        header = f"\n{'='*60}\n{'PAGE ' + str(page_num) + ' OF ' + str(total_pages):^60}\n{'='*60}"
+        toc_comment = f"<!-- TOC PAGE_{page_num:02d}: {page.summary} -->"
+        section = f"{toc_comment}\n{header}\n{image_comment}\n{page.content}".rstrip() + "\n"
+        return section, (page_num, page.summary, page.form_id)
+
+    @staticmethod
+    def _page_index_entry(page: PageResult, toc_entry: Tuple[int, str, Optional[str]]) -> PageIndexEntry:
+        """Index entry for a written page; offset and length are set by PageIndexBuilder"""
+        _, summary, form_id = toc_entry
+        usage = page.token_usage
+        validation = page.validation
+        return PageIndexEntry(
+            page=page.page_num,
+            offset=0,
+            length=0,
+            form_id=form_id,
+            summary=summary,
+            input_tokens=usage.input_tokens if usage else 0,
+            output_tokens=usage.output_tokens if usage else 0,
+            cost=usage.cost if usage else 0.0,
+            valid=validation.is_valid if validation else None,
+            issues=len(validation.issues) if validation else 0,
+        )
 
     def _create_header(self, summary: Dict, cost: float, extra_metadata: Optional[str] = None, pages_processed: Optional[int] = None) -> str:
         """Create extraction result header as hidden HTML comment"""
@@ -564,7 +1159,7 @@ class PDFProcessor:
 
         lines.extend([
             "PDF EXTRACTION METADATA",
-            f"Source PDF: {os.path.basename(self.pdf_path)}",
+            f"Source PDF: {self.document_name}",
             f"MD5: {self.calculate_md5()}",
             f"Processing Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
             f"Processing Time: {self.last_duration:.1f} seconds",
@@ -578,8 +1173,71 @@ class PDFProcessor:
             f"- AI processed: {pages_processed} pages",
             f"- Empty pages: {len(summary.get('empty_pages', []))}",
             "",
+        ])
+
+        if self.result_cache is not None:
+            lines.extend([
+                "Incremental Extraction:",
+                f"- Reused pages: {self._format_page_list(self.reused_pages)}",
+                f"- Re-extracted pages: {self._format_page_list(self.extracted_pages)}",
+                "",
+            ])
+
+        if self.template_registry is not None:
+            lines.extend([
+                "Form Templates:",
+                f"- Filled from template: {self._format_page_list(self.template_pages)}",
+                "",
+            ])
+
+        if self.page_truncations:
+            lines.append("Truncated Pages:")
+            for page_num, counts in sorted(self.page_truncations.items()):
+                incomplete = counts['truncations'] > counts['continuations']
+                lines.append(
+                    f"- Page {page_num}: truncated {counts['truncations']}x, "
+                    f"continued {counts['continuations']}x{' (INCOMPLETE)' if incomplete else ''}"
+                )
+            lines.append("")
+
+        if self.cascade_report is not None:
+            report = self.cascade_report
+            lines.append("Model Cascade:")
+            for tier, pages in report.pages_by_tier().items():
+                lines.append(f"- {tier}: {self._format_page_list(pages) if pages else 'no pages'}")
+            for page_num, steps in sorted(report.escalations.items()):
+                lines.append(f"- Page {page_num} escalated from {'; '.join(steps)}")
+            if report.saved >= 0:
+                outcome = f"saved ${report.saved:.6f}, {report.saved_share:.1%}"
+            else:
+                outcome = f"${-report.saved:.6f} more, escalations outweighed the cheaper tier"
+            lines.append(
+                f"- Cost: ${report.cost:.6f} vs ${report.top_tier_cost:.6f} with {report.tiers[-1]} only ({outcome})"
+            )
+            lines.append("")
+
+        if self.page_retries:
+            lines.append("Validation Retries:")
+            for page_num, record in sorted(self.page_retries.items()):
+                if not record.attempts:
+                    outcome = "not retried, budget used up"
+                elif record.resolved:
+                    outcome = "resolved"
+                else:
+                    outcome = f"still {', '.join(record.remaining_issues)}"
+                lines.append(
+                    f"- Page {page_num}: {', '.join(record.issues)} -> {outcome} "
+                    f"({record.attempts} re-extraction{'s' if record.attempts != 1 else ''})"
+                )
+            budget = self.reextraction_budget
+            lines.append(f"- Extra requests: {budget.calls}, ${budget.cost:.6f}")
+            lines.append("")
+
+        lines.extend([
             "Token Usage:",
             f"- Input tokens: {self.total_token_usage.input_tokens:,}",
+            f"- Cached input tokens: {self.total_token_usage.cached_input_tokens:,} "
+            f"({self.total_token_usage.cache_hit_rate:.1%} cache hit rate)",
             f"- Output tokens: {self.total_token_usage.output_tokens:,}",
             f"- Total tokens: {self.total_token_usage.total_tokens:,}",
             "",
@@ -634,7 +1292,7 @@ class PDFProcessor:
             entry: Dict[str, Any] = {
                 "timestamp": end_dt.isoformat(),
                 "status": status,
-                "file": os.path.basename(self.pdf_path),
+                "file": self.document_name,
                 "md5": self.calculate_md5(),
                 "model_id": self.model_config.model_id,
                 "model_name": model_name,
@@ -683,6 +1341,8 @@ class PDFProcessor:
         return {
             'total': {
                 'input_tokens': self.total_token_usage.input_tokens,
+                'cached_input_tokens': self.total_token_usage.cached_input_tokens,
+                'cache_hit_rate': self.total_token_usage.cache_hit_rate,
                 'output_tokens': self.total_token_usage.output_tokens,
                 'total_tokens': self.total_token_usage.total_tokens,
                 'cost': self.total_token_usage.cost,
@@ -690,15 +1350,24 @@ class PDFProcessor:
             'per_page': {
                 page_num: {
                     'input_tokens': usage.input_tokens,
+                    'cached_input_tokens': usage.cached_input_tokens,
                     'output_tokens': usage.output_tokens,
                     'cost': usage.cost,
                 }
                 for page_num, usage in self.page_token_usage.items()
             },
+            'truncated_pages': dict(self.page_truncations),
             'model': self.total_token_usage.model_id,
         }
 
     def save_results(self, content: str, output_file: str):
-        """Save extraction results to file"""
-        with open(output_file, 'w', encoding='utf-8') as f:
+        """Save extraction results to file (and its page index, if configured)"""
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
             f.write(content)
+
+        if not self.config.write_page_index or not self.page_index:
+            return
+        if len(content.encode('utf-8')) != self.output_bytes:
+            print(f"[WARNING] Not writing a page index for {output_file}: content differs from the last process() output")
+            return
+        write_page_index(output_file, self.page_index, self.output_bytes, self.document_name, self.calculate_md5())
@@ -326,6 +326,37 @@ For dates: If you see boxes like |1|1| |1|2| |1|9|9|6|, combine them: `11-12-199
 Output ONLY the markdown. No explanations."""
 
 
+# =============================================================================
+# CONTINUATION PROMPT
+# =============================================================================
+#
+# Sent after a response was cut off at max_tokens, together with the partial
+# output as the assistant turn. The conversation prefix (system prompt,
+# instructions, page image) is unchanged, so providers serve it from their
+# prompt cache and only the missing output is generated.
+#
+
+CONTINUATION_PROMPT = """Your previous output was cut off at the output limit.
+Continue the markdown exactly where it stopped - mid-line if needed.
+Do not repeat anything already written and do not start over.
+Output ONLY the continuation."""
+
+
+# =============================================================================
+# TILE PROMPT
+# =============================================================================
+#
+# Appended to the vision prompt when an oversized page is extracted as
+# overlapping tiles (see tiling.py). The tiles are stitched back together, so
+# each one should only describe what it shows.
+#
+
+TILE_PROMPT = """This image is one part of a larger page ({position}).
+Extract only what is visible in this part, in reading order.
+Neighbouring parts overlap: text cut off at an edge appears whole in the next part, so skip it.
+Do not add a page title or summary for the whole page."""
+
+
 # Default prompts (used for unknown models and Gemini)
 DEFAULT_PROMPTS = (GEMINI_SYSTEM_PROMPT, GEMINI_VISION_PROMPT)
 
@@ -0,0 +1,91 @@
+"""
+Validation-driven re-extraction.
+
+A page whose output failed validation with a blocking issue (LLM refusal or
+placeholder text, empty output) used to ship as-is, and reviewers re-ran
+the whole document. With ValidationConfig.reextract_invalid_pages (opt-in:
+every re-extraction is an extra paid request) the processor puts such a
+page back at the head of the page queue as soon as its result comes in,
+while the other pages are still being extracted - optionally with a
+stronger model or a higher render DPI.
+
+ReextractionBudget caps the extra requests per document by count and cost.
+Every attempt is paid for; the page keeps the attempt with the fewest
+blocking issues (the latest one on a tie).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from .validator import ValidationResult
+from ..models.config import TokenUsage
+
+
+def blocking_issues(validation: Optional[ValidationResult], codes: Iterable[str]) -> List[str]:
+    """
+    Codes of the validation issues that call for a re-extraction (sorted, unique).
+
+    Args:
+        validation: The page's ValidationResult (None if not validated)
+        codes: Blocking issue codes (ValidationConfig.reextract_issue_codes)
+    """
+    if validation is None:
+        return []
+    codes = set(codes)
+    return sorted({issue.code for issue in validation.issues if issue.code in codes})
+
+
+@dataclass
+class ReextractionBudget:
+    """
+    Extra requests allowed per document.
+
+    Re-extractions run concurrently, so their cost is reserved up front
+    (estimated from the attempt being replaced) and settled when they finish.
+    """
+    max_calls: int
+    max_cost: Optional[float] = None  # USD; None = only the call limit
+    calls: int = 0
+    cost: float = 0.0  # Spent on finished re-extractions
+    reserved: float = 0.0  # Estimated cost of re-extractions in flight
+
+    def try_reserve(self, estimated_cost: float) -> bool:
+        """Take one call (and the estimated cost) from the budget, if it allows"""
+        if self.calls >= self.max_calls:
+            return False
+        if self.max_cost is not None and self.cost + self.reserved + estimated_cost > self.max_cost:
+            return False
+        self.calls += 1
+        self.reserved += estimated_cost
+        return True
+
+    def settle(self, estimated_cost: float, actual_cost: float) -> None:
+        """Replace a finished re-extraction's reservation with its actual cost"""
+        self.reserved = max(0.0, self.reserved - estimated_cost)
+        self.cost += actual_cost
+
+
+@dataclass
+class PageRetry:
+    """Re-extraction record of a page"""
+    page_num: int
+    issues: List[str]  # Blocking issues of the first attempt
+    attempts: int = 0  # Re-extractions run
+    remaining_issues: List[str] = field(default_factory=list)  # Of the kept attempt
+
+    @property
+    def resolved(self) -> bool:
+        return self.attempts > 0 and not self.remaining_issues
+
+
+@dataclass
+class PendingAttempt:
+    """A page queued again, and the result its next attempt competes with"""
+    kept: Dict[str, Any]  # Best result so far
+    kept_issues: List[str]  # Its blocking issues
+    discarded: TokenUsage = field(default_factory=TokenUsage)  # Usage of attempts not kept
+    reserved: float = 0.0  # Budget reserved for a re-extraction
+    # Set for a request to the next cascade tier (replaces kept) rather than a
+    # same-tier re-extraction: the escalation step ("tier: reasons"), recorded
+    # in the cascade report once the next tier's result is in
+    escalation: Optional[str] = None
@@ -0,0 +1,209 @@
+"""
+Page cost prediction and scheduling.
+
+Pages are not equally expensive: a signature page produces ~200 output
+tokens, a dense questionnaire page ~3,000. Dispatching them in page order
+lets one large page submitted last stretch the whole run while the other
+workers sit idle. Dispatching the most expensive pages first (longest job
+first) keeps the workers evenly loaded until the end.
+
+The predictor only uses signals that are cheap to read before extraction:
+text length, widget, drawing and image counts, and - when a result cache is
+configured - the output tokens previously seen for the same form page.
+"""
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from .cache import ResultCache
+from .session import PageInfo
+
+# Scheduling policies
+SCHEDULE_FIFO = "fifo"
+SCHEDULE_LARGEST_FIRST = "largest_first"
+
+
+@dataclass
+class PageFeatures:
+    """Cheap per-page signals used to predict extraction cost"""
+    page_num: int
+    text_length: int = 0
+    widget_count: int = 0
+    drawing_count: int = 0
+    image_count: int = 0
+    layout: Optional[str] = None  # Layout fingerprint, for usage history lookups
+
+    @classmethod
+    def from_page_info(cls, info: PageInfo, layout: Optional[str] = None) -> "PageFeatures":
+        """Features from a DocumentSession's cached page metadata"""
+        return cls(
+            page_num=info.page_num,
+            text_length=len(info.text),
+            widget_count=info.widget_count,
+            drawing_count=info.drawing_count,
+            image_count=len(info.images),
+            layout=layout,
+        )
+
+
+def page_features(doc: fitz.Document, page_num: int, layout: Optional[str] = None) -> PageFeatures:
+    """
+    Read cost signals for a page.
+
+    Args:
+        doc: Open PyMuPDF document
+        page_num: 1-based page number
+        layout: Optional layout fingerprint (see cache.layout_fingerprint)
+    """
+    page = doc[page_num - 1]
+    return PageFeatures(
+        page_num=page_num,
+        text_length=len(page.get_text()),
+        widget_count=sum(1 for _ in page.widgets()),
+        drawing_count=len(page.get_cdrawings()),
+        image_count=len(page.get_images()),
+        layout=layout,
+    )
+
+
+class PageCostPredictor:
+    """
+    Predict the output tokens of a page extraction.
+
+    Usage:
+        predictor = PageCostPredictor(cache)
+        tokens = predictor.predict(page_features(doc, page_num))
+    """
+
+    # Linear model fitted on B07001-style forms: the markdown mirrors the
+    # page text, every widget adds a value line, drawings are mostly checkbox
+    # squares and table rules, images get a short description.
+    BASE_TOKENS = 120
+    TOKENS_PER_TEXT_CHAR = 0.3
+    TOKENS_PER_WIDGET = 12
+    TOKENS_PER_DRAWING = 0.5
+    MAX_DRAWING_TOKENS = 800
+    TOKENS_PER_IMAGE = 40
+    # Weight of observed usage vs. the linear model when history exists
+    HISTORY_WEIGHT = 0.8
+
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self.cache = cache
+
+    def predict(self, features: PageFeatures) -> int:
+        """Predicted output tokens for a page"""
+        estimate = (
+            self.BASE_TOKENS
+            + features.text_length * self.TOKENS_PER_TEXT_CHAR
+            + features.widget_count * self.TOKENS_PER_WIDGET
+            + min(features.drawing_count * self.TOKENS_PER_DRAWING, self.MAX_DRAWING_TOKENS)
+            + features.image_count * self.TOKENS_PER_IMAGE
+        )
+        if self.cache is not None and features.layout:
+            history = self.cache.get_usage(features.layout)
+            if history and history.get("samples"):
+                observed = history["output_tokens"]
+                estimate = self.HISTORY_WEIGHT * observed + (1 - self.HISTORY_WEIGHT) * estimate
+        return int(estimate)
+
+    def record(self, layout: Optional[str], form_id: Optional[str], output_tokens: int) -> None:
+        """Feed the observed output tokens of an extracted page back into the history"""
+        if self.cache is None or not layout or output_tokens <= 0:
+            return
+        self.cache.record_usage(layout, form_id, output_tokens)
+
+
+class PageQueue:
+    """
+    Thread-safe queue of pages waiting for a worker.
+
+    With SCHEDULE_LARGEST_FIRST the page with the highest predicted cost is
+    handed out first; ties (and SCHEDULE_FIFO) fall back to insertion order.
+    Pages can be added while workers are already pulling from the queue.
+
+    With a window (streaming output), only pages before next_page + window
+    are handed out; advance() moves next_page as pages are written, and
+    pop() waits until a queued page is inside the window.
+    """
+
+    def __init__(self, policy: str = SCHEDULE_LARGEST_FIRST, window: Optional[int] = None):
+        if policy not in (SCHEDULE_FIFO, SCHEDULE_LARGEST_FIRST):
+            raise ValueError(f"Unknown page schedule: {policy}. Use '{SCHEDULE_LARGEST_FIRST}' or '{SCHEDULE_FIFO}'")
+        self.policy = policy
+        self.window = window
+        self._next_page = 1
+        self._heap: List[Tuple[float, int, int]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self.dispatch_order: List[int] = []
+
+    def push(self, page_num: int, predicted_cost: float = 0.0) -> None:
+        priority = -predicted_cost if self.policy == SCHEDULE_LARGEST_FIRST else 0.0
+        with self._ready:
+            heapq.heappush(self._heap, (priority, next(self._counter), page_num))
+            self._ready.notify_all()
+
+    def requeue(self, page_num: int) -> None:
+        """Queue a page again ahead of all others (re-extraction)"""
+        with self._ready:
+            heapq.heappush(self._heap, (float("-inf"), next(self._counter), page_num))
+            self._ready.notify_all()
+
+    def advance(self, next_page: int) -> None:
+        """Pages before next_page have been written; widen the window"""
+        with self._ready:
+            self._next_page = next_page
+            self._ready.notify_all()
+
+    def pop(self) -> int:
+        with self._ready:
+            if self.window is None:
+                _, _, page_num = heapq.heappop(self._heap)
+            else:
+                entry = self._pop_in_window()
+                while entry is None:
+                    self._ready.wait()
+                    entry = self._pop_in_window()
+                _, _, page_num = entry
+            self.dispatch_order.append(page_num)
+            return page_num
+
+    def _pop_in_window(self) -> Optional[Tuple[float, int, int]]:
+        """Highest-priority queued page inside the window, if any"""
+        limit = self._next_page + self.window
+        skipped = []
+        entry = None
+        while self._heap:
+            candidate = heapq.heappop(self._heap)
+            if candidate[2] < limit:
+                entry = candidate
+                break
+            skipped.append(candidate)
+        for candidate in skipped:
+            heapq.heappush(self._heap, candidate)
+        return entry
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+def simulate_makespan(durations: Dict[int, float], order: List[int], workers: int) -> float:
+    """
+    Makespan of running pages in the given dispatch order on N workers.
+
+    Each page goes to the worker that becomes free first (how the thread
+    pool behaves). Used by benchmark_scheduling.py.
+    """
+    free_at = [0.0] * max(workers, 1)
+    heapq.heapify(free_at)
+    for page_num in order:
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + durations[page_num])
+    return max(free_at)
@@ -0,0 +1,208 @@
+"""
+Shared document session - one read of the PDF per run.
+
+A process() run used to open the file once to count pages, once to analyze,
+once more for routing, once per page to plan the render, once per page in
+poppler (pdf2image) to render, once for post-processing and once more to
+hash it. A DocumentSession reads the file once and serves everything from
+those bytes:
+
+- md5() hashes the bytes in place
+- document() / page() hand out a fitz handle per thread (opened from the
+  bytes, so no further file opens)
+- page_info() caches the per-page metadata several stages read (size,
+  text, widget and drawing counts, image list)
+- render() rasterizes with PyMuPDF, clipped to a crop box if given
+
+The source may also be an in-memory PDF (bytes, bytearray, memoryview or
+an mmap), e.g. an upload: it is opened and hashed in place, so the run
+never touches the disk.
+
+stats() reports file opens and bytes read, see benchmark_document_session.py.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# A PDF path or an in-memory PDF
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+# Name used for in-memory PDFs in headers, cache manifests and debug files
+DEFAULT_DOCUMENT_NAME = "document.pdf"
+
+
+def is_pdf_path(source: PDFSource) -> bool:
+    """True if source is a file path rather than an in-memory PDF"""
+    return isinstance(source, (str, os.PathLike))
+
+
+@dataclass
+class PageInfo:
+    """Page metadata read once per session"""
+    page_num: int       # 1-based
+    width: float        # points
+    height: float       # points
+    text: str
+    widget_count: int
+    drawing_count: int
+    # get_images(full=True) entries, see analyzer.image_color_mode
+    images: List[tuple] = field(default_factory=list)
+
+
+class DocumentSession:
+    """
+    One PDF shared by the analyzer, renderer and post-processor.
+
+    Usage:
+        with DocumentSession(pdf_path) as session:
+            page = session.page(1)                    # this thread's handle
+            info = session.page_info(1)               # cached metadata
+            image = session.render(1, dpi=150, colorspace="gray")
+            digest = session.md5()
+
+        # Uploads: no temp file, nothing read from disk
+        session = DocumentSession(upload_bytes, name="upload.pdf")
+    """
+
+    def __init__(self, source: PDFSource, name: Optional[str] = None):
+        """
+        Args:
+            source: Path to the PDF, or the PDF itself as bytes, bytearray,
+                memoryview or mmap (used in place, not copied)
+            name: Document name for in-memory sources (default: the file
+                name of a path, else DEFAULT_DOCUMENT_NAME)
+        """
+        self._source = source
+        self._data: Optional[Union[bytes, memoryview]] = None
+        if is_pdf_path(source):
+            self.pdf_path: Optional[str] = os.fspath(source)
+            self.name = name or os.path.basename(self.pdf_path)
+        else:
+            self.pdf_path = None
+            self.name = name or DEFAULT_DOCUMENT_NAME
+        self._md5: Optional[str] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handles: List[fitz.Document] = []
+        self._page_info: Dict[int, PageInfo] = {}
+        self.file_opens = 0
+        self.bytes_read = 0
+
+    def __enter__(self) -> "DocumentSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def data(self) -> Union[bytes, memoryview]:
+        """The PDF bytes (read from disk on first use for path sources)"""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if self.pdf_path is None:
+                        # A view, not a copy; mmap needs one for PyMuPDF
+                        self._data = memoryview(self._source).cast("B")
+                    else:
+                        with open(self.pdf_path, "rb") as f:
+                            self._data = f.read()
+                        self.file_opens += 1
+                        self.bytes_read += len(self._data)
+        return self._data
+
+    def md5(self) -> str:
+        """MD5 of the PDF, computed over the session's bytes"""
+        if self._md5 is None:
+            self._md5 = hashlib.md5(self.data).hexdigest()
+        return self._md5
+
+    def document(self) -> fitz.Document:
+        """This thread's PyMuPDF handle (PyMuPDF documents are not thread-safe)"""
+        doc = getattr(self._local, "doc", None)
+        if doc is None:
+            doc = fitz.open(stream=self.data, filetype="pdf")
+            self._local.doc = doc
+            with self._lock:
+                self._handles.append(doc)
+        return doc
+
+    @property
+    def page_count(self) -> int:
+        return len(self.document())
+
+    def page(self, page_num: int) -> fitz.Page:
+        """Page by 1-based number, from this thread's handle"""
+        return self.document()[page_num - 1]
+
+    def page_info(self, page_num: int) -> PageInfo:
+        """Cached metadata for a page (1-based)"""
+        info = self._page_info.get(page_num)
+        if info is None:
+            page = self.page(page_num)
+            info = PageInfo(
+                page_num=page_num,
+                width=page.rect.width,
+                height=page.rect.height,
+                text=page.get_text(),
+                widget_count=sum(1 for _ in page.widgets()),
+                drawing_count=len(page.get_cdrawings()),
+                images=page.get_images(full=True),
+            )
+            self._page_info[page_num] = info
+        return info
+
+    def render(
+        self,
+        page_num: int,
+        dpi: int,
+        colorspace: str = "rgb",
+        clip: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Image.Image:
+        """
+        Rasterize a page.
+
+        Args:
+            page_num: 1-based page number
+            dpi: Render resolution
+            colorspace: "rgb" or "gray"
+            clip: Optional area in PDF points to render instead of the whole page
+
+        Returns:
+            PIL image in mode "RGB" or "L"
+        """
+        page = self.page(page_num)
+        gray = colorspace == "gray"
+        pix = page.get_pixmap(
+            dpi=dpi,
+            colorspace=fitz.csGRAY if gray else fitz.csRGB,
+            alpha=False,
+            clip=fitz.Rect(clip) if clip else None,
+        )
+        return Image.frombytes("L" if gray else "RGB", (pix.width, pix.height), pix.samples)
+
+    def stats(self) -> Dict[str, int]:
+        """File opens and bytes read so far, and fitz handles handed out"""
+        return {
+            "file_opens": self.file_opens,
+            "bytes_read": self.bytes_read,
+            "fitz_handles": len(self._handles),
+        }
+
+    def close(self) -> None:
+        """Close every thread's handle and release the view of an in-memory source"""
+        with self._lock:
+            for doc in self._handles:
+                doc.close()
+            self._handles.clear()
+            if self.pdf_path is None and self._data is not None:
+                # An exported view keeps the caller from closing their mmap
+                self._data.release()
+                self._data = None
+        self._local = threading.local()
@@ -0,0 +1,67 @@
+"""
+Model-aware page image sizing.
+
+Vision models bill images per tile or per patch, so the input tokens of a
+page are a step function of its render size. A 150 DPI A4 page (1240x1754)
+is 2x3 768px tiles for Gemini; at 131 DPI it is 2x2 - a third fewer image
+tokens for a barely smaller image. For patch-billed models tokens grow with
+the pixel count, so the lowest legible DPI is the cheapest.
+
+choose_render_size() scans render DPIs between the legibility floor and the
+default render DPI and picks the cheapest token count, preferring the
+highest DPI among equally cheap sizes.
+"""
+
+from dataclasses import dataclass
+
+from ..models.config import ImageTokenCost
+
+POINTS_PER_INCH = 72.0
+DEFAULT_RENDER_DPI = 150  # ExtractionConfig.render_dpi
+
+
+@dataclass
+class RenderSize:
+    """Chosen render resolution for a page"""
+    dpi: int
+    width: int
+    height: int
+    image_tokens: int
+
+
+def render_dimensions(width_pt: float, height_pt: float, dpi: int) -> tuple:
+    """Pixel size of a page rendered at dpi (rounded like the renderers do)"""
+    return (
+        max(1, round(width_pt * dpi / POINTS_PER_INCH)),
+        max(1, round(height_pt * dpi / POINTS_PER_INCH)),
+    )
+
+
+def choose_render_size(
+    width_pt: float,
+    height_pt: float,
+    cost: ImageTokenCost,
+    min_dpi: int = 100,
+    max_dpi: int = DEFAULT_RENDER_DPI,
+) -> RenderSize:
+    """
+    Pick the render DPI with the fewest image tokens that is still legible.
+
+    Args:
+        width_pt: Page width in PDF points
+        height_pt: Page height in PDF points
+        cost: The model's image token cost function
+        min_dpi: Lowest DPI that keeps form text legible
+        max_dpi: Default render DPI (never exceeded)
+
+    Returns:
+        RenderSize with the chosen DPI, pixel dimensions and image tokens
+    """
+    best = None
+    for dpi in range(max_dpi, max(min_dpi, 1) - 1, -1):
+        width, height = render_dimensions(width_pt, height_pt, dpi)
+        tokens = cost.tokens(width, height)
+        # Strictly fewer tokens only: ties keep the higher DPI found first
+        if best is None or tokens < best.image_tokens:
+            best = RenderSize(dpi=dpi, width=width, height=height, image_tokens=tokens)
+    return best
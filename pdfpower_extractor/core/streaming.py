@@ -0,0 +1,181 @@
+"""
+Ordered streaming output.
+
+process() used to hold every page's content until the last page was done
+(in the page results, the collected results and the merged sections) and
+then concatenate one large string. With streaming output each page section
+is handed to a sink as soon as it is the next page in order:
+
+- OrderedPageWriter buffers pages that finish ahead of an earlier page and
+  writes them in page order once the gap is filled
+- PageQueue(window=...) keeps workers from starting pages further ahead
+  than the reorder buffer allows, so at most `window` finished pages wait
+  in memory whatever order the scheduler dispatches them in
+
+Sinks:
+- MemorySink: keeps the sections and returns the whole document (default)
+- MarkdownFileSink: appends sections to <output>.part as they are written;
+  finish() writes the header and TOC, then the sections behind them
+- CallbackSink: passes each section to a callable; the header and TOC are
+  returned by finish()
+"""
+
+import os
+import shutil
+from typing import Any, Callable, Dict, List, Optional
+
+# Orders in which PDFProcessor.process_stream() yields pages
+ORDER_PAGE = "page"
+ORDER_COMPLETION = "completion"
+
+# Read size when copying the streamed sections behind the header
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# Placeholder for pages that produce no section (not selected, failed)
+_SKIPPED = object()
+
+PageCallback = Callable[[int, str], None]
+
+
+class OrderedPageWriter:
+    """
+    Reorder buffer: accepts pages in any order, writes them in page order.
+
+    Usage:
+        writer = OrderedPageWriter(sink.write, on_advance=page_queue.advance)
+        writer.add(2, section_2)   # buffered, page 1 is not done yet
+        writer.add(1, section_1)   # writes page 1, then page 2
+        writer.skip(3)             # page 3 produces no output
+    """
+
+    def __init__(
+        self,
+        write: Callable[[int, Any], None],
+        first_page: int = 1,
+        on_advance: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        Args:
+            write: Called with (page_num, item) for each page, in page order
+            first_page: First page number to expect
+            on_advance: Called with the next expected page after pages were written
+        """
+        self._write = write
+        self._on_advance = on_advance
+        self._pending: Dict[int, Any] = {}
+        self._held = 0
+        self.next_page = first_page
+        self.pages_written = 0
+        self.peak_buffered = 0
+
+    @property
+    def buffered(self) -> int:
+        """Finished pages waiting for an earlier page"""
+        return self._held
+
+    def add(self, page_num: int, item: Any) -> None:
+        """Add a finished page; writes it and any pages it unblocks"""
+        if page_num < self.next_page or page_num in self._pending:
+            raise ValueError(f"Page {page_num} was already written or added")
+        self._pending[page_num] = item
+        if item is not _SKIPPED:
+            self._held += 1
+        self._flush()
+        self.peak_buffered = max(self.peak_buffered, self._held)
+
+    def skip(self, page_num: int) -> None:
+        """Mark a page that produces no output"""
+        self.add(page_num, _SKIPPED)
+
+    def _flush(self) -> None:
+        start = self.next_page
+        while self.next_page in self._pending:
+            item = self._pending.pop(self.next_page)
+            if item is not _SKIPPED:
+                self._held -= 1
+                self._write(self.next_page, item)
+                self.pages_written += 1
+            self.next_page += 1
+        if self.next_page != start and self._on_advance is not None:
+            self._on_advance(self.next_page)
+
+
+class MemorySink:
+    """Collects the sections; finish() returns the whole document"""
+
+    def __init__(self):
+        self.sections: List[str] = []
+
+    def write(self, page_num: int, section: str) -> None:
+        self.sections.append(section)
+
+    def finish(self, header: str) -> str:
+        return header + "\n".join(self.sections)
+
+    def abort(self) -> None:
+        self.sections = []
+
+
+class CallbackSink:
+    """Passes each section to a callback; finish() returns the header and TOC"""
+
+    def __init__(self, callback: PageCallback):
+        self.callback = callback
+
+    def write(self, page_num: int, section: str) -> None:
+        self.callback(page_num, section)
+
+    def finish(self, header: str) -> str:
+        return header
+
+    def abort(self) -> None:
+        pass
+
+
+class MarkdownFileSink:
+    """
+    Streams sections to a file; the header and TOC are patched in at the end.
+
+    Sections are appended (and flushed) to <output_path>.part as they are
+    written, so progress is visible while the job runs. finish() writes the
+    header and TOC to a temporary file, copies the sections behind them in
+    chunks and moves it to output_path. abort() removes the partial file.
+    """
+
+    def __init__(self, output_path: str, callback: Optional[PageCallback] = None):
+        """
+        Args:
+            output_path: Final output file
+            callback: Optionally also called with (page_num, section) per page
+        """
+        self.output_path = os.fspath(output_path)
+        self.part_path = self.output_path + ".part"
+        self.callback = callback
+        # newline="": byte offsets in the page index assume "\n" line ends
+        self._file = open(self.part_path, "w", encoding="utf-8", newline="")
+        self._empty = True
+
+    def write(self, page_num: int, section: str) -> None:
+        if not self._empty:
+            self._file.write("\n")
+        self._file.write(section)
+        self._file.flush()
+        self._empty = False
+        if self.callback is not None:
+            self.callback(page_num, section)
+
+    def finish(self, header: str) -> str:
+        self._file.close()
+        tmp_path = self.output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out, \
+                open(self.part_path, encoding="utf-8", newline="") as body:
+            out.write(header)
+            shutil.copyfileobj(body, out, COPY_CHUNK_BYTES)
+        os.replace(tmp_path, self.output_path)
+        os.remove(self.part_path)
+        return header
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
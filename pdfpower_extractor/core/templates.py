@@ -0,0 +1,283 @@
+"""
+Template registry for recurring form types.
+
+Most documents are a handful of recurring AcroForms (FORM_ID B07001, ...).
+The static part of such a page - labels, sections, option texts - is the
+same for every applicant; only the filled fields and ticked boxes differ.
+
+The first time a form page is extracted by the model, its markdown is stored
+as the canonical layout together with a mapping from each form widget to the
+place in the markdown that shows its value (value backticks for text fields,
+the (x)/[x] marker for radio buttons and checkboxes). Later instances with
+the same layout fingerprint are then rendered from the widget values in the
+text layer, without sending the page to the model at all.
+
+Widgets are mapped to markdown slots in reading order. Blank fields and
+unticked boxes agree with any order, so a page is only learned when the
+number of slots matches the number of widgets, every text field is filled
+with a value that is unique on the page and shown in its slot, and every
+group of options (consecutive option lines) has a ticked box, with all
+ticks matching the widgets. A page the mapping cannot be confirmed for
+keeps using full AI extraction.
+
+Templates are sealed with a checksum like result cache entries: a truncated
+or tampered template is a miss, never a source of wrong values.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from .cache import FileCacheBackend, _seal, _unseal
+
+# Bump when the template format changes
+TEMPLATE_VERSION = 2
+
+TEXT_WIDGET_TYPES = {
+    fitz.PDF_WIDGET_TYPE_TEXT,
+    fitz.PDF_WIDGET_TYPE_COMBOBOX,
+    fitz.PDF_WIDGET_TYPE_LISTBOX,
+}
+CHOICE_WIDGET_TYPES = {
+    fitz.PDF_WIDGET_TYPE_CHECKBOX,
+    fitz.PDF_WIDGET_TYPE_RADIOBUTTON,
+}
+
+VALUE_SPAN_PATTERN = re.compile(r'`([^`\n]*)`')
+CHOICE_LINE_PATTERN = re.compile(r'^(\s*-\s*)([\[(])([xX ])([\])])')
+METADATA_MARKERS = ("FORM_ID", "PAGE_TYPE", "<!--")
+
+# Rows closer than this (points) are treated as the same line when sorting widgets
+READING_ORDER_ROW_TOLERANCE = 4.0
+
+
+@dataclass
+class FieldSlot:
+    """Where a single widget's value appears in the canonical markdown"""
+    field_name: str
+    kind: str          # "text" or "choice"
+    line_index: int
+    span_index: int = 0  # Which backtick span on the line (text slots only)
+
+
+@dataclass
+class PageTemplate:
+    """Canonical markdown of a form page plus its widget-to-slot mapping"""
+    layout: str                      # Layout fingerprint (see cache.layout_fingerprint)
+    form_id: Optional[str]
+    markdown: str
+    slots: List[FieldSlot] = field(default_factory=list)
+    learned_from: str = ""
+    created: float = 0.0
+
+    def render(self, widgets: List[fitz.Widget]) -> str:
+        """Fill the canonical markdown with the values of a new instance's widgets"""
+        lines = self.markdown.split("\n")
+        ordered = _widgets_in_reading_order(widgets)
+        text_widgets = [w for w in ordered if w.field_type in TEXT_WIDGET_TYPES]
+        choice_widgets = [w for w in ordered if w.field_type in CHOICE_WIDGET_TYPES]
+        text_slots = [s for s in self.slots if s.kind == "text"]
+        choice_slots = [s for s in self.slots if s.kind == "choice"]
+
+        for slot, widget in zip(text_slots, text_widgets):
+            value = _text_value(widget).replace("`", "'")
+            lines[slot.line_index] = _replace_span(lines[slot.line_index], slot.span_index, value)
+
+        for slot, widget in zip(choice_slots, choice_widgets):
+            mark = "x" if is_checked(widget) else " "
+            lines[slot.line_index] = CHOICE_LINE_PATTERN.sub(
+                lambda m: f"{m.group(1)}{m.group(2)}{mark}{m.group(4)}",
+                lines[slot.line_index],
+                count=1,
+            )
+
+        return "\n".join(lines)
+
+    def matches(self, widgets: List[fitz.Widget]) -> bool:
+        """Check that a page's widgets line up with this template's slots"""
+        text_count = sum(1 for w in widgets if w.field_type in TEXT_WIDGET_TYPES)
+        choice_count = sum(1 for w in widgets if w.field_type in CHOICE_WIDGET_TYPES)
+        return (
+            text_count == sum(1 for s in self.slots if s.kind == "text")
+            and choice_count == sum(1 for s in self.slots if s.kind == "choice")
+        )
+
+    @classmethod
+    def learn(
+        cls,
+        layout: str,
+        markdown: str,
+        widgets: List[fitz.Widget],
+        form_id: Optional[str] = None,
+        learned_from: str = "",
+    ) -> Optional["PageTemplate"]:
+        """
+        Learn a template from a page the model has already extracted.
+
+        Returns:
+            PageTemplate, or None if the markdown cannot be mapped onto the widgets
+        """
+        ordered = _widgets_in_reading_order(widgets)
+        text_widgets = [w for w in ordered if w.field_type in TEXT_WIDGET_TYPES]
+        choice_widgets = [w for w in ordered if w.field_type in CHOICE_WIDGET_TYPES]
+        if not text_widgets and not choice_widgets:
+            return None
+
+        lines = markdown.split("\n")
+        text_slots: List[Tuple[FieldSlot, str]] = []
+        choice_slots: List[Tuple[FieldSlot, bool]] = []
+        for idx, line in enumerate(lines):
+            if any(marker in line for marker in METADATA_MARKERS):
+                continue
+            choice = CHOICE_LINE_PATTERN.match(line)
+            if choice:
+                choice_slots.append((FieldSlot("", "choice", idx), choice.group(3) != " "))
+                continue
+            for span_idx, span in enumerate(VALUE_SPAN_PATTERN.finditer(line)):
+                text_slots.append((FieldSlot("", "text", idx, span_idx), span.group(1)))
+
+        if len(text_slots) != len(text_widgets) or len(choice_slots) != len(choice_widgets):
+            return None
+        # Only distinct filled values and ticks can confirm the slot order
+        values = [_normalize(shown) for _, shown in text_slots]
+        if not all(values) or len(set(values)) != len(values):
+            return None
+        if not all(any(checked for _, checked in group) for group in _choice_groups(choice_slots)):
+            return None
+
+        slots: List[FieldSlot] = []
+        for (slot, shown), widget in zip(text_slots, text_widgets):
+            if _normalize(shown) != _normalize(_text_value(widget)):
+                return None
+            slot.field_name = widget.field_name or ""
+            slots.append(slot)
+        for (slot, checked), widget in zip(choice_slots, choice_widgets):
+            if checked != is_checked(widget):
+                return None
+            slot.field_name = widget.field_name or ""
+            slots.append(slot)
+
+        return cls(
+            layout=layout,
+            form_id=form_id,
+            markdown=markdown,
+            slots=slots,
+            learned_from=learned_from,
+            created=time.time(),
+        )
+
+
+class TemplateRegistry:
+    """
+    Directory of learned page templates, keyed by layout fingerprint.
+
+    Usage:
+        registry = TemplateRegistry("~/.pdfpower/templates")
+        template = registry.get(layout_fingerprint(doc, 0))
+        if template and template.matches(widgets):
+            markdown = template.render(widgets)
+    """
+
+    def __init__(self, template_dir: str):
+        # Same atomic, lock-free file store as the result cache, so a registry
+        # on a shared path can be learned into by several nodes at once
+        self.backend = FileCacheBackend(template_dir)
+        self.root = self.backend.root
+
+    def get(self, layout: str) -> Optional[PageTemplate]:
+        """Get the template for a layout fingerprint, or None (also for damaged templates)"""
+        data = _unseal(self.backend.read(f"{layout}.json"))
+        if not data or data.get("version") != TEMPLATE_VERSION:
+            return None
+        try:
+            slots = [FieldSlot(**slot) for slot in data.get("slots", [])]
+            return PageTemplate(
+                layout=data["layout"],
+                form_id=data.get("form_id"),
+                markdown=data["markdown"],
+                slots=slots,
+                learned_from=data.get("learned_from", ""),
+                created=data.get("created", 0.0),
+            )
+        except (KeyError, TypeError):
+            return None
+
+    def register(self, template: PageTemplate) -> None:
+        """Store a template (the first learned instance of a layout wins, unless its entry is damaged)"""
+        path = f"{template.layout}.json"
+        data = asdict(template)
+        data["version"] = TEMPLATE_VERSION
+        existing = self.backend.read(path)
+        self.backend.write(path, _seal(data), overwrite=existing is not None and _unseal(existing) is None)
+
+    def forms(self) -> Dict[str, int]:
+        """Number of learned page templates per FORM_ID"""
+        counts: Dict[str, int] = {}
+        for path in self.root.glob("*.json"):
+            try:
+                data = _unseal(path.read_bytes())
+            except OSError:
+                continue
+            if data is None:
+                continue
+            form_id = data.get("form_id") or "unknown"
+            counts[form_id] = counts.get(form_id, 0) + 1
+        return counts
+
+
+def _widgets_in_reading_order(widgets: List[fitz.Widget]) -> List[fitz.Widget]:
+    """Sort widgets top-to-bottom, then left-to-right within a row"""
+    return sorted(
+        widgets,
+        key=lambda w: (round(w.rect.y0 / READING_ORDER_ROW_TOLERANCE), w.rect.x0),
+    )
+
+
+def _text_value(widget: fitz.Widget) -> str:
+    value = widget.field_value
+    if value is None or value is False:
+        return ""
+    return " ".join(str(value).split())
+
+
+def is_checked(widget: fitz.Widget) -> bool:
+    """True if a checkbox or radio button widget is selected"""
+    value = widget.field_value
+    if isinstance(value, bool):
+        return value
+    if widget.field_type == fitz.PDF_WIDGET_TYPE_RADIOBUTTON:
+        # Radio kids report the group's value; compare with this button's on-state
+        try:
+            on_state = widget.on_state()
+        except Exception:
+            on_state = None
+        if on_state:
+            return value == on_state
+    return str(value) not in ("", "Off", "None", "False")
+
+
+def _choice_groups(choice_slots: List[Tuple[FieldSlot, bool]]) -> List[List[Tuple[FieldSlot, bool]]]:
+    """Option slots on consecutive markdown lines, one group per question"""
+    groups: List[List[Tuple[FieldSlot, bool]]] = []
+    for entry in choice_slots:
+        if groups and entry[0].line_index == groups[-1][-1][0].line_index + 1:
+            groups[-1].append(entry)
+        else:
+            groups.append([entry])
+    return groups
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+def _replace_span(line: str, span_index: int, value: str) -> str:
+    """Replace the n-th backtick value span on a line"""
+    spans = list(VALUE_SPAN_PATTERN.finditer(line))
+    if span_index >= len(spans):
+        return line
+    span = spans[span_index]
+    return f"{line[:span.start()]}`{value}`{line[span.end():]}"
@@ -0,0 +1,134 @@
+"""
+Tiled extraction for oversized pages.
+
+A3 sheets and engineering drawings rendered at 150 DPI exceed payload limits
+or are downsampled by the provider until checkboxes become illegible. Such
+pages are cut into overlapping full-width bands, so lines of text stay
+whole, that are extracted in parallel and stitched back into one page
+section. Pages wider than the tile size get shorter bands with the same
+pixel count instead of a column grid: tiles side by side would split every
+line into a left and a right half that the stitcher cannot rejoin.
+
+Neighbouring tiles share tile_overlap_px pixels, so a line cut at one tile's
+edge is complete in the next. The stitcher drops the lines both tiles
+extracted from the overlap (runs of two or more, so a single repeated option
+line is kept), and repeated page metadata (FORM_ID, PAGE_TYPE).
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Page metadata lines the model emits once per page; kept only from the first tile
+METADATA_PREFIXES = ("**FORM_ID**", "**PAGE_TYPE**")
+
+
+@dataclass
+class Tile:
+    """One tile of a page render (pixel box in the render)"""
+    index: int    # 0-based, top to bottom
+    rows: int
+    box: Tuple[int, int, int, int]  # (left, top, right, bottom)
+
+    @property
+    def position(self) -> str:
+        """Human-readable place of the tile on the page, for the prompt"""
+        return f"band {self.index + 1} of {self.rows} from the top"
+
+
+def _spans(length: int, max_len: int, overlap: int) -> List[Tuple[int, int]]:
+    """Split [0, length) into the fewest equal spans of at most max_len that overlap by overlap"""
+    if length <= max_len:
+        return [(0, length)]
+    count = math.ceil((length - overlap) / (max_len - overlap))
+    step = (length - overlap) / count
+    spans = []
+    for i in range(count):
+        start = round(i * step)
+        end = length if i == count - 1 else round(i * step + step + overlap)
+        spans.append((start, end))
+    return spans
+
+
+def plan_tiles(width: int, height: int, max_side: int, overlap: int) -> List[Tile]:
+    """
+    Cut a width x height render into overlapping full-width bands.
+
+    Bands are at most max_side high and, on pages wider than max_side, no
+    larger than a max_side x max_side tile in pixels.
+
+    Args:
+        width: Render width in pixels
+        height: Render height in pixels
+        max_side: Largest tile side in pixels
+        overlap: Pixels shared by neighbouring bands
+
+    Returns:
+        Bands from top to bottom; a single tile covering the page if it fits
+    """
+    if width <= max_side and height <= max_side:
+        return [Tile(index=0, rows=1, box=(0, 0, width, height))]
+    band_height = min(max_side, max_side * max_side // width) if width > max_side else max_side
+    overlap = max(0, min(overlap, band_height // 2))
+    rows = _spans(height, band_height, overlap)
+    return [
+        Tile(index=r, rows=len(rows), box=(0, top, width, bottom))
+        for r, (top, bottom) in enumerate(rows)
+    ]
+
+
+def _normalize(line: str) -> str:
+    return " ".join(line.split())
+
+
+def dedupe_overlap(previous: str, following: str, max_lines: int = 12, min_lines: int = 2) -> str:
+    """
+    Drop the leading lines of following that repeat the end of previous.
+
+    Compares whitespace-normalized non-empty lines and removes the longest
+    run (min_lines to max_lines) that ends previous and starts following.
+    A single matching line is kept: on forms it is as likely to be a
+    repeated option ("- ( ) No"), rule or table header as overlap.
+
+    Returns:
+        following without the repeated lines
+    """
+    prev_lines = [_normalize(line) for line in previous.splitlines() if line.strip()]
+    next_lines = following.splitlines()
+    next_keys = [(i, _normalize(line)) for i, line in enumerate(next_lines) if line.strip()]
+    for n in range(min(max_lines, len(prev_lines), len(next_keys)), max(min_lines, 1) - 1, -1):
+        if prev_lines[-n:] == [key for _, key in next_keys[:n]]:
+            cut = next_keys[n - 1][0] + 1
+            return "\n".join(next_lines[cut:])
+    return following
+
+
+def stitch_tiles(parts: List[str]) -> str:
+    """
+    Join the markdown of a page's tiles (in reading order) into one page.
+
+    Args:
+        parts: Extracted markdown per tile
+
+    Returns:
+        The page markdown with overlap lines and repeated metadata removed
+    """
+    stitched = ""
+    seen_metadata = set()
+    for part in parts:
+        lines = []
+        for line in part.strip("\n").splitlines():
+            prefix = next((p for p in METADATA_PREFIXES if line.lstrip().startswith(p)), None)
+            if prefix:
+                if prefix in seen_metadata:
+                    continue
+                seen_metadata.add(prefix)
+            lines.append(line)
+        text = "\n".join(lines)
+        if stitched:
+            text = dedupe_overlap(stitched, text).strip("\n")
+            if text:
+                stitched = f"{stitched}\n{text}"
+        else:
+            stitched = text
+    return stitched
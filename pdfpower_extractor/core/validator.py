@@ -6,10 +6,21 @@ Validates LLM output to ensure:
 - Radio/checkbox groups have at least one option
 - No obvious hallucinations
 - Output structure matches expected format
+
+Pattern checks (hallucination phrases, encoding problems) are ValidationRules
+in a RuleRegistry; DEFAULT_RULES holds the built-in ones and more can be
+registered. An OutputValidator compiles its registry's rules once (again
+only if the registry changes). Rules with ignore_case are matched against
+one lower-cased copy of the output, which keeps the regex engine's literal
+prefix search: re.IGNORECASE disables it, and a single combined
+alternation of all rules was slower still. Radio and checkbox options are
+counted and checked in one scan over the line starts.
 """
 
 import re
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -53,6 +64,208 @@ class ValidationResult:
         return f"Valid: {self.is_valid}, Errors: {errors}, Warnings: {warnings}"
 
 
+@dataclass(frozen=True)
+class ValidationRule:
+    """
+    A pattern that flags suspicious output.
+
+    Usage:
+        DEFAULT_RULES.register(ValidationRule(
+            name="to_be_confirmed",
+            pattern="to be confirmed",
+            code="PLACEHOLDER",
+            description="Unconfirmed value",
+            severity=ValidationSeverity.WARNING,
+            ignore_case=True,
+        ))
+    """
+    name: str
+    pattern: str
+    code: str  # ValidationIssue code
+    description: str
+    severity: ValidationSeverity = ValidationSeverity.ERROR
+    # Match against the lower-cased output; write the pattern in lower case
+    ignore_case: bool = False
+    # Issue message; {description} and {count} (occurrences) are filled in
+    message: str = "{description}"
+
+
+class RuleRegistry:
+    """
+    Ordered set of ValidationRules, by name.
+
+    Issues are reported in registration order. version changes with every
+    update, so validators know when to recompile.
+    """
+
+    def __init__(self, rules: Iterable[ValidationRule] = ()):
+        self._rules: Dict[str, ValidationRule] = {}
+        self.version = 0
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule: ValidationRule, replace: bool = False) -> None:
+        """
+        Add a rule.
+
+        Raises:
+            ValueError: If a rule with the same name exists and replace is False
+        """
+        if rule.name in self._rules and not replace:
+            raise ValueError(f"Validation rule already registered: {rule.name}")
+        re.compile(rule.pattern)  # Fail here rather than at the first validation
+        self._rules[rule.name] = rule
+        self.version += 1
+
+    def unregister(self, name: str) -> ValidationRule:
+        """Remove a rule; returns it"""
+        rule = self._rules.pop(name)
+        self.version += 1
+        return rule
+
+    def get(self, name: str) -> Optional[ValidationRule]:
+        return self._rules.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rules
+
+    def __iter__(self) -> Iterator[ValidationRule]:
+        return iter(list(self._rules.values()))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+def _hallucination_rule(name: str, pattern: str, description: str) -> ValidationRule:
+    return ValidationRule(
+        name=name,
+        pattern=pattern,
+        code="HALLUCINATION_DETECTED",
+        description=description,
+        ignore_case=True,
+        message="Suspicious pattern found: {description}",
+    )
+
+
+def _encoding_rule(name: str, pattern: str, description: str) -> ValidationRule:
+    return ValidationRule(
+        name=name,
+        pattern=pattern,
+        code="ENCODING_ISSUE",
+        description=description,
+        severity=ValidationSeverity.WARNING,
+        message="{description} ({count} occurrences)",
+    )
+
+
+# Suspicious patterns that might indicate hallucination
+_HALLUCINATION_RULES = (
+    _hallucination_rule("refusal_cannot", r"i cannot\s+", "LLM refusal pattern"),
+    _hallucination_rule("refusal_unable", r"i'm unable\s+", "LLM refusal pattern"),
+    _hallucination_rule("self_reference", r"as an ai\s+", "LLM self-reference"),
+    _hallucination_rule("no_access", r"i don't have access\s+", "LLM limitation statement"),
+    _hallucination_rule("apology", r"unfortunately\s+", "Apologetic language"),
+    _hallucination_rule("placeholder", r"\[placeholder\]", "Placeholder text"),
+    _hallucination_rule("insert_placeholder", r"\[insert\s+", "Insert placeholder"),
+    _hallucination_rule("lorem_ipsum", r"lorem ipsum", "Lorem ipsum placeholder"),
+)
+
+# Encoding issue indicators
+_ENCODING_RULES = (
+    _encoding_rule("replacement_character", r"[�□]", "Replacement character found"),
+    _encoding_rule("escaped_unicode", r"\\u[0-9a-fA-F]{4}", "Escaped unicode"),
+    _encoding_rule("html_entity", r"&[a-z]+;", "HTML entities"),
+)
+
+# Rules used by validators created without their own registry
+DEFAULT_RULES = RuleRegistry(_HALLUCINATION_RULES + _ENCODING_RULES)
+
+
+class CompiledRules:
+    """A registry's rules, compiled once"""
+
+    def __init__(self, rules: RuleRegistry):
+        self.registry = rules
+        self.version = rules.version
+        self._rules = [
+            (rule, re.compile(rule.pattern), rule.ignore_case, "{count}" in rule.message)
+            for rule in rules
+        ]
+        self._folds = any(rule.ignore_case for rule in rules)
+
+    def matches(self, output: str) -> Iterator[Tuple[ValidationRule, int]]:
+        """(rule, occurrences) for every rule that matches, in registry order"""
+        folded = output.lower() if self._folds else output
+        for rule, pattern, ignore_case, counts in self._rules:
+            text = folded if ignore_case else output
+            if counts:
+                occurrences = sum(1 for _ in pattern.finditer(text))
+            else:
+                occurrences = 1 if pattern.search(text) else 0
+            if occurrences:
+                yield rule, occurrences
+
+
+# Lines starting with a radio button or checkbox, after optional indentation
+_OPTION_LINE = re.compile(
+    r"^(?P<indent>[^\S\n]*)(?P<mark>[●○◉◯☒☑☐□✓✔]|\([x ]\)|\[[x ]\])(?P<gap>\s?)",
+    re.MULTILINE,
+)
+_RADIO_SELECTED = frozenset(("●", "◉", "(x)"))
+_RADIO_UNSELECTED = frozenset(("○", "◯", "( )"))
+
+
+def _scan_option_lines(output: str) -> Tuple[int, int, List[int]]:
+    """
+    Count radio/checkbox options and find radio groups with several selections.
+
+    Options are counted on lines that start (unindented) with a mark and a
+    space. A radio group is a run of consecutive lines starting with a radio
+    mark, indented or not; it ends at the first other line.
+
+    Returns:
+        (radio options, checkbox options, selected count of each ended group with more than one)
+    """
+    radio_options = checkbox_options = 0
+    crowded_groups: List[int] = []
+    in_group = False
+    selected = 0
+    next_line = None  # Start of the line after the last radio line (None: it was the last line)
+    for match in _OPTION_LINE.finditer(output):
+        mark = match.group("mark")
+        is_radio = mark in _RADIO_SELECTED or mark in _RADIO_UNSELECTED
+        if not match.group("indent") and match.group("gap"):
+            if is_radio:
+                radio_options += 1
+            else:
+                checkbox_options += 1
+        if not is_radio:
+            continue
+
+        start = match.start()
+        if in_group and start != next_line:
+            # Another line came between: the previous group ended there
+            if selected > 1:
+                crowded_groups.append(selected)
+            in_group = False
+        if not in_group:
+            in_group = True
+            selected = 0
+        if mark in _RADIO_SELECTED:
+            selected += 1
+        line_end = output.find("\n", start)
+        next_line = line_end + 1 if line_end != -1 else None
+
+    if in_group and next_line is not None and selected > 1:
+        crowded_groups.append(selected)
+    return radio_options, checkbox_options, crowded_groups
+
+
+def _validate_shard(validator: "OutputValidator", outputs: List[Tuple[int, str]]) -> Dict[int, "ValidationResult"]:
+    """Validate a shard of pages - runs in a worker process"""
+    return {page_num: validator.validate(output, page_num) for page_num, output in outputs}
+
+
 class OutputValidator:
     """
     Validates LLM extraction output.
@@ -64,6 +277,9 @@ class OutputValidator:
     4. Checkbox groups with no options
     5. Suspicious patterns (hallucination indicators)
     6. Character encoding issues
+
+    Checks 5 and 6 are the rules of a RuleRegistry (DEFAULT_RULES unless
+    given).
     """
 
     # Patterns for detecting form elements
@@ -73,30 +289,19 @@ class OutputValidator:
     MARKDOWN_RADIO_PATTERN = re.compile(r'^\([x ]\)\s+', re.MULTILINE)
     MARKDOWN_CHECKBOX_PATTERN = re.compile(r'^\[[x ]\]\s+', re.MULTILINE)
 
-    # Suspicious patterns that might indicate hallucination
-    HALLUCINATION_PATTERNS = [
-        (r'I cannot\s+', "LLM refusal pattern"),
-        (r'I\'m unable\s+', "LLM refusal pattern"),
-        (r'As an AI\s+', "LLM self-reference"),
-        (r'I don\'t have access\s+', "LLM limitation statement"),
-        (r'unfortunately\s+', "Apologetic language"),
-        (r'\[placeholder\]', "Placeholder text"),
-        (r'\[insert\s+', "Insert placeholder"),
-        (r'lorem ipsum', "Lorem ipsum placeholder"),
-    ]
-
-    # Encoding issue indicators
-    ENCODING_ISSUES = [
-        (r'[�□]', "Replacement character found"),
-        (r'\\u[0-9a-fA-F]{4}', "Escaped unicode"),
-        (r'&[a-z]+;', "HTML entities"),
-    ]
+    # The built-in rules as (pattern, description); matching uses DEFAULT_RULES
+    HALLUCINATION_PATTERNS = [(rule.pattern, rule.description) for rule in _HALLUCINATION_RULES]
+    ENCODING_ISSUES = [(rule.pattern, rule.description) for rule in _ENCODING_RULES]
+
+    # Pages per worker process task in validate_batch()
+    BATCH_SHARD_SIZE = 64
 
     def __init__(
         self,
         min_content_length: int = 100,
         expected_question_ids: Optional[List[str]] = None,
-        strict_mode: bool = False
+        strict_mode: bool = False,
+        rules: Optional[RuleRegistry] = None,
     ):
         """
         Initialize validator.
@@ -105,10 +310,21 @@ class OutputValidator:
             min_content_length: Minimum expected output length
             expected_question_ids: List of question IDs that should be present
             strict_mode: If True, warnings become errors
+            rules: Pattern rules to check (default: DEFAULT_RULES)
         """
         self.min_content_length = min_content_length
         self.expected_question_ids = expected_question_ids or []
         self.strict_mode = strict_mode
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self._compiled: Optional[CompiledRules] = None
+
+    @property
+    def compiled_rules(self) -> CompiledRules:
+        """The rules, compiled when first used and after the registry changed"""
+        compiled = self._compiled
+        if compiled is None or compiled.registry is not self.rules or compiled.version != self.rules.version:
+            compiled = self._compiled = CompiledRules(self.rules)
+        return compiled
 
     def validate(self, output: str, page_num: Optional[int] = None) -> ValidationResult:
         """
@@ -164,88 +380,55 @@ class OutputValidator:
                     location_prefix
                 )
 
-        # Check 3: Radio/checkbox groups
-        radio_matches = self.RADIO_PATTERN.findall(output) + self.MARKDOWN_RADIO_PATTERN.findall(output)
-        checkbox_matches = self.CHECKBOX_PATTERN.findall(output) + self.MARKDOWN_CHECKBOX_PATTERN.findall(output)
-
-        result.stats["radio_options"] = len(radio_matches)
-        result.stats["checkbox_options"] = len(checkbox_matches)
-
-        # Check 4: Hallucination patterns
-        for pattern, description in self.HALLUCINATION_PATTERNS:
-            if re.search(pattern, output, re.IGNORECASE):
-                result.add_issue(
-                    ValidationSeverity.ERROR,
-                    "HALLUCINATION_DETECTED",
-                    f"Suspicious pattern found: {description}",
-                    location_prefix
-                )
+        # Check 3: Radio/checkbox groups (one scan, also used for check 6)
+        radio_options, checkbox_options, crowded_groups = _scan_option_lines(output)
+        result.stats["radio_options"] = radio_options
+        result.stats["checkbox_options"] = checkbox_options
 
-        # Check 5: Encoding issues
-        for pattern, description in self.ENCODING_ISSUES:
-            matches = re.findall(pattern, output)
-            if matches:
-                result.add_issue(
-                    ValidationSeverity.WARNING,
-                    "ENCODING_ISSUE",
-                    f"{description} ({len(matches)} occurrences)",
-                    location_prefix
-                )
+        # Checks 4 and 5: Hallucination patterns, encoding issues
+        for rule, occurrences in self.compiled_rules.matches(output):
+            result.add_issue(
+                rule.severity,
+                rule.code,
+                rule.message.format(description=rule.description, count=occurrences),
+                location_prefix
+            )
 
-        # Check 6: Balanced radio groups (each group should have options)
-        self._check_radio_group_balance(output, result, location_prefix)
+        # Check 6: Balanced radio groups (at most one selected option)
+        for selected_count in crowded_groups:
+            result.add_issue(
+                ValidationSeverity.WARNING,
+                "MULTIPLE_RADIO_SELECTED",
+                f"Radio group has {selected_count} selected options (should be 0 or 1)",
+                location_prefix
+            )
 
         return result
 
-    def _check_radio_group_balance(self, output: str, result: ValidationResult, location: str):
-        """Check that radio groups have reasonable structure"""
-        lines = output.split('\n')
-
-        in_radio_group = False
-        radio_count = 0
-        selected_count = 0
-
-        for line in lines:
-            line = line.strip()
-
-            # Detect radio option
-            is_selected = bool(re.match(r'^[●◉]', line) or re.match(r'^\(x\)', line))
-            is_unselected = bool(re.match(r'^[○◯]', line) or re.match(r'^\( \)', line))
-
-            if is_selected or is_unselected:
-                if not in_radio_group:
-                    in_radio_group = True
-                    radio_count = 0
-                    selected_count = 0
-
-                radio_count += 1
-                if is_selected:
-                    selected_count += 1
-            else:
-                # End of radio group
-                if in_radio_group:
-                    if radio_count > 0 and selected_count > 1:
-                        result.add_issue(
-                            ValidationSeverity.WARNING,
-                            "MULTIPLE_RADIO_SELECTED",
-                            f"Radio group has {selected_count} selected options (should be 0 or 1)",
-                            location
-                        )
-                    in_radio_group = False
-
-    def validate_batch(self, outputs: Dict[int, str]) -> Dict[int, ValidationResult]:
+    def validate_batch(self, outputs: Dict[int, str], workers: int = 1) -> Dict[int, ValidationResult]:
         """
         Validate multiple page outputs.
 
         Args:
             outputs: Dict mapping page numbers to output strings
+            workers: Number of processes to validate across, in shards of
+                BATCH_SHARD_SIZE pages (1 = validate in this process)
 
         Returns:
             Dict mapping page numbers to validation results
         """
-        results = {}
-        for page_num, output in outputs.items():
-            results[page_num] = self.validate(output, page_num)
+        if workers <= 1 or len(outputs) <= self.BATCH_SHARD_SIZE:
+            return _validate_shard(self, list(outputs.items()))
+
+        items = list(outputs.items())
+        shards = [
+            items[start:start + self.BATCH_SHARD_SIZE]
+            for start in range(0, len(items), self.BATCH_SHARD_SIZE)
+        ]
+        results: Dict[int, ValidationResult] = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard_results in executor.map(_validate_shard, repeat(self), shards):
+                results.update(shard_results)
         return results
 
     def get_overall_result(self, results: Dict[int, ValidationResult]) -> ValidationResult:
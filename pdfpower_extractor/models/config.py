@@ -4,6 +4,7 @@ AI Model Configuration System for PDFPowerExtractor
 Uses Gemini 2.5 Flash Lite via Requesty EU for GDPR compliance.
 """
 
+import math
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from enum import Enum
@@ -29,10 +30,11 @@ class APIEndpoint:
     api_key_env_var: str  # Environment variable name for API key
     headers_template: Dict[str, str] = field(default_factory=dict)
     notes: str = ""
-    max_payload_mb: float = 0  # Max request payload size (0 = no limit). Uses JPEG compression if exceeded.
+    max_payload_mb: float = 0  # Max request payload size (0 = no limit). Images are fitted below it (core/encoding.py).
     max_parallel_requests: int = 5  # Max concurrent requests to this endpoint
     image_format: str = "png"  # Image format: png, webp_lossless, webp_lossy, jpeg
     image_quality: int = 90  # Quality for lossy formats (1-100)
+    prompt_cache_hints: bool = False  # Mark the shared prompt prefix with cache_control breakpoints
 
     def get_chat_url(self) -> str:
         """Get the chat completions URL"""
@@ -53,6 +55,7 @@ ENDPOINTS = {
         notes="EU-based endpoint for GDPR compliance",
         max_parallel_requests=5,  # 5 EU regions for quota pooling
         image_format="png",  # PNG for Gemini (best compatibility)
+        prompt_cache_hints=True,  # Requesty forwards cache_control to providers that support it
     ),
     "nebius_eu": APIEndpoint(
         name="Nebius EU",
@@ -63,7 +66,7 @@ ENDPOINTS = {
             "Authorization": "Bearer {api_key}",
             "Content-Type": "application/json",
         },
-        notes="EU-based endpoint for GDPR compliance, supports Gemma 3 27B and Qwen VL 72B",
+        notes="EU-based endpoint for GDPR compliance, supports Gemma 3 27B and Qwen VL 72B. Prefix caching is automatic (reported as cached_tokens).",
         max_parallel_requests=40,  # Nebius supports high parallelism (tested 40)
         image_format="webp_lossy",  # WEBP lossy: fast encoding, small files
         image_quality=75,
@@ -139,22 +142,71 @@ class ModelParameters:
         }
 
 
+@dataclass
+class ImageTokenCost:
+    """
+    How a vision model bills an image, in input tokens.
+
+    method:
+        "tiles"   - split into tile_px x tile_px tiles, tokens_per_tile each;
+                    images with both sides <= small_image_px are one tile (Gemini)
+        "patches" - resized to multiples of patch_px, one token per patch plus
+                    row_break_tokens per patch row; above max_pixels the model
+                    downscales first (Qwen-VL, GLM-V)
+        "fixed"   - every image is resized by the model to fixed_tokens (Gemma 3)
+    """
+    method: str = "fixed"
+    tile_px: int = 768
+    tokens_per_tile: int = 258
+    small_image_px: int = 0
+    patch_px: int = 28
+    row_break_tokens: int = 0
+    max_pixels: int = 0               # 0 = no provider-side downscale
+    fixed_tokens: int = 1000
+    extra_tokens: int = 0             # Image start/end markers
+
+    def tokens(self, width: int, height: int) -> int:
+        """Input tokens for an image of width x height pixels"""
+        if self.method == "tiles":
+            if self.small_image_px and width <= self.small_image_px and height <= self.small_image_px:
+                tiles = 1
+            else:
+                tiles = math.ceil(width / self.tile_px) * math.ceil(height / self.tile_px)
+            return tiles * self.tokens_per_tile + self.extra_tokens
+
+        if self.method == "patches":
+            if self.max_pixels and width * height > self.max_pixels:
+                scale = math.sqrt(self.max_pixels / (width * height))
+                width, height = int(width * scale), int(height * scale)
+            cols = max(1, round(width / self.patch_px))
+            rows = max(1, round(height / self.patch_px))
+            return cols * rows + rows * self.row_break_tokens + self.extra_tokens
+
+        return self.fixed_tokens + self.extra_tokens
+
+
 @dataclass
 class TokenPricing:
     """Token-based pricing for a model (costs per 1M tokens)"""
     input_cost_per_1m: float = 0.0    # Cost per 1M input tokens
     output_cost_per_1m: float = 0.0   # Cost per 1M output tokens
+    cached_input_cost_per_1m: Optional[float] = None  # Cost per 1M cached input tokens (None = input rate)
 
-    # For vision models, image tokens are often calculated differently
-    # These are estimates per image/page at typical DPI
-    image_tokens_estimate: int = 1000  # Estimated tokens per image
-
-    def calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
+    def calculate_cost(self, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0) -> float:
         """Calculate total cost from token counts"""
-        input_cost = (input_tokens / 1_000_000) * self.input_cost_per_1m
+        input_cost = self.calculate_input_cost(input_tokens, cached_input_tokens)
         output_cost = (output_tokens / 1_000_000) * self.output_cost_per_1m
         return input_cost + output_cost
 
+    def calculate_input_cost(self, input_tokens: int, cached_input_tokens: int = 0) -> float:
+        """Input cost, billing cached prompt-prefix tokens at the cached rate"""
+        cached = min(cached_input_tokens, input_tokens)
+        cached_rate = self.input_cost_per_1m if self.cached_input_cost_per_1m is None else self.cached_input_cost_per_1m
+        return (
+            ((input_tokens - cached) / 1_000_000) * self.input_cost_per_1m
+            + (cached / 1_000_000) * cached_rate
+        )
+
 
 @dataclass
 class TokenUsage:
@@ -163,6 +215,7 @@ class TokenUsage:
     output_tokens: int = 0
     total_tokens: int = 0
     cost: float = 0.0
+    cached_input_tokens: int = 0  # Input tokens served from the provider's prompt cache
 
     # Breakdown
     input_cost: float = 0.0
@@ -179,12 +232,18 @@ class TokenUsage:
             output_tokens=self.output_tokens + other.output_tokens,
             total_tokens=self.total_tokens + other.total_tokens,
             cost=self.cost + other.cost,
+            cached_input_tokens=self.cached_input_tokens + other.cached_input_tokens,
             input_cost=self.input_cost + other.input_cost,
             output_cost=self.output_cost + other.output_cost,
             model_id=self.model_id or other.model_id,
             endpoint=self.endpoint or other.endpoint,
         )
 
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of input tokens served from the prompt cache (0.0 - 1.0)"""
+        return self.cached_input_tokens / self.input_tokens if self.input_tokens else 0.0
+
 
 # =============================================================================
 # MODEL CONFIGURATIONS
@@ -207,6 +266,9 @@ class AIModelConfig:
     # Pricing (per 1M tokens)
     pricing: TokenPricing = field(default_factory=TokenPricing)
 
+    # How page images are billed in input tokens
+    image_tokens: ImageTokenCost = field(default_factory=ImageTokenCost)
+
     # Capabilities & metrics
     accuracy: int = 0                 # 0-100 percentage
     context_window: str = ""          # e.g., "1M+ tokens"
@@ -232,15 +294,27 @@ class AIModelConfig:
         """Check if this model uses an EU endpoint"""
         return self.get_endpoint().region == EndpointRegion.EU
 
-    def calculate_cost(self, input_tokens: int, output_tokens: int) -> TokenUsage:
+    def estimate_input_tokens(self, image_width: int, image_height: int, prompt_chars: int = 0) -> int:
+        """
+        Predict the input tokens of a page request before sending it.
+
+        Args:
+            image_width: Page image width in pixels
+            image_height: Page image height in pixels
+            prompt_chars: Length of system prompt + instructions (~4 chars per token)
+        """
+        return self.image_tokens.tokens(image_width, image_height) + math.ceil(prompt_chars / 4)
+
+    def calculate_cost(self, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0) -> TokenUsage:
         """Calculate cost and return TokenUsage from token counts"""
-        input_cost = (input_tokens / 1_000_000) * self.pricing.input_cost_per_1m
+        input_cost = self.pricing.calculate_input_cost(input_tokens, cached_input_tokens)
         output_cost = (output_tokens / 1_000_000) * self.pricing.output_cost_per_1m
         return TokenUsage(
             input_tokens=input_tokens,
             output_tokens=output_tokens,
             total_tokens=input_tokens + output_tokens,
             cost=input_cost + output_cost,
+            cached_input_tokens=cached_input_tokens,
             input_cost=input_cost,
             output_cost=output_cost,
             model_id=self.model_id,
@@ -262,8 +336,9 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.10,     # $0.10 per 1M input tokens
             output_cost_per_1m=0.40,    # $0.40 per 1M output tokens
-            image_tokens_estimate=1000,  # ~1000 tokens per page image
+            cached_input_cost_per_1m=0.025,  # Cached prompt prefix billed at 25%
         ),
+        image_tokens=ImageTokenCost(method="tiles", tile_px=768, tokens_per_tile=258, small_image_px=384),  # 258 tokens per 768px tile
         accuracy=100,
         context_window="1M tokens",
         notes="100% accuracy, GDPR compliant (EU via Vertex, region pooling)"
@@ -277,8 +352,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.10,     # $0.10 per 1M input tokens (Nebius pricing)
             output_cost_per_1m=0.30,    # $0.30 per 1M output tokens (Nebius pricing)
-            image_tokens_estimate=1000,  # ~1000 tokens per page image
         ),
+        image_tokens=ImageTokenCost(method="fixed", fixed_tokens=256, extra_tokens=2),  # Resized to 896px by the model
         accuracy=85,  # Based on previous testing showing OCR errors
         context_window="128K tokens",  # Gemma 3 27B context window
         supports_vision=True,
@@ -296,8 +371,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.13,     # $0.13 per 1M input tokens (Nebius pricing)
             output_cost_per_1m=0.40,    # $0.40 per 1M output tokens (Nebius pricing)
-            image_tokens_estimate=1500,  # ~1500 tokens per page image (VL models use more)
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=28, max_pixels=12_845_056, extra_tokens=2),  # 14px patches merged 2x2
         accuracy=0,  # Unknown - needs testing
         context_window="128K tokens",  # Qwen2.5 VL context window
         supports_vision=True,
@@ -317,8 +392,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.06,     # $0.06 per 1M input tokens (HuggingFace/Novita pricing)
             output_cost_per_1m=0.40,    # $0.40 per 1M output tokens (HuggingFace/Novita pricing)
-            image_tokens_estimate=2000,  # ~2000 tokens per page image
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=32, max_pixels=16_777_216, extra_tokens=2),  # 16px patches merged 2x2
         accuracy=0,  # Needs testing - initial test shows good radio button detection
         context_window="131K tokens",  # Qwen3 VL context window
         supports_vision=True,
@@ -336,8 +411,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.0,      # Free tier / pricing TBD
             output_cost_per_1m=0.0,     # Free tier / pricing TBD
-            image_tokens_estimate=2800,  # ~2800 tokens per page image based on test
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=28, extra_tokens=2),
         accuracy=0,  # Needs testing - initial test shows excellent form extraction
         context_window="65K tokens",  # GLM-4.6V context window
         supports_vision=True,
@@ -355,8 +430,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.0,
             output_cost_per_1m=0.0,
-            image_tokens_estimate=2800,
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=28, extra_tokens=2),
         accuracy=0,
         context_window="65K tokens",
         supports_vision=True,
@@ -374,8 +449,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=540.0,  # $0.54/M
             output_cost_per_1m=810.0,  # $0.81/M
-            image_tokens_estimate=2800,
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=28, extra_tokens=2),
         accuracy=0,
         context_window="128K tokens",
         supports_vision=True,
@@ -393,8 +468,8 @@ MODEL_CONFIGS: Dict[str, AIModelConfig] = {
         pricing=TokenPricing(
             input_cost_per_1m=0.60,  # Paid model pricing
             output_cost_per_1m=0.11,
-            image_tokens_estimate=2800,
         ),
+        image_tokens=ImageTokenCost(method="patches", patch_px=28, extra_tokens=2),
         accuracy=0,
         context_window="128K tokens",
         supports_vision=True,
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import fitz
+
+from pdfpower_extractor.core import analyzer as analyzer_module
+from pdfpower_extractor.core.analyzer import PDFAnalyzer, page_ink_coverage
+
+
+def create_pdf(path: Path) -> None:
+    """Page 1 text, page 2 blank, page 3 scanned (image only)."""
+    src = fitz.open()
+    src_page = src.new_page()
+    src_page.insert_text((72, 100), "Scanned applicant form " * 4, fontsize=14)
+    scan = src_page.get_pixmap(dpi=100, colorspace=fitz.csGRAY)
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Some printed text")
+    doc.new_page()
+    doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), pixmap=scan)
+    doc.save(path)
+
+
+def test_scanned_page_is_not_empty(tmp_path):
+    pdf_path = tmp_path / "mixed.pdf"
+    create_pdf(pdf_path)
+
+    summary = PDFAnalyzer(str(pdf_path)).analyze()
+
+    assert summary["text_pages"] == [1]
+    assert summary["empty_pages"] == [2]
+    assert summary["scanned_pages"] == [3]
+
+
+def test_ink_coverage_without_numpy(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "mixed.pdf"
+    create_pdf(pdf_path)
+
+    with fitz.open(pdf_path) as doc:
+        with_numpy = [page_ink_coverage(page) for page in doc]
+        monkeypatch.setattr(analyzer_module, "NUMPY_AVAILABLE", False)
+        without_numpy = [page_ink_coverage(page) for page in doc]
+
+    assert with_numpy == without_numpy
+    assert without_numpy[1] == 0.0
+
+
+def test_sharded_analysis_matches_streaming(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "mixed.pdf"
+    create_pdf(pdf_path)
+
+    streamed = [(c.page_num, c.kind) for c in PDFAnalyzer(str(pdf_path)).iter_pages()]
+
+    monkeypatch.setattr(PDFAnalyzer, "SHARD_SIZE", 1)
+    sharded_analyzer = PDFAnalyzer(str(pdf_path))
+    sharded = [(c.page_num, c.kind) for c in sharded_analyzer.iter_pages(workers=2)]
+
+    assert sharded == streamed == [(1, "text"), (2, "empty"), (3, "scanned")]
+    # analyze() reuses the streamed classifications
+    assert sharded_analyzer.analyze()["scanned_pages"] == [3]
+
+
+def test_sparse_text_page_is_not_empty(tmp_path):
+    pdf_path = tmp_path / "sparse.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 800), "Signed,", fontsize=8, color=(0.8, 0.8, 0.8))
+    doc.save(pdf_path)
+
+    with fitz.open(pdf_path) as reopened:
+        assert page_ink_coverage(reopened[0]) < analyzer_module.BLANK_INK_COVERAGE
+
+    assert PDFAnalyzer(str(pdf_path)).analyze()["text_pages"] == [1]
+
+
+def test_whitespace_text_layer_page_is_empty(tmp_path):
+    pdf_path = tmp_path / "blank_ocr.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "   \n  ")  # font resource and text object, no characters
+    doc.save(pdf_path)
+
+    assert PDFAnalyzer(str(pdf_path)).analyze()["empty_pages"] == [1]
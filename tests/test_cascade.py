@@ -0,0 +1,149 @@
+import threading
+
+import fitz
+
+from pdfpower_extractor.core.cascade import count_selected_options, detect_option_states
+from pdfpower_extractor.core.config import CascadeTier, ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path, pages, checked_page=None):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Question {number}: answer")
+        if number == checked_page:
+            widget = fitz.Widget()
+            widget.field_type = fitz.PDF_WIDGET_TYPE_CHECKBOX
+            widget.field_name = f"agree_{number}"
+            widget.rect = fitz.Rect(72, 100, 86, 114)
+            widget.field_value = True
+            page.add_widget(widget)
+    doc.save(path)
+
+
+def make_processor(pdf_path, bad_pages=(), cascade=("gemma_3_27b", "gemini_flash"), **options):
+    config = ExtractionConfig(
+        page_schedule="fifo",
+        reorder_buffer_pages=1,
+        model_cascade=[CascadeTier(model) for model in cascade],
+        **options,
+    )
+    config.validation.reextract_invalid_pages = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    calls = []
+    lock = threading.Lock()
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        model = kwargs["model_config"].model_id
+        with lock:
+            calls.append((page_num, model))
+        if model == "gemma_3_27b" and page_num in bad_pages:
+            content = "I cannot read this page, the scan is too blurry to make out the answers."
+        else:
+            content = f"### Section {page_num}\n- Answer: {page_num}\n"
+        return {
+            "content": content,
+            "token_usage": TokenUsage(input_tokens=1000, output_tokens=100, cost=0.0001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    return processor, calls
+
+
+def test_cheap_tier_first_and_escalation_on_validation(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+    processor, calls = make_processor(pdf_path, bad_pages={3})
+
+    output = processor.process(output_path=str(tmp_path / "out.md"))
+
+    assert sorted(calls) == [
+        (1, "gemma_3_27b"), (2, "gemma_3_27b"), (3, "gemini_flash"), (3, "gemma_3_27b"), (4, "gemma_3_27b"),
+    ]
+    report = processor.cascade_report
+    assert report.pages_by_tier() == {"gemma_3_27b": [1, 2, 4], "gemini_flash": [3]}
+    assert report.escalations == {3: ["gemma_3_27b: HALLUCINATION_DETECTED"]}
+    assert "I cannot" not in (tmp_path / "out.md").read_text(encoding="utf-8")
+    # Both attempts at page 3 are paid for
+    assert processor.page_token_usage[3].input_tokens == 2000
+    assert 0 < report.cost < report.top_tier_cost and report.saved > 0
+    assert "Model Cascade:" in output and "- gemini_flash: 3" in output
+
+
+def test_escalation_on_checkbox_mismatch(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2, checked_page=2)
+    processor, calls = make_processor(pdf_path)
+
+    pages = {page.page_num: page for page in processor.process_stream(order="completion")}
+
+    # The output never marks the checked box, so page 2 goes up a tier; the top tier is final
+    assert sorted(calls) == [(1, "gemma_3_27b"), (2, "gemini_flash"), (2, "gemma_3_27b")]
+    assert processor.cascade_report.escalations == {2: ["gemma_3_27b: CHECKBOX_MISMATCH"]}
+    assert pages[1].model == "gemma_3_27b" and pages[2].model == "gemini_flash"
+
+
+def test_option_states(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2, checked_page=2)
+    doc = fitz.open(pdf_path)
+
+    assert detect_option_states(doc[0]) is None
+    states = detect_option_states(doc[1])
+    assert (states.selected, states.total) == (1, 1)
+    assert count_selected_options("- Agree: (x) Yes\n- Newsletter: ( ) No\n- Terms: [X]") == 2
+
+
+def test_cached_pages_are_keyed_by_the_model_that_produced_them(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=3)
+    cache_dir = str(tmp_path / "cache")
+    processor, _ = make_processor(pdf_path, bad_pages={3}, cache_dir=cache_dir)
+    processor.process()
+
+    # Without the cascade, the cheap model must not reuse the escalated page (or any other)
+    single, calls = make_processor(pdf_path, cascade=(), model_config_id="gemma_3_27b", cache_dir=cache_dir)
+    single.ai_extractor.extract_page = lambda pdf_path, page_num, **kwargs: calls.append(page_num) or {
+        "content": f"### Section {page_num}\n", "token_usage": TokenUsage(),
+    }
+    single.process()
+    assert sorted(calls) == [1, 2, 3] and single.reused_pages == []
+
+    again, calls = make_processor(pdf_path, bad_pages={3}, cache_dir=cache_dir)
+    pages = {page.page_num: page for page in again.process_stream()}
+    assert calls == [] and again.reused_pages == [1, 2, 3]
+    assert pages[3].model == "gemini_flash" and pages[1].model == "gemma_3_27b"
+
+
+def test_escalates_without_validate_output(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2)
+    processor, calls = make_processor(pdf_path, bad_pages={2})
+    processor.config.validation.validate_output = False
+
+    processor.process()
+
+    assert sorted(calls) == [(1, "gemma_3_27b"), (2, "gemini_flash"), (2, "gemma_3_27b")]
+    assert processor.cascade_report.escalations == {2: ["gemma_3_27b: HALLUCINATION_DETECTED"]}
+
+
+def test_failed_escalation_keeps_the_lower_tier(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2)
+    processor, calls = make_processor(pdf_path, bad_pages={2})
+    cheap = processor.ai_extractor.extract_page
+
+    def failing_top_tier(pdf_path, page_num, **kwargs):
+        if kwargs["model_config"].model_id == "gemini_flash":
+            raise RuntimeError("upstream unavailable")
+        return cheap(pdf_path, page_num, **kwargs)
+
+    processor.ai_extractor.extract_page = failing_top_tier
+    pages = {page.page_num: page for page in processor.process_stream()}
+
+    assert pages[2].success and pages[2].model == "gemma_3_27b"
+    report = processor.cascade_report
+    assert report.escalations == {}
+    assert report.pages_by_tier() == {"gemma_3_27b": [1, 2], "gemini_flash": []}
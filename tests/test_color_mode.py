@@ -0,0 +1,63 @@
+import fitz
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.analyzer import page_color_mode
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.encoding import PayloadEncoder
+from pdfpower_extractor.core.extractor import AIExtractor, to_bilevel
+from pdfpower_extractor.models.config import get_model_config
+
+
+def add_image_page(doc, rgb):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 40), False)
+    pix.set_rect(pix.irect, rgb)
+    doc.new_page().insert_image(fitz.Rect(50, 50, 300, 300), pixmap=pix)
+
+
+def test_color_mode_follows_page_colors():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Name:")
+    page.draw_rect(fitz.Rect(120, 60, 130, 70))
+    doc.new_page().draw_rect(fitz.Rect(40, 40, 500, 80), color=None, fill=(0.85, 0.85, 0.85))
+    doc.new_page().insert_text((72, 72), "Required", color=(0.8, 0, 0))
+    add_image_page(doc, (120, 120, 120))
+    add_image_page(doc, (200, 40, 40))
+
+    # RGB images are checked for actual color
+    assert [page_color_mode(page) for page in doc] == ["bw", "gray", "rgb", "gray", "rgb"]
+
+
+def test_bilevel_render_is_sent_as_png():
+    gray = Image.new("L", (200, 100), 255)
+    gray.paste(90, (20, 20, 180, 40))
+    bilevel = to_bilevel(gray)
+    assert bilevel.mode == "1"
+    rendition = PayloadEncoder(bilevel, "webp_lossy", 75).fit()
+    assert rendition.format == "PNG"
+
+
+def test_extractor_renders_bw_page_as_1bit(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "bw.pdf"
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Plain black form text")
+    doc.save(pdf_path)
+
+    calls = {}
+
+    def fake_convert(path, first_page, last_page, dpi, grayscale=False):
+        calls["grayscale"] = grayscale
+        return [Image.new("L" if grayscale else "RGB", (100, 140), 255)]
+
+    monkeypatch.setattr(extractor_module, "convert_from_path", fake_convert)
+    extractor = AIExtractor(api_key="test", config=ExtractionConfig(), model_config=get_model_config("gemini_flash"))
+    extractor._make_request_with_retry = lambda *args: {
+        "choices": [{"message": {"content": "### Form"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 10},
+    }
+    result = extractor.extract_page(str(pdf_path), 1)
+
+    assert calls["grayscale"] is True
+    assert result["image_encoding"]["color_mode"] == "bw"
+    assert result["image_encoding"]["format"] == "PNG"
@@ -0,0 +1,60 @@
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor, merge_continuation
+from pdfpower_extractor.core.prompts import CONTINUATION_PROMPT
+from pdfpower_extractor.models.config import get_model_config
+
+
+def test_merge_continuation_drops_repeated_tail():
+    partial = "## Section A\n- Name: `Jan Jansen`\n- Address: `Main"
+    assert merge_continuation(partial, "street 1`\n") == partial + "street 1`\n"
+    assert merge_continuation(partial, "- Address: `Mainstreet 1`\n") == (
+        "## Section A\n- Name: `Jan Jansen`\n- Address: `Mainstreet 1`\n"
+    )
+    # Short coincidental overlaps are legitimate text
+    assert merge_continuation("- Yes", "s, twice") == "- Yess, twice"
+
+
+def test_continuation_carries_partial_output_and_keeps_prefix(monkeypatch):
+    monkeypatch.setattr(
+        extractor_module,
+        "convert_from_path",
+        lambda *args, **kwargs: [Image.new("RGB", (64, 64), "white")],
+    )
+    extractor = AIExtractor(
+        api_key="test",
+        config=ExtractionConfig(model_aware_sizing=False, color_mode="rgb"),
+        model_config=get_model_config("gemini_flash"),
+    )
+    extractor.config.llm.max_continuations = 1
+    requests_sent = []
+    responses = [
+        ("## Part 1\n- A: `1`\n- B: `", "length"),
+        ("2`\n- C: `", "length"),
+        ("3`\n", "stop"),
+    ]
+
+    def fake_request(api_url, headers, data, cfg):
+        requests_sent.append([dict(m) for m in data["messages"]])
+        content, finish_reason = responses.pop(0)
+        return {
+            "choices": [{"message": {"content": content}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 500, "completion_tokens": 100},
+        }
+
+    extractor._make_request_with_retry = fake_request
+    result = extractor.extract_page("unused.pdf", 3, max_tokens=600)
+
+    first, second = requests_sent
+    # Original conversation (incl. image) is resent unchanged, then the partial output
+    assert second[:len(first)] == first
+    assert second[-2] == {"role": "assistant", "content": "## Part 1\n- A: `1`\n- B: `"}
+    assert second[-1]["content"][0]["text"] == CONTINUATION_PROMPT
+
+    # Only one continuation allowed: the page stays truncated and is reported as such
+    assert result["truncations"] == 2
+    assert result["continuations"] == 1
+    assert "- B: `2`\n- C: `" in result["content"]
+    assert result["token_usage"].output_tokens == 200
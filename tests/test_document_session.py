@@ -0,0 +1,135 @@
+import builtins
+import hashlib
+import mmap
+import threading
+
+import fitz
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.core.session import DocumentSession
+
+
+def create_pdf(path, pages=3):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Question {number}: answer")
+        page.draw_rect(fitz.Rect(72, 90, 82, 100))
+    doc.save(path)
+
+
+def test_session_reads_file_once_and_caches_page_info(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path)
+
+    with DocumentSession(str(pdf_path)) as session:
+        assert session.md5() == hashlib.md5(pdf_path.read_bytes()).hexdigest()
+        info = session.page_info(2)
+        assert "Question 2" in info.text and info.drawing_count == 1
+        assert session.page_info(2) is info
+
+        handles = {}
+
+        def grab(name):
+            handles[name] = session.document()
+
+        workers = [threading.Thread(target=grab, args=(n,)) for n in ("a", "b")]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert handles["a"] is not handles["b"]
+        assert session.document() is session.document()
+
+        image = session.render(1, dpi=72, colorspace="gray", clip=(0, 0, 300, 200))
+        assert (image.mode, image.size) == ("L", (300, 200))
+        assert session.stats()["file_opens"] == 1
+        assert session.stats()["bytes_read"] == pdf_path.stat().st_size
+
+
+def test_session_serves_a_memory_mapped_pdf(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2)
+
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with DocumentSession(mapped) as session:
+            assert session.name == "document.pdf" and session.pdf_path is None
+            assert session.page_count == 2
+            assert "Question 2" in session.page_info(2).text
+            assert session.md5() == hashlib.md5(pdf_path.read_bytes()).hexdigest()
+            assert session.stats()["file_opens"] == 0
+
+
+def test_process_opens_the_pdf_once(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path)
+
+    opens = []
+    real_open, real_fitz_open = builtins.open, fitz.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == str(pdf_path):
+            opens.append("open")
+        return real_open(file, *args, **kwargs)
+
+    def counting_fitz_open(filename=None, *args, **kwargs):
+        if filename is not None:
+            opens.append("fitz")
+        return real_fitz_open(filename, *args, **kwargs)
+
+    def no_poppler(*args, **kwargs):
+        raise AssertionError("pages must be rendered from the session")
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    monkeypatch.setattr(fitz, "open", counting_fitz_open)
+    monkeypatch.setattr(extractor_module, "convert_from_path", no_poppler)
+
+    config = ExtractionConfig(crop_margins=True)
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    processor.ai_extractor._make_request_with_retry = lambda *args: {
+        "choices": [{"message": {"content": "### Question\n- [x] answer"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 20},
+    }
+    output = processor.process()
+
+    assert "PAGE 3 OF 3" in output
+    assert opens == ["open"]
+    assert processor.session.stats()["bytes_read"] == pdf_path.stat().st_size
+    assert processor.page_encodings[1]["crop_box"] is not None
+
+
+def test_in_memory_pdf_never_touches_the_disk(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "upload.pdf"
+    create_pdf(pdf_path, pages=2)
+    upload = memoryview(bytearray(pdf_path.read_bytes()))
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("in-memory PDFs must not be read from disk")
+
+    real_fitz_open = fitz.open
+
+    def stream_only(filename=None, *args, **kwargs):
+        if filename is not None:
+            no_disk()
+        return real_fitz_open(filename, *args, **kwargs)
+
+    config = ExtractionConfig(cache_dir=None)
+    config.validation.validate_output = False
+    processor = PDFProcessor(upload, config=config, name="upload.pdf")
+    processor.ai_extractor._make_request_with_retry = lambda *args: {
+        "choices": [{"message": {"content": "### Question\n- [x] answer"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 900, "completion_tokens": 20},
+    }
+
+    monkeypatch.setattr(builtins, "open", no_disk)
+    monkeypatch.setattr(fitz, "open", stream_only)
+    monkeypatch.setattr(extractor_module, "convert_from_path", no_disk)
+    output = processor.process()
+
+    assert "Source PDF: upload.pdf" in output
+    assert "PAGE 2 OF 2" in output
+    assert processor.calculate_md5() == hashlib.md5(upload).hexdigest()
+    assert processor.session.stats()["file_opens"] == 0
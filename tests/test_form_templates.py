@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import fitz
+
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.core.templates import PageTemplate
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_form(path: Path, name: str, married: bool) -> None:
+    """Create a one-page AcroForm with a text field and a checkbox."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 60), "1.1 Naam")
+    page.insert_text((90, 110), "Getrouwd")
+    text = fitz.Widget()
+    text.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+    text.field_name = "naam"
+    text.rect = fitz.Rect(150, 50, 300, 70)
+    text.field_value = name
+    page.add_widget(text)
+    box = fitz.Widget()
+    box.field_type = fitz.PDF_WIDGET_TYPE_CHECKBOX
+    box.field_name = "getrouwd"
+    box.rect = fitz.Rect(72, 100, 84, 112)
+    page.add_widget(box)
+    box.field_value = married
+    box.update()
+    doc.save(path)
+
+
+def run(pdf_path: Path, template_dir: Path, calls: list) -> PDFProcessor:
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        calls.append(page_num)
+        return {
+            "content": "- **FORM_ID**: `B07001`\n### 1.1 Naam\n`Jan`\n### Burgerlijke staat\n- [x] Getrouwd\n",
+            "token_usage": TokenUsage(input_tokens=1000, output_tokens=50, total_tokens=1050),
+        }
+
+    config = ExtractionConfig(template_dir=str(template_dir))
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    processor.ai_extractor.extract_page = fake_extract_page
+    processor.output = processor.process()
+    return processor
+
+
+def test_second_instance_is_filled_from_template(tmp_path):
+    template_dir = tmp_path / "templates"
+    first_pdf = tmp_path / "first.pdf"
+    second_pdf = tmp_path / "second.pdf"
+    create_form(first_pdf, "Jan", married=True)
+    create_form(second_pdf, "Piet", married=False)
+
+    calls = []
+    first = run(first_pdf, template_dir, calls)
+    assert calls == [1]
+    assert first.template_pages == []
+
+    calls.clear()
+    second = run(second_pdf, template_dir, calls)
+    assert calls == []
+    assert second.template_pages == [1]
+    assert "`Piet`" in second.output
+    assert "- [ ] Getrouwd" in second.output
+    assert "[FORM_ID: B07001]" in second.output
+    assert second.total_token_usage.input_tokens == 0
+
+
+def test_mismatching_extraction_is_not_learned(tmp_path):
+    template_dir = tmp_path / "templates"
+    pdf_path = tmp_path / "form.pdf"
+    # Widget says "Klaas", model output says "Jan": mapping cannot be trusted
+    create_form(pdf_path, "Klaas", married=True)
+
+    calls = []
+    run(pdf_path, template_dir, calls)
+    run(pdf_path, template_dir, calls)
+    assert calls == [1, 1]
+
+
+def test_damaged_template_is_a_miss(tmp_path):
+    template_dir = tmp_path / "templates"
+    first_pdf = tmp_path / "first.pdf"
+    second_pdf = tmp_path / "second.pdf"
+    create_form(first_pdf, "Jan", married=True)
+    create_form(second_pdf, "Jan", married=True)
+
+    calls = []
+    run(first_pdf, template_dir, calls)
+    (template_path,) = template_dir.glob("*.json")
+    template_path.write_bytes(template_path.read_bytes().replace(b"Getrouwd", b"Gescheiden"))
+
+    calls.clear()
+    second = run(second_pdf, template_dir, calls)
+    assert calls == [1] and second.template_pages == []
+    assert "Gescheiden" not in second.output
+
+    # The damaged template is replaced by the one learned from this extraction
+    template_path.write_bytes(template_path.read_bytes()[:40])
+    run(second_pdf, template_dir, calls)
+    calls.clear()
+    third = run(second_pdf, template_dir, calls)
+    assert calls == [] and third.template_pages == [1]
+
+
+def two_column_widgets(path: Path, first: str, last: str, married: bool):
+    """Voornaam (left) and achternaam (right) on one row, plus a checkbox."""
+    doc = fitz.open()
+    page = doc.new_page()
+    for name, x, value in (("voornaam", 72, first), ("achternaam", 320, last)):
+        widget = fitz.Widget()
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.field_name = name
+        widget.rect = fitz.Rect(x, 50, x + 150, 70)
+        widget.field_value = value
+        page.add_widget(widget)
+    box = fitz.Widget()
+    box.field_type = fitz.PDF_WIDGET_TYPE_CHECKBOX
+    box.field_name = "getrouwd"
+    box.rect = fitz.Rect(72, 100, 84, 112)
+    page.add_widget(box)
+    box.field_value = married
+    box.update()
+    doc.save(path)
+    return list(fitz.open(path)[0].widgets())
+
+
+def test_blank_or_ambiguous_instance_is_not_learned(tmp_path):
+    # The model reads the right column first: the reverse of the widget order
+    swapped = "### Naam\n- Achternaam: `{last}`\n- Voornaam: `{first}`\n- [{tick}] Getrouwd"
+
+    blank = two_column_widgets(tmp_path / "blank.pdf", "", "", married=False)
+    assert PageTemplate.learn("layout", swapped.format(first="", last="", tick=" "), blank) is None
+
+    same = two_column_widgets(tmp_path / "same.pdf", "Jan", "Jan", married=True)
+    assert PageTemplate.learn("layout", swapped.format(first="Jan", last="Jan", tick="x"), same) is None
+
+    filled = two_column_widgets(tmp_path / "filled.pdf", "Jan", "Jansen", married=True)
+    assert PageTemplate.learn("layout", swapped.format(first="Jan", last="Jansen", tick="x"), filled) is None
+    in_order = "### Naam\n- Voornaam: `Jan`\n- Achternaam: `Jansen`\n- [x] Getrouwd"
+    assert PageTemplate.learn("layout", in_order, filled) is not None
@@ -0,0 +1,65 @@
+import fitz
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor
+from pdfpower_extractor.core.prompts import get_system_prompt, get_vision_prompt
+from pdfpower_extractor.core.sizing import choose_render_size
+from pdfpower_extractor.models.config import ImageTokenCost, get_model_config
+
+A4 = (595.0, 842.0)
+
+
+def test_tile_cost_steps_at_tile_boundaries():
+    tiles = ImageTokenCost(method="tiles", tile_px=768, tokens_per_tile=258, small_image_px=384)
+    assert tiles.tokens(300, 300) == 258
+    assert tiles.tokens(768, 768) == 258
+    assert tiles.tokens(769, 768) == 516
+    assert tiles.tokens(1240, 1754) == 6 * 258
+
+
+def test_patch_cost_and_provider_downscale():
+    patches = ImageTokenCost(method="patches", patch_px=28, max_pixels=28 * 28 * 100)
+    assert patches.tokens(280, 280) == 100
+    assert patches.tokens(2800, 2800) == 100
+
+
+def test_gemini_a4_drops_a_tile_row():
+    size = choose_render_size(*A4, get_model_config("gemini_flash").image_tokens)
+    assert size.dpi == 131
+    assert (size.width, size.height) == (1083, 1532)
+    assert size.image_tokens == 4 * 258
+
+
+def test_fixed_cost_model_keeps_default_dpi():
+    size = choose_render_size(*A4, get_model_config("gemma_3_27b").image_tokens)
+    assert size.dpi == 150
+
+
+def test_extractor_renders_at_chosen_dpi_and_predicts_tokens(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "a4.pdf"
+    doc = fitz.open()
+    doc.new_page(width=A4[0], height=A4[1]).insert_text((72, 72), "Form")
+    doc.save(pdf_path)
+
+    rendered = {}
+
+    def fake_convert(path, first_page, last_page, dpi, **kwargs):
+        rendered["dpi"] = dpi
+        return [Image.new("RGB", (round(A4[0] * dpi / 72), round(A4[1] * dpi / 72)), "white")]
+
+    monkeypatch.setattr(extractor_module, "convert_from_path", fake_convert)
+    mc = get_model_config("gemini_flash")
+    extractor = AIExtractor(api_key="test", config=ExtractionConfig(model_aware_sizing=True), model_config=mc)
+    extractor._make_request_with_retry = lambda *args: {
+        "choices": [{"message": {"content": "### Form"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 2100, "completion_tokens": 10},
+    }
+    result = extractor.extract_page(str(pdf_path), 1)
+
+    assert rendered["dpi"] == 131
+    assert result["image_encoding"]["dpi"] == 131
+    prompt_chars = len(get_system_prompt(mc.model_id_at_endpoint)) + len(get_vision_prompt(mc.model_id_at_endpoint))
+    assert result["predicted_input_tokens"] == mc.estimate_input_tokens(1083, 1532, prompt_chars)
+    assert result["predicted_input_tokens"] > 4 * 258
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import fitz
+
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path: Path, texts) -> None:
+    """Create a PDF with one page per text."""
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(path)
+
+
+def run_with_cache(pdf_path: Path, cache_dir: Path, calls: list) -> PDFProcessor:
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        calls.append(page_num)
+        return {
+            "content": f"### Page content {page_num}\nBody\n",
+            "token_usage": TokenUsage(input_tokens=10, output_tokens=5, total_tokens=15, cost=0.01),
+        }
+
+    config = ExtractionConfig(cache_dir=str(cache_dir))
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    processor.ai_extractor.extract_page = fake_extract_page
+    processor.output = processor.process()
+    return processor
+
+
+def test_revised_pdf_only_extracts_changed_pages(tmp_path):
+    cache_dir = tmp_path / "cache"
+    original = tmp_path / "packet_v1.pdf"
+    revised = tmp_path / "packet_v2.pdf"
+    create_pdf(original, ["Page one", "Page two", "Page three"])
+    create_pdf(revised, ["Page one", "Page two (corrected)", "Page three"])
+
+    calls = []
+    first = run_with_cache(original, cache_dir, calls)
+    assert sorted(calls) == [1, 2, 3]
+    assert first.reused_pages == []
+
+    calls.clear()
+    second = run_with_cache(revised, cache_dir, calls)
+    assert calls == [2]
+    assert second.reused_pages == [1, 3]
+    assert second.extracted_pages == [2]
+    assert "- Reused pages: 1, 3" in second.output
+    assert "- Re-extracted pages: 2" in second.output
+    assert second.total_token_usage.input_tokens == 10
+
+
+def test_refresh_cache_ignores_cached_pages(tmp_path):
+    cache_dir = tmp_path / "cache"
+    pdf_path = tmp_path / "packet.pdf"
+    create_pdf(pdf_path, ["Page one", "Page two"])
+
+    calls = []
+    run_with_cache(pdf_path, cache_dir, calls)
+
+    calls.clear()
+    config = ExtractionConfig(cache_dir=str(cache_dir), refresh_cache=True)
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    processor.ai_extractor.extract_page = lambda pdf, page_num, **kwargs: calls.append(page_num) or {"content": "### Fresh\n"}
+    processor.process()
+    assert sorted(calls) == [1, 2]
@@ -0,0 +1,65 @@
+import fitz
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.analyzer import page_content_bbox
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor, crop_to_box
+from pdfpower_extractor.models.config import get_model_config
+
+
+def half_page_form(doc):
+    page = doc.new_page()  # A4, bottom half blank
+    page.draw_rect(fitz.Rect(0, 0, 595, 842), color=None, fill=(1, 1, 1))
+    page.insert_text((72, 100), "Applicant name:")
+    page.draw_line((72, 380), (520, 380))
+    return page
+
+
+def test_content_bbox_keeps_padding_and_skips_white_background():
+    doc = fitz.open()
+    half_page_form(doc)
+    bbox = page_content_bbox(doc[0], padding=10)
+    assert bbox is not None
+    assert bbox.x0 == 62 and bbox.x1 == 530
+    assert bbox.y1 == 390  # straight rules count as content
+    assert bbox.y0 < 100 - 10
+
+
+def test_content_bbox_none_when_crop_saves_little():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((20, 30), "top left")
+    page.insert_text((520, 830), "end")
+    assert page_content_bbox(doc[0]) is None
+    assert page_content_bbox(doc.new_page()) is None  # empty page
+
+
+def test_crop_to_box_scales_points_to_pixels():
+    image = Image.new("L", (1240, 1754), 255)
+    cropped = crop_to_box(image, (72, 72, 144, 360), 150)
+    assert cropped.size == (150, 600)
+
+
+def test_extractor_crops_render_and_records_box(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "form.pdf"
+    doc = fitz.open()
+    half_page_form(doc)
+    doc.save(pdf_path)
+
+    def fake_convert(path, first_page, last_page, dpi, **kwargs):
+        return [Image.new("RGB", (round(595 * dpi / 72), round(842 * dpi / 72)), "white")]
+
+    monkeypatch.setattr(extractor_module, "convert_from_path", fake_convert)
+    config = ExtractionConfig(crop_margins=True, model_aware_sizing=False, color_mode="rgb")
+    extractor = AIExtractor(api_key="test", config=config, model_config=get_model_config("gemini_flash"))
+    extractor._make_request_with_retry = lambda *args: {
+        "choices": [{"message": {"content": "### Form"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 10},
+    }
+    encoding = extractor.extract_page(str(pdf_path), 1)["image_encoding"]
+
+    x0, y0, x1, y1 = encoding["crop_box"]
+    assert y1 == 380 + config.crop_padding_pt
+    assert encoding["height"] < 1754 / 2
+    assert abs(encoding["width"] - (x1 - x0) * 150 / 72) <= 2
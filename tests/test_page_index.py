@@ -0,0 +1,69 @@
+import json
+
+import fitz
+import pytest
+
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.page_index import PageIndexReader, index_path_for
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path, pages=3):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Vraag {number}: antwoord")
+    doc.save(path)
+
+
+def make_processor(pdf_path):
+    config = ExtractionConfig(write_page_index=True)
+    processor = PDFProcessor(str(pdf_path), config=config)
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        return {
+            # Non-ASCII content: offsets are in bytes, not characters
+            "content": f"**FORM_ID**: `B0700{page_num}`\n### Gegevens pagina {page_num}\n- Naam: Zoë ✓\n",
+            "token_usage": TokenUsage(input_tokens=100 * page_num, output_tokens=10, cost=0.001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    return processor
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_index_points_at_each_page_section(tmp_path, streamed):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path)
+    output_path = tmp_path / "out.txt"
+
+    processor = make_processor(pdf_path)
+    if streamed:
+        processor.process(output_path=str(output_path))
+    else:
+        processor.save_results(processor.process(), str(output_path))
+
+    data = json.loads(open(index_path_for(str(output_path)), encoding="utf-8").read())
+    assert data["source"] == "form.pdf" and data["output_bytes"] == output_path.stat().st_size
+
+    with PageIndexReader(str(output_path)) as reader:
+        assert len(reader) == 3
+        section = reader.read_page(2)
+        assert section.startswith("<!-- TOC PAGE_02:") and "Zoë ✓" in section
+        assert "PAGE 3 OF 3" in reader.read_page(3)
+        entry = reader.entry(3)
+        assert entry.form_id == "B07003"
+        assert entry.input_tokens == 300 and entry.valid is not None
+
+
+def test_reader_rejects_a_changed_output(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=1)
+    output_path = tmp_path / "out.txt"
+    make_processor(pdf_path).process(output_path=str(output_path))
+
+    with open(output_path, "a", encoding="utf-8") as f:
+        f.write("edited\n")
+    with pytest.raises(ValueError):
+        PageIndexReader(str(output_path))
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from pdfpower_extractor.core.payload import BASE64_CHUNK_BYTES, ImageDataURL, RequestBody
+
+
+def payload_with(image_url):
+    return {
+        "model": "google/gemini-2.5-flash",
+        "messages": [
+            {"role": "system", "content": "Extract – «form» data"},
+            {"role": "user", "content": [
+                {"type": "text", "text": "Page\n\"1\""},
+                {"type": "image_url", "image_url": {"url": image_url}},
+            ]},
+        ],
+        "max_tokens": 512,
+    }
+
+
+def test_body_matches_requests_json_serialization():
+    # Longer than one base64 chunk, and not a multiple of 3
+    image = os.urandom(BASE64_CHUNK_BYTES * 2 + 7)
+    url = ImageDataURL(image, "image/webp")
+    assert len(url) == len(str(url))
+
+    expected = json.dumps(payload_with(str(url)), allow_nan=False).encode("utf-8")
+    body = RequestBody(payload_with(url))
+    assert bytes(body.buffer) == expected
+
+
+def test_body_is_streamed_with_content_length():
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received["headers"] = dict(self.headers)
+            received["body"] = self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        body = RequestBody(payload_with(ImageDataURL(os.urandom(50_000), "image/png")))
+        url = f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+        for _ in range(2):  # a fresh reader per attempt
+            requests.post(url, data=body.reader(), headers={"Content-Type": "application/json"}, timeout=10)
+            assert "Transfer-Encoding" not in received["headers"]
+            assert int(received["headers"]["Content-Length"]) == len(body)
+            assert json.loads(received["body"])["max_tokens"] == 512
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,77 @@
+import random
+
+import requests
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.encoding import PayloadEncoder, payload_image_budget
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor
+from pdfpower_extractor.models.config import get_model_config
+
+
+def noisy_page(width=1240, height=1754) -> Image.Image:
+    """A page render that compresses badly (scan noise)"""
+    rng = random.Random(3)
+    return Image.frombytes("L", (width, height), bytes(rng.getrandbits(8) for _ in range(width * height))).convert("RGB")
+
+
+def test_payload_budget_accounts_for_base64():
+    assert payload_image_budget(0) == 0
+    assert payload_image_budget(10.0) == (10 * 1024 * 1024 - 64 * 1024) * 3 // 4
+
+
+def test_image_that_fits_is_encoded_once():
+    encoder = PayloadEncoder(Image.new("RGB", (200, 200), "white"), "png")
+    rendition = encoder.fit(1024 * 1024)
+    assert rendition.format == "PNG"
+    assert len(rendition.attempts) == 1
+
+
+def test_fit_searches_quality_then_resolution():
+    image = noisy_page(600, 800)
+    full = PayloadEncoder(image, "png").fit()
+    limit = full.size_bytes // 6
+
+    encoder = PayloadEncoder(image, "png", 90)
+    rendition = encoder.fit(limit)
+    assert rendition.size_bytes <= limit
+    assert rendition.format == "WEBP"
+    # The original encode, then the quality search
+    assert len(rendition.attempts) > 2
+
+    smaller = encoder.smaller(rendition)
+    assert smaller is not None
+    assert smaller.size_bytes <= rendition.size_bytes * PayloadEncoder.REJECTED_SIZE_FACTOR
+
+
+def test_413_is_retried_with_smaller_rendition(monkeypatch):
+    monkeypatch.setattr(extractor_module, "convert_from_path", lambda *a, **k: [noisy_page(400, 500)])
+    extractor = AIExtractor(
+        api_key="test",
+        config=ExtractionConfig(model_aware_sizing=False, color_mode="rgb"),
+        model_config=get_model_config("gemini_flash"),
+    )
+    sizes = []
+
+    def fake_request(api_url, headers, data, cfg):
+        image_url = data["messages"][-1]["content"][1]["image_url"]["url"]
+        sizes.append(len(image_url))
+        if len(sizes) == 1:
+            response = requests.Response()
+            response.status_code = 413
+            raise requests.exceptions.HTTPError("413 Client Error: Payload Too Large", response=response)
+        return {
+            "choices": [{"message": {"content": "### Page"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 900, "completion_tokens": 20},
+        }
+
+    extractor._make_request_with_retry = fake_request
+    result = extractor.extract_page("unused.pdf", 1)
+
+    assert len(sizes) == 2
+    assert sizes[1] < sizes[0] * 0.8
+    encoding = result["image_encoding"]
+    assert encoding["payload_retries"] == 1
+    assert encoding["format"] == "WEBP"
+    assert len(encoding["attempts"]) > 1
@@ -0,0 +1,48 @@
+from pdfpower_extractor.core.postprocess import (
+    EMPTY_PAGE_SUMMARY,
+    extract_form_id,
+    postprocess_page,
+    summarize_page,
+)
+
+
+def test_page_type_wins_even_on_the_last_line():
+    content = "### 1. Personal details\n- Name: Jan\n**PAGE_TYPE**: `Applicant details`"
+
+    page = postprocess_page(content)
+
+    assert page.summary == "Applicant details"
+    assert summarize_page(content) == "Applicant details"
+
+
+def test_first_content_line_without_section_number():
+    page = postprocess_page("\n\n=== PAGE 3 ===\n<!-- note -->\n## 4.2.1 Income\n- Salary: 100")
+
+    assert page.content.startswith("<!-- note -->")
+    assert page.summary == "Income"
+    assert page.form_id is None
+
+
+def test_doc_identity_is_the_summary_not_the_form_id():
+    page = postprocess_page("**FORM_ID**: `DOC IDENTITY 0109 PASSPORT SPONSOR 2/2`\n- Passport: yes")
+
+    assert page.summary == "PASSPORT SPONSOR 2/2"
+    assert page.form_id is None
+
+
+def test_form_id_skips_application_codes():
+    assert extract_form_id("**FORM_ID**: `K75-19Z-RZLT`\n**FORM_ID**: `B07001`") is None
+    assert postprocess_page("- Field: x\n**FORM_ID**: `B07001`").form_id == "B07001"
+
+
+def test_radio_buttons_and_dates_are_normalized():
+    page = postprocess_page("- Married: ◉ Yes (x)\n- Single: ○ No ( )\n- Born: 01021990")
+
+    assert page.content == "- Married: (x) Yes\n- Single: ( ) No\n- Born: 01-02-1990"
+    assert page.stats == {"lines": 3, "radio_lines": 2, "dates": 1}
+
+
+def test_empty_page():
+    assert postprocess_page("").summary == EMPTY_PAGE_SUMMARY
+    assert postprocess_page("\n=== PAGE 1 ===\n").summary == EMPTY_PAGE_SUMMARY
+    assert postprocess_page("This page is empty").summary == EMPTY_PAGE_SUMMARY
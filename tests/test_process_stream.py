@@ -0,0 +1,106 @@
+import threading
+import time
+
+import fitz
+import pytest
+
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        if number == 3:
+            continue  # empty page
+        for row in range(number):
+            page.insert_text((72, 72 + row * 14), f"Question {number}.{row}: answer")
+    doc.save(path)
+
+
+def make_processor(pdf_path, fail_page=None):
+    config = ExtractionConfig(page_schedule="fifo")
+    processor = PDFProcessor(str(pdf_path), config=config)
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        # Page 1 is the slowest, so it completes last
+        time.sleep(0.15 if page_num == 1 else 0.01)
+        if page_num == fail_page:
+            raise RuntimeError("429 Too Many Requests")
+        return {
+            "content": f"### Section {page_num}\n- Answer: {page_num}\n",
+            "token_usage": TokenUsage(input_tokens=100, output_tokens=10, cost=0.001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    return processor
+
+
+def test_stream_in_page_order(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+
+    pages = list(make_processor(pdf_path).process_stream())
+
+    assert [page.page_num for page in pages] == [1, 2, 3, 4]
+    assert [page.source for page in pages] == ["extracted", "extracted", "empty", "extracted"]
+    first = pages[0]
+    assert first.success and "Section 1" in first.content
+    assert first.token_usage.input_tokens == 100
+    assert first.validation is not None
+    assert first.duration >= 0.15
+    assert pages[2].token_usage is None and pages[2].duration == 0.0
+
+
+def test_stream_in_completion_order_does_not_wait_for_slow_pages(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+    processor = make_processor(pdf_path)
+
+    order = [page.page_num for page in processor.process_stream(order="completion")]
+
+    assert sorted(order) == [1, 2, 3, 4]
+    assert order[-1] == 1
+    assert processor.total_token_usage.input_tokens == 300
+    assert processor.last_cost == pytest.approx(0.003)
+
+
+def test_stream_yields_failed_pages(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+
+    pages = {page.page_num: page for page in make_processor(pdf_path, fail_page=2).process_stream()}
+
+    assert not pages[2].success
+    assert pages[2].error.error_code == 429
+    assert pages[4].success
+
+
+def test_unknown_order_is_rejected(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=1)
+
+    with pytest.raises(ValueError):
+        make_processor(pdf_path).process_stream(order="random")
+
+
+def test_extracted_pages_are_post_processed_in_the_workers(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+    processor = make_processor(pdf_path)
+    validate = processor.validator.validate
+    threads = {}
+
+    def recording_validate(output, page_num=None):
+        threads[page_num] = threading.current_thread() is threading.main_thread()
+        return validate(output, page_num)
+
+    processor.validator.validate = recording_validate
+    pages = {page.page_num: page for page in processor.process_stream()}
+
+    assert threads == {1: False, 2: False, 4: False}  # the empty page is not validated
+    assert pages[2].postprocessed.summary == "Section 2"
+    assert pages[3].postprocessed.summary == "Empty page"
+    assert processor.worker_postprocess_seconds >= 0.0
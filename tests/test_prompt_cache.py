@@ -0,0 +1,31 @@
+import json
+
+from pdfpower_extractor.core.extractor import AIExtractor, parse_cached_tokens
+from pdfpower_extractor.models.config import TokenUsage, get_model_config
+
+
+def test_prompt_prefix_is_identical_across_pages():
+    first = AIExtractor._build_messages("system", "instructions", "data:image/png;base64,AAAA", cache_hints=True)
+    second = AIExtractor._build_messages("system", "instructions", "data:image/png;base64,BBBB", cache_hints=True)
+
+    first_body = json.dumps(first)
+    second_body = json.dumps(second)
+    prefix = first_body[:first_body.index("AAAA")]
+    assert second_body.startswith(prefix)
+    assert first[1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert first[1]["content"][-1]["type"] == "image_url"
+
+
+def test_cached_tokens_are_parsed_from_usage_variants():
+    assert parse_cached_tokens({"prompt_tokens": 1200, "prompt_tokens_details": {"cached_tokens": 800}}) == 800
+    assert parse_cached_tokens({"cache_read_input_tokens": 300}) == 300
+    assert parse_cached_tokens({"prompt_cache_hit_tokens": 64}) == 64
+    assert parse_cached_tokens({"prompt_tokens": 10}) == 0
+
+
+def test_cache_hit_rate_and_cached_pricing():
+    usage = TokenUsage(input_tokens=1000, cached_input_tokens=750) + TokenUsage(input_tokens=1000)
+    assert usage.cache_hit_rate == 0.375
+
+    pricing = get_model_config("gemini_flash").pricing
+    assert pricing.calculate_input_cost(1_000_000, 1_000_000) == pricing.cached_input_cost_per_1m
@@ -0,0 +1,117 @@
+import threading
+
+import fitz
+
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Question {number}: answer")
+    doc.save(path)
+
+
+def make_processor(pdf_path, bad_pages, **validation):
+    config = ExtractionConfig(page_schedule="fifo", reorder_buffer_pages=1)
+    config.validation.reextract_invalid_pages = True
+    for key, value in validation.items():
+        setattr(config.validation, key, value)
+    processor = PDFProcessor(str(pdf_path), config=config)
+    calls = []
+    lock = threading.Lock()
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        with lock:
+            attempt = sum(1 for page, _ in calls if page == page_num)
+            calls.append((page_num, kwargs))
+        if page_num in bad_pages and attempt == 0:
+            content = "I cannot read this page, the scan is too blurry to make out the answers."
+        else:
+            content = f"### Section {page_num}\n- Answer: {page_num}\n"
+        return {
+            "content": content,
+            "token_usage": TokenUsage(input_tokens=100, output_tokens=10, cost=0.001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    return processor, calls
+
+
+def test_invalid_page_is_extracted_again(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+    processor, calls = make_processor(pdf_path, bad_pages={2})
+
+    output = processor.process(output_path=str(tmp_path / "out.md"))
+
+    assert sorted(page for page, _ in calls) == [1, 2, 2, 3, 4]
+    text = (tmp_path / "out.md").read_text(encoding="utf-8")
+    assert "Section 2" in text and "I cannot" not in text
+    record = processor.page_retries[2]
+    assert record.issues == ["HALLUCINATION_DETECTED"] and record.resolved
+    assert processor.validation_results[2].is_valid
+    # Both attempts are paid for
+    assert processor.page_token_usage[2].input_tokens == 200
+    assert processor.total_token_usage.input_tokens == 500
+    assert processor.reextraction_budget.calls == 1
+    assert "Validation Retries:" in output and "- Page 2: HALLUCINATION_DETECTED -> resolved" in output
+
+
+def test_budget_caps_extra_requests(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=4)
+    processor, calls = make_processor(
+        pdf_path,
+        bad_pages={1, 3},
+        max_reextractions=1,
+        reextract_render_dpi=300,
+    )
+
+    pages = {page.page_num: page for page in processor.process_stream(order="completion")}
+
+    assert len(calls) == 5
+    retried = [page for page, kwargs in calls if kwargs.get("render_dpi") == 300]
+    assert retried == [1]
+    assert "Section 1" in pages[1].content
+    assert "I cannot" in pages[3].content  # no budget left, shipped as extracted
+    assert processor.page_retries[3].attempts == 0
+    assert not processor.validation_results[3].is_valid
+
+
+def test_disabled(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2)
+    processor, calls = make_processor(pdf_path, bad_pages={1}, reextract_invalid_pages=False)
+
+    processor.process()
+
+    assert len(calls) == 2 and processor.page_retries == {}
+
+
+def test_empty_model_answer_is_extracted_again(tmp_path):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=2)
+    config = ExtractionConfig(page_schedule="fifo", reorder_buffer_pages=1)
+    config.validation.reextract_invalid_pages = True
+    processor = PDFProcessor(str(pdf_path), config=config)
+    calls = []
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        calls.append(page_num)
+        answer = "" if calls.count(page_num) == 1 and page_num == 2 else f"### Section {page_num}\n- Answer: yes"
+        # Wrapped like AIExtractor.extract_page does
+        banner = "=" * 80
+        return {
+            "content": f"\n{banner}\n=== Page {page_num} (AI Processed) ===\n{banner}\n{answer}\n",
+            "token_usage": TokenUsage(input_tokens=100, output_tokens=10, cost=0.001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    processor.process()
+
+    assert sorted(calls) == [1, 2, 2]
+    assert processor.page_retries[2].issues == ["EMPTY_OUTPUT"] and processor.page_retries[2].resolved
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import fitz
+
+from pdfpower_extractor.core.cache import ResultCache, layout_fingerprint
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.core.scheduler import (
+    PageCostPredictor,
+    PageQueue,
+    page_features,
+    simulate_makespan,
+)
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_mixed_pdf(path: Path) -> None:
+    """Signature page, dense questionnaire page, short cover page."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 700), "Signature: ____________")
+    page = doc.new_page()
+    for row in range(60):
+        page.insert_text((40, 40 + row * 12), f"Q{row}. Do you agree with statement number {row}?  [ ] Yes  [ ] No")
+        page.draw_rect(fitz.Rect(400, 32 + row * 12, 408, 40 + row * 12))
+    page = doc.new_page()
+    page.insert_text((72, 72), "Application form - cover")
+    doc.save(path)
+
+
+def test_predictor_ranks_dense_pages_first(tmp_path):
+    pdf_path = tmp_path / "mixed.pdf"
+    create_mixed_pdf(pdf_path)
+    predictor = PageCostPredictor()
+    with fitz.open(pdf_path) as doc:
+        costs = {p: predictor.predict(page_features(doc, p)) for p in (1, 2, 3)}
+    assert max(costs, key=costs.get) == 2
+    assert costs[2] > 5 * costs[1]
+
+
+def test_predictor_uses_layout_history(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    predictor = PageCostPredictor(cache)
+    pdf_path = tmp_path / "mixed.pdf"
+    create_mixed_pdf(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        layout = layout_fingerprint(doc, 0)
+        before = predictor.predict(page_features(doc, 1, layout))
+        predictor.record(layout, "B07001", 3000)
+        predictor.record(layout, "B07001", 3200)
+        after = predictor.predict(page_features(doc, 1, layout))
+
+    usage = cache.get_usage(layout)
+    assert usage["samples"] == 2
+    assert usage["output_tokens"] == 3100
+    assert usage["form_id"] == "B07001"
+    assert after > 10 * before
+
+
+def test_page_queue_orders():
+    ljf = PageQueue("largest_first")
+    fifo = PageQueue("fifo")
+    for page_num, cost in [(1, 100), (2, 4000), (3, 900), (4, 900)]:
+        ljf.push(page_num, cost)
+        fifo.push(page_num, cost)
+    assert [ljf.pop() for _ in range(4)] == [2, 3, 4, 1]
+    assert [fifo.pop() for _ in range(4)] == [1, 2, 3, 4]
+
+
+def test_largest_first_shortens_makespan():
+    durations = {1: 2.0, 2: 2.0, 3: 2.0, 4: 2.0, 5: 12.0}
+    fifo = simulate_makespan(durations, [1, 2, 3, 4, 5], workers=2)
+    ljf = simulate_makespan(durations, [5, 1, 2, 3, 4], workers=2)
+    assert fifo == 16.0
+    assert ljf == 12.0
+
+
+def test_process_records_token_history(tmp_path):
+    pdf_path = tmp_path / "mixed.pdf"
+    create_mixed_pdf(pdf_path)
+    config = ExtractionConfig(cache_dir=str(tmp_path / "cache"))
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+    processor.ai_extractor.extract_page = lambda pdf, page_num, **kwargs: {
+        "content": f"**FORM_ID**: `B07001`\n### Page {page_num}\n",
+        "token_usage": TokenUsage(input_tokens=10, output_tokens=100 * page_num, total_tokens=10 + 100 * page_num),
+    }
+    processor.process()
+
+    assert sorted(processor.dispatch_order) == [1, 2, 3]
+    assert max(processor.predicted_output_tokens, key=processor.predicted_output_tokens.get) == 2
+    usage = processor.result_cache.get_usage(processor.page_layouts[3])
+    assert usage["output_tokens"] == 300
+    assert usage["form_id"] == "B07001"
@@ -0,0 +1,68 @@
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from pdfpower_extractor.core.cache import ResultCache
+from pdfpower_extractor.models.config import TokenUsage
+
+KEYS = [ResultCache.page_key(f"fingerprint-{i}", "gemini_flash") for i in range(8)]
+
+
+def _content(key: str, writer: int) -> str:
+    # Large enough that a torn write would be visible
+    return f"{key}:{writer}:" + ("x" * 50_000)
+
+
+def _hammer(args) -> int:
+    """Write and read every key repeatedly from one 'node' (process)"""
+    cache_dir, writer = args
+    cache = ResultCache(cache_dir)
+    bad_reads = 0
+
+    def work(thread: int) -> int:
+        bad = 0
+        for round_num in range(10):
+            for key in KEYS:
+                cache.put_page(key, key, _content(key, writer * 100 + thread), TokenUsage(input_tokens=round_num))
+                entry = cache.get_page(key)
+                if entry is None or not entry["content"].startswith(f"{key}:") or len(entry["content"]) < 50_000:
+                    bad += 1
+        return bad
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        bad_reads += sum(pool.map(work, range(4)))
+    return bad_reads
+
+
+def test_concurrent_writers_never_corrupt_entries(tmp_path):
+    cache_dir = str(tmp_path / "shared-cache")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        bad_reads = sum(pool.map(_hammer, [(cache_dir, writer) for writer in range(4)]))
+
+    assert bad_reads == 0
+    cache = ResultCache(cache_dir)
+    for key in KEYS:
+        entry = cache.get_page(key)
+        assert entry is not None
+        assert entry["content"].startswith(f"{key}:")
+    # No temp files left behind
+    assert not list((tmp_path / "shared-cache").rglob("*.tmp"))
+
+
+def test_damaged_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = KEYS[0]
+    cache.put_page(key, key, "### Page\n")
+    path = tmp_path / "pages" / key[:2] / f"{key}.json"
+    envelope = json.loads(path.read_text(encoding="utf-8"))
+    envelope["data"]["content"] = "### Tampered\n"
+    path.write_text(json.dumps(envelope), encoding="utf-8")
+
+    assert cache.get_page(key) is None
+
+
+def test_first_writer_wins_without_overwrite(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = KEYS[1]
+    assert cache.put_page(key, key, "node A", overwrite=False)
+    assert not cache.put_page(key, key, "node B", overwrite=False)
+    assert cache.get_page(key)["content"] == "node A"
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import fitz
+
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.core.scheduler import PageQueue
+from pdfpower_extractor.core.streaming import OrderedPageWriter
+from pdfpower_extractor.models.config import TokenUsage
+
+
+def create_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        page = doc.new_page()
+        # Later pages carry more text, so largest_first dispatches them first
+        for row in range(number):
+            page.insert_text((72, 72 + row * 14), f"Question {number}.{row}: answer")
+    doc.save(path)
+
+
+def test_writer_emits_pages_in_order():
+    written, advanced = [], []
+    writer = OrderedPageWriter(lambda n, item: written.append((n, item)), on_advance=advanced.append)
+
+    writer.add(3, "c")
+    writer.skip(2)
+    assert written == [] and writer.buffered == 1
+    writer.add(1, "a")
+    assert written == [(1, "a"), (3, "c")]
+    assert writer.next_page == 4 and advanced == [4]
+    writer.add(4, "d")
+    assert writer.pages_written == 3 and writer.peak_buffered == 1
+
+
+def test_queue_window_holds_back_pages_beyond_the_buffer():
+    queue = PageQueue("largest_first", window=2)
+    for page_num in (1, 2, 3, 4):
+        queue.push(page_num, predicted_cost=page_num)
+    assert [queue.pop(), queue.pop()] == [2, 1]
+
+    popped = []
+    worker = threading.Thread(target=lambda: popped.append(queue.pop()))
+    worker.start()
+    worker.join(0.2)
+    assert popped == []  # page 3 is outside the window until page 1 is written
+    queue.advance(2)
+    worker.join(2)
+    assert popped == [3]
+
+
+def extracting_processor(pdf_path, reorder_buffer_pages=2):
+    config = ExtractionConfig(reorder_buffer_pages=reorder_buffer_pages)
+    config.validation.validate_output = False
+    processor = PDFProcessor(str(pdf_path), config=config)
+
+    def fake_extract_page(pdf_path, page_num, **kwargs):
+        # Later (larger) pages go out first but finish last
+        time.sleep(0.01 * page_num)
+        return {
+            "content": f"### Section {page_num}\n- Answer: {page_num}\n",
+            "token_usage": TokenUsage(input_tokens=100, output_tokens=10, cost=0.001),
+        }
+
+    processor.ai_extractor.extract_page = fake_extract_page
+    return processor
+
+
+def test_streamed_file_matches_in_memory_output(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "form.pdf"
+    create_pdf(pdf_path, pages=8)
+    monkeypatch.setattr("pdfpower_extractor.core.processor.datetime", FrozenDatetime)
+
+    expected = extracting_processor(pdf_path).process()
+
+    output_path = tmp_path / "out.md"
+    seen = []
+    processor = extracting_processor(pdf_path)
+    header = processor.process(
+        output_path=str(output_path),
+        page_callback=lambda page_num, section: seen.append((page_num, output_path.with_suffix(".md.part").exists())),
+    )
+
+    assert [page_num for page_num, _ in seen] == list(range(1, 9))
+    assert all(part_exists for _, part_exists in seen)
+    assert not output_path.with_suffix(".md.part").exists()
+    assert "<!-- TOC START -->" in header and "PAGE 1 OF 8" not in header
+    assert strip_timing(output_path.read_text(encoding="utf-8")) == strip_timing(expected)
+    assert processor.reorder_peak <= 2
+    assert processor.total_token_usage.input_tokens == 800
+
+
+class FrozenDatetime:
+    @staticmethod
+    def now():
+        from datetime import datetime
+        return datetime(2025, 1, 1, 12, 0, 0)
+
+
+def strip_timing(text):
+    return "\n".join(line for line in text.splitlines() if not line.startswith("Processing Time"))
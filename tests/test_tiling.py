@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+
+import fitz
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor
+from pdfpower_extractor.core.tiling import plan_tiles, stitch_tiles
+from pdfpower_extractor.models.config import get_model_config
+
+A3 = (842, 1191)
+
+
+def test_plan_tiles_uses_overlapping_bands():
+    assert len(plan_tiles(1240, 1754, 2048, 96)) == 1
+
+    tiles = plan_tiles(1754, 2481, 2048, 96)  # A3 at 150 DPI
+    assert [tile.box for tile in tiles] == [(0, 0, 1754, 1288), (0, 1192, 1754, 2481)]
+    assert tiles[0].position == "band 1 of 2 from the top"
+
+
+
+def test_wide_page_is_cut_into_full_width_bands():
+    # A3 landscape at 150 DPI used to become a 2x2 grid of left and right halves
+    tiles = plan_tiles(2481, 1754, 2048, 96)
+    assert [tile.box for tile in tiles] == [(0, 0, 2481, 925), (0, 829, 2481, 1754)]
+    assert all((right - left) * (bottom - top) <= 2048 * 2048 for left, top, right, bottom in (t.box for t in tiles))
+
+    # Each band holds whole lines, so the stitched page reads line by line
+    top = "### Part 1\n- Name: Jan | City: Utrecht\n- Phone: 0612345678 | Email: jan@example.com"
+    bottom = "- Name: Jan | City: Utrecht\n- Phone: 0612345678 | Email: jan@example.com\n- (x) Yes | ( ) No"
+    assert stitch_tiles([top, bottom]) == (
+        "### Part 1\n- Name: Jan | City: Utrecht\n- Phone: 0612345678 | Email: jan@example.com\n- (x) Yes | ( ) No"
+    )
+
+
+def test_stitch_drops_overlap_lines_and_repeated_metadata():
+    top = "**FORM_ID**: `A3-1`\n### Part 1\n- Name: Jan\n- City:  Utrecht"
+    bottom = "**FORM_ID**: `A3-1`\n- Name: Jan\n- City: Utrecht\n### Part 2\n- (x) Yes"
+    assert stitch_tiles([top, bottom]) == (
+        "**FORM_ID**: `A3-1`\n### Part 1\n- Name: Jan\n- City:  Utrecht\n### Part 2\n- (x) Yes"
+    )
+    assert stitch_tiles(["a", "b"]) == "a\nb"
+
+
+def test_stitch_keeps_a_single_repeated_line_at_the_band_edge():
+    # Two questions with the same last/first option: not overlap
+    top = "### 2.1 Married?\n- (x) Yes\n- ( ) No"
+    bottom = "- ( ) No\n- (x) Yes\n### 2.3 Pets?"
+    assert stitch_tiles([top, bottom]) == f"{top}\n{bottom}"
+
+
+def test_oversized_page_is_extracted_as_parallel_tiles(tmp_path, monkeypatch):
+    pdf_path = tmp_path / "a3.pdf"
+    doc = fitz.open()
+    doc.new_page(width=A3[0], height=A3[1]).insert_text((72, 72), "Drawing")
+    doc.save(pdf_path)
+
+    rendered = {}
+
+    def fake_convert(path, first_page, last_page, dpi, **kwargs):
+        rendered["dpi"] = dpi
+        return [Image.new("RGB", (round(A3[0] * dpi / 72), round(A3[1] * dpi / 72)), "white")]
+
+    monkeypatch.setattr(extractor_module, "convert_from_path", fake_convert)
+    model = get_model_config("gemini_flash")
+    config = ExtractionConfig(tile_large_pages=True, color_mode="rgb")
+    extractor = AIExtractor(api_key="test", config=config, model_config=model)
+
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0, "instructions": []}
+
+    def fake_request(api_url, headers, data, cfg):
+        content = data["messages"][-1]["content"]
+        prompt = content[-1]["text"]  # tile position, after the image
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["instructions"].append(content[0])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        text = "- Shared line\n- Second shared line" if "band 2" in prompt else "### Top\n- Shared line\n- Second shared line"
+        if "band 2" in prompt:
+            text += "\n### Bottom"
+        return {
+            "choices": [{"message": {"content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 10},
+        }
+
+    extractor._make_request_with_retry = fake_request
+    result = extractor.extract_page(str(pdf_path), 1)
+
+    assert rendered["dpi"] == config.render_dpi  # not downsized for image tokens
+    assert state["peak"] == 2  # tiles ran in parallel
+    assert "### Top\n- Shared line\n- Second shared line\n### Bottom" in result["content"]
+    assert result["token_usage"].input_tokens == 2000
+    assert len(result["image_encoding"]["tiles"]) == 2
+    # The cacheable instructions block before the image is the same for every tile
+    first, second = state["instructions"]
+    assert json.dumps(first) == json.dumps(second) and "band" not in first["text"]
+
+
+def test_tiles_share_endpoint_request_limit():
+    model = get_model_config("gemini_flash")
+    extractor = AIExtractor(api_key="test", config=ExtractionConfig(), model_config=model)
+    slot = extractor._request_slot(model)
+    assert slot is extractor._request_slot(model)
+    acquired = [slot.acquire(blocking=False) for _ in range(model.get_endpoint().max_parallel_requests + 1)]
+    assert acquired[-1] is False and all(acquired[:-1])
@@ -0,0 +1,76 @@
+from PIL import Image
+
+import pdfpower_extractor.core.extractor as extractor_module
+from pdfpower_extractor.core.config import ExtractionConfig
+from pdfpower_extractor.core.extractor import AIExtractor
+from pdfpower_extractor.core.processor import PDFProcessor
+from pdfpower_extractor.models.config import get_model_config
+
+
+def make_extractor(monkeypatch, responses, sent):
+    monkeypatch.setattr(
+        extractor_module,
+        "convert_from_path",
+        lambda *args, **kwargs: [Image.new("RGB", (64, 64), "white")],
+    )
+    extractor = AIExtractor(
+        api_key="test",
+        config=ExtractionConfig(model_aware_sizing=False, color_mode="rgb"),
+        model_config=get_model_config("gemini_flash"),
+    )
+
+    def fake_request(api_url, headers, data, cfg):
+        sent.append(data["max_tokens"])
+        return responses.pop(0)
+
+    extractor._make_request_with_retry = fake_request
+    return extractor
+
+
+def response(content, finish_reason, output_tokens):
+    return {
+        "choices": [{"message": {"content": content}, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": output_tokens},
+    }
+
+
+def test_page_budget_is_sent_as_max_tokens(monkeypatch):
+    sent = []
+    extractor = make_extractor(monkeypatch, [response("### Signature", "stop", 180)], sent)
+    result = extractor.extract_page("unused.pdf", 1, max_tokens=512)
+    assert sent == [512]
+    assert result["truncations"] == 0
+    assert result["max_tokens"] == 512
+
+
+def test_truncated_page_is_continued_with_larger_budget(monkeypatch):
+    sent = []
+    extractor = make_extractor(monkeypatch, [
+        response("### Questions\n- (x) Ye", "length", 600),
+        response("s\n- ( ) No", "stop", 10),
+    ], sent)
+    result = extractor.extract_page("unused.pdf", 1, max_tokens=600)
+    assert sent == [600, 1200]
+    assert result["truncations"] == 1
+    assert result["continuations"] == 1
+    assert "### Questions\n- (x) Yes\n- ( ) No" in result["content"]
+    assert result["token_usage"].output_tokens == 610
+
+
+def test_budget_never_exceeds_config_cap(monkeypatch):
+    sent = []
+    extractor = make_extractor(monkeypatch, [response("done", "stop", 3000)], sent)
+    extractor.extract_page("unused.pdf", 1, max_tokens=10_000)
+    assert sent == [4000]
+
+
+def test_processor_budget_follows_prediction(tmp_path):
+    processor = PDFProcessor(str(tmp_path / "unused.pdf"), config=ExtractionConfig())
+    processor.predicted_output_tokens = {1: 150, 2: 1200, 3: 3000}
+    assert processor._page_token_budget(1) == 512
+    assert processor._page_token_budget(2) == 2400
+    assert processor._page_token_budget(3) == 4000
+    assert processor._page_token_budget(4) is None
+
+    processor.config.llm.dynamic_max_tokens = False
+    assert processor._page_token_budget(2) is None
@@ -0,0 +1,72 @@
+import pytest
+
+from pdfpower_extractor.core.validator import (
+    DEFAULT_RULES,
+    OutputValidator,
+    RuleRegistry,
+    ValidationRule,
+    ValidationSeverity,
+)
+
+PAGE = "\n".join([
+    "### 1.1 Marital status",
+    "(x) Married",
+    "  (x) Single",
+    "( ) Divorced",
+    "",
+    "[x] Agree",
+    "□ Newsletter",
+    "Unfortunately  the date is illegible &amp; smudged &gt;",
+])
+
+
+def issue_codes(result):
+    return [(issue.code, issue.message) for issue in result.issues]
+
+
+def test_default_rules_and_option_lines():
+    result = OutputValidator(min_content_length=10).validate(PAGE, 4)
+
+    assert not result.is_valid
+    assert issue_codes(result) == [
+        ("HALLUCINATION_DETECTED", "Suspicious pattern found: Apologetic language"),
+        ("ENCODING_ISSUE", "Replacement character found (1 occurrences)"),
+        ("ENCODING_ISSUE", "HTML entities (2 occurrences)"),
+        ("MULTIPLE_RADIO_SELECTED", "Radio group has 2 selected options (should be 0 or 1)"),
+    ]
+    assert result.stats["radio_options"] == 2  # the indented option is not counted
+    assert result.stats["checkbox_options"] == 2
+    assert result.issues[0].location == "Page 4"
+
+
+def test_registered_rules_are_picked_up():
+    rules = RuleRegistry(DEFAULT_RULES)
+    validator = OutputValidator(min_content_length=10, rules=rules)
+    assert validator.validate("Name: TODO fill in later").is_valid
+
+    rules.register(ValidationRule(
+        name="todo_marker",
+        pattern=r"\btodo\b",
+        code="PLACEHOLDER",
+        description="TODO marker",
+        ignore_case=True,
+    ))
+    assert issue_codes(validator.validate("Name: TODO fill in later")) == [("PLACEHOLDER", "TODO marker")]
+
+    rules.unregister("apology")
+    assert validator.validate("Unfortunately  nothing to report here").is_valid
+    assert "apology" in DEFAULT_RULES
+    with pytest.raises(ValueError):
+        rules.register(DEFAULT_RULES.get("lorem_ipsum"))
+
+
+def test_batch_across_processes_matches_serial():
+    validator = OutputValidator(strict_mode=True)
+    validator.BATCH_SHARD_SIZE = 2
+    outputs = {page_num: PAGE * page_num for page_num in range(1, 8)}
+
+    parallel = validator.validate_batch(outputs, workers=2)
+
+    assert list(parallel) == list(outputs)
+    assert parallel == validator.validate_batch(outputs)
+    assert all(issue.severity == ValidationSeverity.ERROR for issue in parallel[1].get_errors())